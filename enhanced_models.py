@@ -5,9 +5,35 @@ from datetime import datetime
 import uuid
 import json
 import os
+import threading
+
+from port_detector import port_detector
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "projects_v2.json")
 
+# 连续修改合并为一次写盘的延迟（秒）
+SAVE_DELAY = 0.05
+
+
+def _dumps(data) -> bytes:
+    """序列化为 UTF-8 JSON（优先使用 orjson）"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _loads(raw: bytes):
+    """解析 JSON 字节串（优先使用 orjson）"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 @dataclass
 class PythonEnvironment:
@@ -70,7 +96,7 @@ class PortConfig:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceConfig:
     """服务配置（前端/后端/其他服务）"""
     enabled: bool = True
@@ -106,6 +132,19 @@ class ServiceConfig:
     auto_detected: bool = False  # 是否自动检测
     last_modified: str = field(default_factory=lambda: datetime.now().isoformat())
     
+    # 派生属性缓存（不参与序列化和比较）
+    _cmd_short: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def cmd_short(self) -> str:
+        """截断后的启动命令（按命令内容缓存，命令修改后自动失效）"""
+        cached = self._cmd_short
+        if cached is None or cached[0] != self.command:
+            cmd = self.command
+            cached = (cmd, cmd if len(cmd) <= 35 else cmd[:35] + "...")
+            self._cmd_short = cached
+        return cached[1]
+    
     def to_dict(self) -> dict:
         return {
             "enabled": self.enabled,
@@ -152,7 +191,7 @@ class ServiceConfig:
             log_file=data.get("log_file", ""),
             log_level=data.get("log_level", "INFO"),
             auto_detected=data.get("auto_detected", False),
-            last_modified=data.get("last_modified", datetime.now().isoformat())
+            last_modified=data.get("last_modified") or datetime.now().isoformat()
         )
 
 
@@ -185,7 +224,7 @@ class ProjectMetadata:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Project:
     """增强的项目配置"""
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -207,13 +246,28 @@ class Project:
     # 项目配置
     config_version: str = "2.0"  # 配置版本
     
+    # 派生属性缓存（不参与序列化和比较）
+    _enabled_services: Optional[List[tuple]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def enabled_services(self) -> List[tuple]:
+        """已启用的服务列表 [(key, ServiceConfig)]（保存项目时失效）"""
+        if self._enabled_services is None:
+            self._enabled_services = [(k, s) for k, s in self.services.items() if s.enabled]
+        return self._enabled_services
+    
+    def invalidate_cache(self):
+        """清除派生属性缓存"""
+        self._enabled_services = None
+    
     def to_dict(self) -> dict:
+        to_dict = ServiceConfig.to_dict
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "path": self.path,
-            "services": {k: v.to_dict() for k, v in self.services.items()},
+            "services": {k: to_dict(v) for k, v in self.services.items()},
             "metadata": self.metadata.to_dict(),
             "created_at": self.created_at,
             "updated_at": self.updated_at,
@@ -223,21 +277,20 @@ class Project:
     
     @classmethod
     def from_dict(cls, data: dict) -> "Project":
-        services = {}
-        for k, v in data.get("services", {}).items():
-            services[k] = ServiceConfig.from_dict(v)
+        from_dict = ServiceConfig.from_dict
+        services = {k: from_dict(v) for k, v in data.get("services", {}).items()}
         
         metadata = ProjectMetadata.from_dict(data.get("metadata", {}))
         
         return cls(
-            id=data.get("id", str(uuid.uuid4())),
+            id=data.get("id") or str(uuid.uuid4()),
             name=data.get("name", ""),
             description=data.get("description", ""),
             path=data.get("path", ""),
             services=services,
             metadata=metadata,
-            created_at=data.get("created_at", datetime.now().isoformat()),
-            updated_at=data.get("updated_at", datetime.now().isoformat()),
+            created_at=data.get("created_at") or datetime.now().isoformat(),
+            updated_at=data.get("updated_at") or datetime.now().isoformat(),
             last_run_at=data.get("last_run_at"),
             config_version=data.get("config_version", "2.0")
         )
@@ -249,62 +302,141 @@ class EnhancedProjectManager:
     def __init__(self):
         self.projects: Dict[str, Project] = {}
         self.config_file = CONFIG_FILE
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 串行化写盘，避免定时器与退出保存同时写临时文件
+        self._last_hash: Optional[int] = None  # 上次写入内容的哈希，首次保存总会写盘
+        self._fragments: Dict[str, bytes] = {}  # 项目 id -> 已序列化的 JSON 片段
+        self._dirty_ids: set = set()  # 片段需要重新序列化的项目 id
         self.load()
     
     def load(self):
         """从文件加载项目配置"""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(self.config_file, "rb") as f:
+                    data = _loads(f.read())
                     for p in data.get("projects", []):
                         project = Project.from_dict(p)
                         self.projects[project.id] = project
             except Exception as e:
                 print(f"加载配置失败: {e}")
     
-    def save(self):
-        """保存项目配置到文件"""
-        data = {
-            "version": "2.0",
-            "last_updated": datetime.now().isoformat(),
-            "projects": [p.to_dict() for p in self.projects.values()]
-        }
+    def _schedule_save(self, project_id: Optional[str] = None):
+        """延迟保存，短时间内的多次修改只写一次盘"""
+        with self._save_lock:
+            self._dirty = True
+            if project_id:
+                self._dirty_ids.add(project_id)
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._save_timer.start()
+    
+    def flush(self):
+        """立即写入尚未保存的修改（退出前调用）"""
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+        try:
+            self.save()
+        except Exception as e:
+            # 写盘失败时保留待保存标记，下次保存或退出时重试
+            with self._save_lock:
+                self._dirty = True
+            print(f"保存配置失败: {e}")
+    
+    def _serialize_projects(self) -> bytes:
+        """序列化项目列表，只重新序列化修改过的项目，其余复用缓存片段
         
-        # 备份旧配置
-        if os.path.exists(self.config_file):
-            backup_file = self.config_file + ".backup"
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    backup_data = f.read()
-                with open(backup_file, "w", encoding="utf-8") as f:
-                    f.write(backup_data)
-            except:
-                pass
+        调用方须持有 _write_lock：取走待更新 id 和发布新片段之间不能插入另一次保存
+        """
+        with self._save_lock:
+            dirty, self._dirty_ids = self._dirty_ids, set()
         
-        # 保存新配置
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        fragments = {}
+        try:
+            for pid, project in list(self.projects.items()):
+                fragment = self._fragments.get(pid)
+                if fragment is None or pid in dirty:
+                    # 缩进到 "projects" 数组内部的层级
+                    fragment = b"    " + _dumps(project.to_dict()).replace(b"\n", b"\n    ")
+                fragments[pid] = fragment
+        except Exception:
+            # 序列化失败时归还取走的 id，下次保存仍会重新生成这些片段
+            with self._save_lock:
+                self._dirty_ids |= dirty
+            raise
+        self._fragments = fragments
+        return b",\n".join(fragments.values())
+    
+    def save(self):
+        """保存项目配置到文件"""
+        # 序列化、写临时文件和替换都在写锁内完成，多个线程的保存依次进行
+        with self._write_lock:
+            body = self._serialize_projects()
+            
+            # 项目内容未变化时跳过写盘（last_updated 不参与比较）
+            payload_hash = hash(body)
+            if payload_hash == self._last_hash:
+                return
+            
+            # 按整体 JSON 的格式（2 空格缩进）拼接各项目片段
+            projects = b"[\n" + body + b"\n  ]" if body else b"[]"
+            payload = (
+                b'{\n  "version": "2.0",\n  "last_updated": '
+                + _dumps(datetime.now().isoformat())
+                + b',\n  "projects": ' + projects + b"\n}"
+            )
+            
+            # 备份旧配置
+            if os.path.exists(self.config_file):
+                backup_file = self.config_file + ".backup"
+                try:
+                    with open(self.config_file, "r", encoding="utf-8") as f:
+                        backup_data = f.read()
+                    with open(backup_file, "w", encoding="utf-8") as f:
+                        f.write(backup_data)
+                except:
+                    pass
+            
+            # 保存新配置：先写临时文件再原子替换，避免写入中途崩溃损坏配置
+            tmp_file = self.config_file + ".tmp"
+            with open(tmp_file, "wb", buffering=65536) as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            self._last_hash = payload_hash
     
     def add(self, project: Project) -> Project:
         """添加项目"""
         project.updated_at = datetime.now().isoformat()
+        project.invalidate_cache()
         self.projects[project.id] = project
-        self.save()
+        self._schedule_save(project.id)
         return project
     
     def update(self, project: Project) -> Project:
         """更新项目"""
         project.updated_at = datetime.now().isoformat()
+        project.invalidate_cache()
+        port_detector.invalidate(project.path)
         self.projects[project.id] = project
-        self.save()
+        self._schedule_save(project.id)
         return project
     
     def delete(self, project_id: str):
         """删除项目"""
         if project_id in self.projects:
+            port_detector.invalidate(self.projects[project_id].path)
             del self.projects[project_id]
-            self.save()
+            self._schedule_save()
     
     def get(self, project_id: str) -> Optional[Project]:
         """获取项目"""
@@ -333,7 +465,7 @@ class EnhancedProjectManager:
         """更新最后运行时间"""
         if project_id in self.projects:
             self.projects[project_id].last_run_at = datetime.now().isoformat()
-            self.save()
+            self._schedule_save(project_id)
     
     def migrate_from_old_config(self, old_config_file: str):
         """从旧配置迁移"""
@@ -8,6 +8,7 @@ from enhanced_models import (
     ProjectMetadata, enhanced_project_manager
 )
 from enhanced_project_detector import enhanced_detector
+from ui_fonts import F
 
 
 class EnhancedProjectFormDialog(ctk.CTkToplevel):
@@ -66,7 +67,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         label = ctk.CTkLabel(
             self.scroll_frame,
             text=title,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=F(size=16, weight="bold"),
             text_color="#000000"
         )
         label.pack(anchor="w", pady=(20, 5))
@@ -106,7 +107,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             detect_frame,
             text="💡 智能检测",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=F(size=14, weight="bold"),
             text_color="#000000"
         ).pack(anchor="w", padx=15, pady=(15, 5))
         
@@ -114,7 +115,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             detect_frame,
             text="自动扫描项目目录，识别前后端结构、技术栈、端口配置和Python环境",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=11)
+            font=F(size=11)
         ).pack(anchor="w", padx=15, pady=(0, 10))
         
         ctk.CTkButton(
@@ -135,7 +136,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         self.backend_enabled = ctk.CTkCheckBox(
             self.scroll_frame,
             text="启用后端服务",
-            font=ctk.CTkFont(size=13)
+            font=F(size=13)
         )
         self.backend_enabled.pack(anchor="w", pady=(5, 10))
         
@@ -181,7 +182,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             port_frame,
             text="端口配置",
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=F(size=12, weight="bold")
         ).pack(anchor="w", padx=10, pady=(10, 5))
         
         port_row = ctk.CTkFrame(port_frame, fg_color="transparent")
@@ -195,14 +196,14 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             port_row,
             text="(启动命令会使用此端口)",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         ).pack(side="left", padx=(10, 0))
         
         self.backend_port_source = ctk.CTkLabel(
             port_frame,
             text="",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         )
         self.backend_port_source.pack(anchor="w", padx=10, pady=(0, 10))
         
@@ -231,7 +232,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             fg_color="#000000",
             hover_color="#333333",
             text_color="#FFFFFF",
-            font=ctk.CTkFont(size=12),
+            font=F(size=12),
             command=self._test_backend_startup
         ).pack(anchor="w", pady=(10, 0))
     
@@ -242,7 +243,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         self.frontend_enabled = ctk.CTkCheckBox(
             self.scroll_frame,
             text="启用前端服务",
-            font=ctk.CTkFont(size=13)
+            font=F(size=13)
         )
         self.frontend_enabled.pack(anchor="w", pady=(5, 10))
         
@@ -288,7 +289,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             port_frame,
             text="端口配置",
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=F(size=12, weight="bold")
         ).pack(anchor="w", padx=10, pady=(10, 5))
         
         port_row = ctk.CTkFrame(port_frame, fg_color="transparent")
@@ -302,14 +303,14 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             port_row,
             text="(启动命令会使用此端口)",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         ).pack(side="left", padx=(10, 0))
         
         self.frontend_port_source = ctk.CTkLabel(
             port_frame,
             text="",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         )
         self.frontend_port_source.pack(anchor="w", padx=10, pady=(0, 10))
         
@@ -322,7 +323,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             fg_color="#000000",
             hover_color="#333333",
             text_color="#FFFFFF",
-            font=ctk.CTkFont(size=12),
+            font=F(size=12),
             command=self._test_frontend_startup
         ).pack(anchor="w", pady=(10, 0))
     
@@ -391,7 +392,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
             fg_color="#000000",
             hover_color="#333333",
             text_color="#FFFFFF",
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=F(size=13, weight="bold"),
             command=self._save
         ).pack(side="right", padx=(0, 10))
     
@@ -423,7 +424,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             progress,
             text="🔍 正在扫描项目...",
-            font=ctk.CTkFont(size=14)
+            font=F(size=14)
         ).pack(pady=30)
         
         progress.update()
@@ -587,7 +588,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             test_window,
             text="🧪 测试启动后端服务",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=F(size=16, weight="bold")
         ).pack(pady=15)
         
         # 信息显示
@@ -597,26 +598,26 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text=f"命令: {cmd}",
-            font=ctk.CTkFont(family="Consolas", size=11),
+            font=F(family="Consolas", size=11),
             anchor="w"
         ).pack(anchor="w", padx=10, pady=5)
         
         ctk.CTkLabel(
             info_frame,
             text=f"目录: {cwd}",
-            font=ctk.CTkFont(family="Consolas", size=11),
+            font=F(family="Consolas", size=11),
             anchor="w"
         ).pack(anchor="w", padx=10, pady=(0, 5))
         
         # 日志显示
-        log_text = ctk.CTkTextbox(test_window, width=660, height=300, font=ctk.CTkFont(family="Consolas", size=10))
+        log_text = ctk.CTkTextbox(test_window, width=660, height=300, font=F(family="Consolas", size=10))
         log_text.pack(padx=20, pady=(0, 10))
         
         # 状态标签
         status_label = ctk.CTkLabel(
             test_window,
             text="⏳ 正在启动...",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         )
         status_label.pack(pady=5)
         
@@ -789,7 +790,7 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             test_window,
             text="🧪 测试启动前端服务",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=F(size=16, weight="bold")
         ).pack(pady=15)
         
         # 信息显示
@@ -799,26 +800,26 @@ class EnhancedProjectFormDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text=f"命令: {cmd}",
-            font=ctk.CTkFont(family="Consolas", size=11),
+            font=F(family="Consolas", size=11),
             anchor="w"
         ).pack(anchor="w", padx=10, pady=5)
         
         ctk.CTkLabel(
             info_frame,
             text=f"目录: {cwd}",
-            font=ctk.CTkFont(family="Consolas", size=11),
+            font=F(family="Consolas", size=11),
             anchor="w"
         ).pack(anchor="w", padx=10, pady=(0, 5))
         
         # 日志显示
-        log_text = ctk.CTkTextbox(test_window, width=660, height=300, font=ctk.CTkFont(family="Consolas", size=10))
+        log_text = ctk.CTkTextbox(test_window, width=660, height=300, font=F(family="Consolas", size=10))
         log_text.pack(padx=20, pady=(0, 10))
         
         # 状态标签
         status_label = ctk.CTkLabel(
             test_window,
             text="⏳ 正在启动...",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         )
         status_label.pack(pady=5)
         
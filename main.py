@@ -1,19 +1,26 @@
 """DevManager - 本地开发项目管理面板 (GUI版)"""
 import customtkinter as ctk
+import tkinter as tk
 from tkinter import messagebox, filedialog
 import threading
+import queue
+from collections import deque
 import os
+import re
+import time
+from functools import partial
 from typing import Optional, Dict, List
 from enhanced_models import Project, ServiceConfig, enhanced_project_manager
 from process_manager import process_manager
-from process_scanner import scan_and_match, ExternalProcess
+from process_scanner import scan_and_match, ExternalProcess, process_scanner
 from project_detector import detect_project
-from port_manager import port_manager
+from port_manager import port_manager, get_service_port
 from port_manager_ui import PortManagerDialog
 from port_detector import port_detector
 from port_edit_dialog import PortEditDialog
 from enhanced_project_form import EnhancedProjectFormDialog
 from enhanced_logger import enhanced_logger
+from ui_fonts import F
 
 # 图标路径
 ICON_PATH = os.path.join(os.path.dirname(__file__), "icon.ico")
@@ -25,6 +32,18 @@ try:
 except:
     pass
 
+# ipconfig 解析：适配器标题行 + 其下缩进的详情行，一次扫描整个输出
+_ADAPTER_SECTION_RE = re.compile(
+    r'^(?P<adapter>\S[^\n]*(?:适配器|adapter)[^\n]*)\n(?P<body>(?:[ \t\r]*\n|[ \t][^\n]*\n?)*)',
+    re.MULTILINE | re.IGNORECASE
+)
+_IPV4_LINE_RE = re.compile(r'IPv4[^\n]*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
+_ADAPTER_KEYWORDS = ('以太网', 'Ethernet', 'WLAN', 'Wi-Fi', '无线')
+_ADAPTER_SKIP = ('虚拟', 'Virtual', 'VPN', 'VMware', 'VirtualBox', 'Hyper-V')
+
+# 服务类型显示名
+_SERVICE_LABEL = {"frontend": "前端", "backend": "后端"}
+
 # 设置主题 - 极简主义黑白灰
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
@@ -60,59 +79,50 @@ class ServiceFrame(ctk.CTkFrame):
 
         self.configure(fg_color=COLORS["bg_tertiary"], corner_radius=8, border_width=1, border_color=COLORS["border"])
 
-        # 单行布局：名称 | 命令 | 端口 | 状态 | 按钮
-        content = ctk.CTkFrame(self, fg_color="transparent")
-        content.pack(fill="x", padx=8, pady=6)
+        # 单行布局：名称 | 命令 | 端口 | 状态 | 按钮（所有控件直接grid在本Frame上）
+        self.grid_columnconfigure(5, weight=1)
+        cell = {"pady": 6}
 
         # 左侧：服务类型图标 + 名称
         icon_text = "🔷" if service_key == "backend" else "🔶"
         service_type = "后端" if service_key == "backend" else "前端"
         
         icon_label = ctk.CTkLabel(
-            content,
+            self,
             text=icon_text,
-            font=ctk.CTkFont(size=14),
+            font=F(size=14),
             width=30
         )
-        icon_label.pack(side="left")
+        icon_label.grid(row=0, column=0, padx=(8, 0), **cell)
         
         self.name_label = ctk.CTkLabel(
-            content,
+            self,
             text=f"{service_type} · {service.name or service_key}",
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=F(size=12, weight="bold"),
             text_color=COLORS["text_primary"],
             width=150,
             anchor="w"
         )
-        self.name_label.pack(side="left", padx=(5, 0))
+        self.name_label.grid(row=0, column=1, padx=(5, 0), **cell)
 
         # 命令（简短显示）
-        cmd_short = service.command[:35] + "..." if len(service.command) > 35 else service.command
         cmd_label = ctk.CTkLabel(
-            content,
-            text=cmd_short,
+            self,
+            text=service.cmd_short,
             text_color=COLORS["text_secondary"],
-            font=ctk.CTkFont(size=10, family="Consolas"),
+            font=F(size=10, family="Consolas"),
             width=200,
             anchor="w"
         )
-        cmd_label.pack(side="left", padx=(10, 0))
+        cmd_label.grid(row=0, column=2, padx=(10, 0), **cell)
 
         # 端口（带背景标签）
-        port = getattr(service, 'port', None) or (service.port_config.port if hasattr(service, 'port_config') and service.port_config else None)
+        port = get_service_port(service)
         original_port = None
         if hasattr(service, 'port_config') and service.port_config:
             original_port = service.port_config.original_port
         
         if port:
-            port_frame = ctk.CTkFrame(
-                content,
-                fg_color=COLORS["bg_secondary"],
-                corner_radius=4,
-                height=20
-            )
-            port_frame.pack(side="left", padx=(10, 0))
-            
             # 显示端口：如果有修改，显示"原始→当前"，否则只显示当前端口
             if original_port and original_port != port:
                 port_text = f":{original_port} → :{port}"
@@ -122,26 +132,28 @@ class ServiceFrame(ctk.CTkFrame):
                 text_color = COLORS["accent_blue"]
             
             port_label = ctk.CTkLabel(
-                port_frame,
+                self,
                 text=port_text,
                 text_color=text_color,
-                font=ctk.CTkFont(size=11, weight="bold", family="Consolas"),
+                fg_color=COLORS["bg_secondary"],
+                corner_radius=4,
+                font=F(size=11, weight="bold", family="Consolas"),
                 padx=8,
                 pady=2
             )
-            port_label.pack()
+            port_label.grid(row=0, column=3, padx=(10, 0), **cell)
             
             # 如果是前端服务，显示完整访问链接
             if self.service_key == "frontend" or "frontend" in self.service.name.lower():
                 url = f"http://localhost:{port}"
                 url_label = ctk.CTkLabel(
-                    content,
+                    self,
                     text=url,
                     text_color=COLORS["accent_blue"],
-                    font=ctk.CTkFont(size=10, family="Consolas", underline=True),
+                    font=F(size=10, family="Consolas", underline=True),
                     cursor="hand2"
                 )
-                url_label.pack(side="left", padx=(5, 0))
+                url_label.grid(row=0, column=4, padx=(5, 0), **cell)
                 
                 # 点击打开浏览器
                 def open_browser(event=None):
@@ -150,52 +162,48 @@ class ServiceFrame(ctk.CTkFrame):
                 
                 url_label.bind("<Button-1>", open_browser)
 
-        # 右侧按钮组
-        btn_frame = ctk.CTkFrame(content, fg_color="transparent")
-        btn_frame.pack(side="right")
-
-        # 状态标签（更现代的设计）
+        # 右侧：状态标签（第5列为弹性空白）
         self.status_label = ctk.CTkLabel(
-            btn_frame,
+            self,
             text="● 停止",
             text_color=COLORS["status_stopped"],
-            font=ctk.CTkFont(size=11, weight="bold"),
+            font=F(size=11, weight="bold"),
             width=60
         )
-        self.status_label.pack(side="left", padx=(0, 10))
+        self.status_label.grid(row=0, column=6, padx=(0, 10), **cell)
 
         self.start_btn = ctk.CTkButton(
-            btn_frame,
+            self,
             text="▶ 启动",
             width=65,
             height=28,
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             fg_color=COLORS["accent_green"],
             hover_color="#1a9d6f",
             corner_radius=6,
             command=self.start_service
         )
-        self.start_btn.pack(side="left", padx=(0, 6))
+        self.start_btn.grid(row=0, column=7, padx=(0, 6), **cell)
 
         self.stop_btn = ctk.CTkButton(
-            btn_frame,
+            self,
             text="■ 停止",
             width=65,
             height=28,
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             fg_color=COLORS["accent_red"],
             hover_color="#f5a397",
             corner_radius=6,
             command=self.stop_service
         )
-        self.stop_btn.pack(side="left", padx=(0, 6))
+        self.stop_btn.grid(row=0, column=8, padx=(0, 6), **cell)
 
         self.log_btn = ctk.CTkButton(
-            btn_frame,
+            self,
             text="📄 日志",
             width=65,
             height=28,
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             fg_color=COLORS["bg_secondary"],
             hover_color=COLORS["bg_hover"],
             border_width=1,
@@ -203,15 +211,15 @@ class ServiceFrame(ctk.CTkFrame):
             corner_radius=6,
             command=self.show_logs
         )
-        self.log_btn.pack(side="left", padx=(0, 6))
+        self.log_btn.grid(row=0, column=9, padx=(0, 6), **cell)
         
         # 打开文件位置按钮
         self.open_folder_btn = ctk.CTkButton(
-            btn_frame,
+            self,
             text="📂",
             width=35,
             height=28,
-            font=ctk.CTkFont(size=14),
+            font=F(size=14),
             fg_color=COLORS["bg_secondary"],
             hover_color=COLORS["bg_hover"],
             border_width=1,
@@ -219,16 +227,16 @@ class ServiceFrame(ctk.CTkFrame):
             corner_radius=6,
             command=self.open_file_location
         )
-        self.open_folder_btn.pack(side="left", padx=(0, 6))
+        self.open_folder_btn.grid(row=0, column=10, padx=(0, 6) if port else (0, 8), **cell)
         
         # 修改端口按钮
         if port:
             self.edit_port_btn = ctk.CTkButton(
-                btn_frame,
+                self,
                 text="⚙️",
                 width=35,
                 height=28,
-                font=ctk.CTkFont(size=14),
+                font=F(size=14),
                 fg_color=COLORS["bg_secondary"],
                 hover_color=COLORS["bg_hover"],
                 border_width=1,
@@ -236,10 +244,22 @@ class ServiceFrame(ctk.CTkFrame):
                 corner_radius=6,
                 command=self.edit_port
             )
-            self.edit_port_btn.pack(side="left")
+            self.edit_port_btn.grid(row=0, column=11, padx=(0, 8), **cell)
+
+        # 进程启动/退出时由 process_manager 通知，无需轮询
+        if getattr(self, "_status_callback", None) is None:
+            self._status_callback = lambda running: self.after(0, self.update_status)
+            process_manager.add_status_callback(self.project.id, self.service_key, self._status_callback)
 
         self.update_status()
 
+    def destroy(self):
+        """销毁时注销状态回调"""
+        if getattr(self, "_status_callback", None) is not None:
+            process_manager.remove_status_callback(self.project.id, self.service_key, self._status_callback)
+            self._status_callback = None
+        super().destroy()
+
     def start_service(self):
         """启动服务"""
         if not self.service.command:
@@ -247,7 +267,7 @@ class ServiceFrame(ctk.CTkFrame):
             return
 
         # 检查端口冲突
-        service_port = getattr(self.service, 'port', None) or (self.service.port_config.port if hasattr(self.service, 'port_config') and self.service.port_config else None)
+        service_port = get_service_port(self.service)
         if service_port:
             if not port_manager.is_port_available(service_port):
                 occupant = port_manager.get_port_occupant(service_port)
@@ -317,15 +337,12 @@ class ServiceFrame(ctk.CTkFrame):
             cwd,
             env_vars
         )
-        if success:
-            if service_port:
-                port_manager.update_last_used(service_port)
-            self.after(500, self.update_status)
+        if success and service_port:
+            port_manager.update_last_used(service_port)
 
     def stop_service(self):
         """停止服务"""
         process_manager.stop_service(self.project.id, self.service_key)
-        self.after(500, self.update_status)
 
     def show_logs(self):
         """显示日志窗口"""
@@ -361,7 +378,7 @@ class ServiceFrame(ctk.CTkFrame):
     def refresh_display(self):
         """刷新显示（端口修改后调用）"""
         # 更新端口显示
-        service_port = getattr(self.service, 'port', None) or (self.service.port_config.port if hasattr(self.service, 'port_config') and self.service.port_config else None)
+        service_port = get_service_port(self.service)
         if service_port:
             for widget in self.winfo_children():
                 widget.destroy()
@@ -372,25 +389,38 @@ class ServiceFrame(ctk.CTkFrame):
 class LogWindow(ctk.CTkToplevel):
     """日志查看窗口"""
 
+    MAX_LINES = 5000  # 文本框最多保留的日志行数
+
     def __init__(self, master, project: Project, service_key: str, service_name: str):
         super().__init__(master)
         self.project = project
         self.service_key = service_key
         self._is_alive = True  # 标记窗口是否存活
+        self._line_count = 0
+        self._queue = deque(maxlen=10000)  # 后台线程写入的待显示日志
 
         self.title(f"日志 - {project.name} / {service_name}")
         self.geometry("800x500")
         self.configure(fg_color="#1a1a1a")
 
-        # 日志文本框
-        self.log_text = ctk.CTkTextbox(
-            self,
-            font=ctk.CTkFont(family="Consolas", size=12),
-            fg_color="#0d0d0d",
-            text_color="#00ff00",
-            corner_radius=8
+        # 日志文本框（直接使用 tk.Text，避免 CTkTextbox 每次插入的包装开销）
+        text_frame = ctk.CTkFrame(self, fg_color="#0d0d0d", corner_radius=8)
+        text_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.log_text = tk.Text(
+            text_frame,
+            bg="#0d0d0d",
+            fg="#00ff00",
+            font=("Consolas", 12),
+            insertbackground="#00ff00",
+            borderwidth=0,
+            highlightthickness=0,
+            wrap="char"
         )
-        self.log_text.pack(fill="both", expand=True, padx=10, pady=10)
+        scrollbar = ctk.CTkScrollbar(text_frame, command=self.log_text.yview)
+        self.log_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y", padx=(0, 4), pady=6)
+        self.log_text.pack(side="left", fill="both", expand=True, padx=(8, 0), pady=8)
 
         # 底部按钮
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -413,41 +443,70 @@ class LogWindow(ctk.CTkToplevel):
         # 加载历史日志
         self.load_logs()
 
-        # 注册日志回调
-        self.log_callback = self.on_new_log
-        process_manager.add_log_callback(self.project.id, self.service_key, self.log_callback)
+        # 注册批量日志回调
+        self.log_callback = self.on_new_logs
+        process_manager.add_log_batch_callback(self.project.id, self.service_key, self.log_callback)
+
+        # 定时批量刷新日志
+        self.after(50, self._drain)
 
     def load_logs(self):
         """加载历史日志"""
         logs = process_manager.get_logs(self.project.id, self.service_key)
         if logs:
-            for line in logs:
-                self.log_text.insert("end", line + "\n")
+            # 一次性插入，避免逐行调用Tk
+            self.log_text.insert("end", "\n".join(logs) + "\n")
+            self._line_count = len(logs)
+            self._trim_lines()
             self.log_text.see("end")
+        # 只读显示，追加时临时切换为可写
+        self.log_text.configure(state="disabled")
 
-    def on_new_log(self, line: str):
-        """新日志回调"""
+    def on_new_logs(self, lines: List[str]):
+        """新日志回调（后台线程，整批入队）"""
         if self._is_alive:
-            self.after(0, lambda: self._append_log(line))
+            self._queue.extend(lines)
 
-    def _append_log(self, line: str):
-        """追加日志（主线程）"""
+    def _drain(self):
+        """批量追加队列中的日志（主线程，每50ms一次）"""
         if not self._is_alive:
             return
-        try:
-            self.log_text.insert("end", line + "\n")
-            self.log_text.see("end")
-        except Exception:
-            pass  # 窗口已销毁
+        lines = []
+        while self._queue:
+            lines.append(self._queue.popleft())
+        if lines:
+            try:
+                # 仅当用户停留在底部时才自动滚动，向上翻看历史时不打扰
+                at_bottom = self.log_text.yview()[1] > 0.999
+                self.log_text.configure(state="normal")
+                self.log_text.insert("end", "\n".join(lines) + "\n")
+                self._line_count += len(lines)
+                self._trim_lines()
+                self.log_text.configure(state="disabled")
+                if at_bottom:
+                    self.log_text.see("end")
+            except Exception:
+                return  # 窗口已销毁
+        self.after(50, self._drain)
+
+    def _trim_lines(self):
+        """超过最大行数时删除最早的日志"""
+        excess = self._line_count - self.MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._line_count = self.MAX_LINES
 
     def clear_logs(self):
         """清空日志"""
+        self.log_text.configure(state="normal")
         self.log_text.delete("1.0", "end")
+        self.log_text.configure(state="disabled")
+        self._line_count = 0
 
     def on_close(self):
         """关闭窗口"""
         self._is_alive = False
-        process_manager.remove_log_callback(self.project.id, self.service_key, self.log_callback)
+        process_manager.remove_log_batch_callback(self.project.id, self.service_key, self.log_callback)
         self.destroy()
 
 
@@ -467,6 +526,46 @@ class ProjectCard(ctk.CTkFrame):
             border_color=COLORS["border"]
         )
 
+        self._build()
+
+    @staticmethod
+    def _signature(project: Project) -> str:
+        """卡片布局签名（服务配置或是否有描述变化时需要重建）"""
+        services = {k: v.to_dict() for k, v in project.services.items()}
+        return repr((services, bool(project.description)))
+
+    def update_from(self, project: Project):
+        """复用卡片：布局未变化时只更新变化的文本，否则只重建本卡片内容"""
+        old_project, self.project = self.project, project
+        if self._signature(project) != self._sig:
+            for widget in self.winfo_children():
+                widget.destroy()
+            self._build()
+            return
+
+        for widget in self.service_widgets:
+            widget.project = project
+        if project is not old_project:
+            self._edit_btn.configure(command=partial(self.on_edit, project))
+            self._delete_btn.configure(command=partial(self.on_delete, project))
+
+        # 仅在文本变化时写入Tk
+        texts = [
+            (self._name_label, project.name),
+            (self._path_label, f"� {project.path}"),
+        ]
+        if self._desc_label is not None:
+            texts.append((self._desc_label, project.description))
+        for widget, text in texts:
+            if widget.cget("text") != text:
+                widget.configure(text=text)
+
+    def _build(self):
+        """构建卡片内容"""
+        project = self.project
+        self._sig = self._signature(project)
+        self._desc_label = None
+
         # 项目头部
         header = ctk.CTkFrame(self, fg_color="transparent")
         header.pack(fill="x", padx=15, pady=(15, 10))
@@ -478,17 +577,18 @@ class ProjectCard(ctk.CTkFrame):
         project_icon = ctk.CTkLabel(
             name_frame,
             text="📁",
-            font=ctk.CTkFont(size=20)
+            font=F(size=20)
         )
         project_icon.pack(side="left", padx=(0, 8))
         
         name_label = ctk.CTkLabel(
             name_frame,
             text=project.name,
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=F(size=18, weight="bold"),
             text_color=COLORS["text_primary"]
         )
         name_label.pack(side="left")
+        self._name_label = name_label
 
         # 操作按钮
         btn_frame = ctk.CTkFrame(header, fg_color="transparent")
@@ -499,7 +599,7 @@ class ProjectCard(ctk.CTkFrame):
             text="▶ 全部启动",
             width=95,
             height=32,
-            font=ctk.CTkFont(size=11, weight="bold"),
+            font=F(size=11, weight="bold"),
             fg_color=COLORS["accent_green"],
             hover_color="#1a9d6f",
             corner_radius=6,
@@ -511,36 +611,38 @@ class ProjectCard(ctk.CTkFrame):
             text="■ 全部停止",
             width=95,
             height=32,
-            font=ctk.CTkFont(size=11, weight="bold"),
+            font=F(size=11, weight="bold"),
             fg_color=COLORS["accent_orange"],
             hover_color="#d4a183",
             corner_radius=6,
             command=self.stop_all_services
         ).pack(side="left", padx=(0, 6))
 
-        ctk.CTkButton(
+        self._edit_btn = ctk.CTkButton(
             btn_frame,
             text="✏️ 编辑",
             width=70,
             height=32,
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             fg_color=COLORS["accent_blue"],
             hover_color="#0098ee",
             corner_radius=6,
-            command=lambda: on_edit(project)
-        ).pack(side="left", padx=(0, 6))
+            command=partial(self.on_edit, project)
+        )
+        self._edit_btn.pack(side="left", padx=(0, 6))
 
-        ctk.CTkButton(
+        self._delete_btn = ctk.CTkButton(
             btn_frame,
             text="🗑️ 删除",
             width=70,
             height=32,
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             fg_color=COLORS["accent_red"],
             hover_color="#f5a397",
             corner_radius=6,
-            command=lambda: on_delete(project)
-        ).pack(side="left")
+            command=partial(self.on_delete, project)
+        )
+        self._delete_btn.pack(side="left")
 
         # 项目描述
         if project.description:
@@ -548,9 +650,10 @@ class ProjectCard(ctk.CTkFrame):
                 self,
                 text=project.description,
                 text_color=COLORS["text_secondary"],
-                font=ctk.CTkFont(size=12)
+                font=F(size=12)
             )
             desc_label.pack(anchor="w", padx=15, pady=(0, 5))
+            self._desc_label = desc_label
 
         # 项目路径（带背景）
         path_frame = ctk.CTkFrame(
@@ -565,104 +668,107 @@ class ProjectCard(ctk.CTkFrame):
             path_frame,
             text=f"� {project.path}",
             text_color=COLORS["text_secondary"],
-            font=ctk.CTkFont(size=10, family="Consolas"),
+            font=F(size=10, family="Consolas"),
             anchor="w"
         )
         path_label.pack(fill="x", padx=10, pady=6)
+        self._path_label = path_label
+
+        # 服务列表（没有启用的服务时不创建容器）
+        self.service_widgets = []
+        enabled = project.enabled_services
+        if not enabled:
+            return
 
-        # 服务列表
         self.services_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.services_frame.pack(fill="x", padx=15, pady=(0, 15))
 
-        self.service_widgets = []
-        for key, service in project.services.items():
-            if service.enabled:
-                service_frame = ServiceFrame(self.services_frame, project, key, service)
-                service_frame.pack(fill="x", pady=(0, 8))
-                self.service_widgets.append(service_frame)
+        for key, service in enabled:
+            service_frame = ServiceFrame(self.services_frame, project, key, service)
+            service_frame.pack(fill="x", pady=(0, 8))
+            self.service_widgets.append(service_frame)
 
     def start_all_services(self):
         """启动所有服务"""
         # 按顺序启动：先后端，后前端
         services_order = ["backend", "frontend"]
-        for service_key in services_order:
-            service = self.project.services.get(service_key)
-            if service and service.enabled and service.command:
-                # 检查端口冲突
-                service_port = getattr(service, 'port', None) or (service.port_config.port if hasattr(service, 'port_config') and service.port_config else None)
-                if service_port and not port_manager.is_port_available(service_port):
-                    occupant = port_manager.get_port_occupant(service_port)
-                    if occupant:
-                        msg = f"端口 {service_port} ({service.name}) 已被占用\n\n进程: {occupant['name']} (PID: {occupant['pid']})\n\n跳过此服务？"
-                        if not messagebox.askyesno("端口冲突", msg):
-                            continue
+        # 多个服务的端口记录合并为一次写盘
+        with port_manager.batch():
+            for service_key in services_order:
+                service = self.project.services.get(service_key)
+                if service and service.enabled and service.command:
+                    # 检查端口冲突
+                    service_port = get_service_port(service)
+                    if service_port and not port_manager.is_port_available(service_port):
+                        occupant = port_manager.get_port_occupant(service_port)
+                        if occupant:
+                            msg = f"端口 {service_port} ({service.name}) 已被占用\n\n进程: {occupant['name']} (PID: {occupant['pid']})\n\n跳过此服务？"
+                            if not messagebox.askyesno("端口冲突", msg):
+                                continue
                 
-                # 生成实际的启动命令（使用command_template并替换变量）
-                actual_command = service.command
-                command_has_placeholders = (
-                    isinstance(service.command, str)
-                    and '{' in service.command
-                    and '}' in service.command
-                )
-                if (
-                    command_has_placeholders
-                    and hasattr(service, 'command_template')
-                    and service.command_template
-                    and (
-                        '{port}' in service.command_template
-                        or '{python_env}' in service.command_template
+                    # 生成实际的启动命令（使用command_template并替换变量）
+                    actual_command = service.command
+                    command_has_placeholders = (
+                        isinstance(service.command, str)
+                        and '{' in service.command
+                        and '}' in service.command
                     )
-                ):
-                    # 准备替换变量
-                    replacements = {}
-                    if service_port:
-                        replacements['port'] = str(service_port)
-                    if hasattr(service, 'python_env') and service.python_env:
-                        replacements['python_env'] = f'"{service.python_env.path}"'
+                    if (
+                        command_has_placeholders
+                        and hasattr(service, 'command_template')
+                        and service.command_template
+                        and (
+                            '{port}' in service.command_template
+                            or '{python_env}' in service.command_template
+                        )
+                    ):
+                        # 准备替换变量
+                        replacements = {}
+                        if service_port:
+                            replacements['port'] = str(service_port)
+                        if hasattr(service, 'python_env') and service.python_env:
+                            replacements['python_env'] = f'"{service.python_env.path}"'
                     
-                    # 替换模板中的变量
-                    actual_command = service.command_template
-                    for key, value in replacements.items():
-                        actual_command = actual_command.replace(f'{{{key}}}', value)
-                
-                # 启动服务
-                cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None) or self.project.path
-                env_vars = getattr(service, 'env', None) or getattr(service, 'env_vars', {})
-                if env_vars is None:
-                    env_vars = {}
+                        # 替换模板中的变量
+                        actual_command = service.command_template
+                        for key, value in replacements.items():
+                            actual_command = actual_command.replace(f'{{{key}}}', value)
                 
-                # 为不同类型的服务添加端口环境变量
-                if service_port:
-                    if service_key == "frontend" or "frontend" in service.name.lower():
-                        # 前端服务：添加PORT环境变量（适配Create React App等）
-                        env_vars['PORT'] = str(service_port)
-                    elif service_key == "backend" or "backend" in service.name.lower():
-                        # 后端服务：添加FLASK_RUN_PORT环境变量（适配Flask）
-                        tech_stack = getattr(service, 'tech_stack', '').lower()
-                        if 'flask' in tech_stack:
-                            env_vars['FLASK_RUN_PORT'] = str(service_port)
-                process_manager.start_service(
-                    self.project.id,
-                    service_key,
-                    actual_command,
-                    cwd,
-                    env_vars
-                )
+                    # 启动服务
+                    cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None) or self.project.path
+                    env_vars = getattr(service, 'env', None) or getattr(service, 'env_vars', {})
+                    if env_vars is None:
+                        env_vars = {}
                 
-                # 更新端口记录
-                if service_port:
-                    tech_stack = port_manager.detect_tech_stack(service.command, cwd)
-                    port_manager.allocate_port(
-                        service_port,
+                    # 为不同类型的服务添加端口环境变量
+                    if service_port:
+                        if service_key == "frontend" or "frontend" in service.name.lower():
+                            # 前端服务：添加PORT环境变量（适配Create React App等）
+                            env_vars['PORT'] = str(service_port)
+                        elif service_key == "backend" or "backend" in service.name.lower():
+                            # 后端服务：添加FLASK_RUN_PORT环境变量（适配Flask）
+                            tech_stack = getattr(service, 'tech_stack', '').lower()
+                            if 'flask' in tech_stack:
+                                env_vars['FLASK_RUN_PORT'] = str(service_port)
+                    process_manager.start_service(
                         self.project.id,
-                        self.project.name,
                         service_key,
-                        service.name or service_key,
-                        tech_stack
+                        actual_command,
+                        cwd,
+                        env_vars
                     )
-        
-        # 延迟更新UI
-        self.after(500, self.update_all_status)
+                
+                    # 更新端口记录
+                    if service_port:
+                        tech_stack = port_manager.detect_tech_stack(service.command, cwd)
+                        port_manager.allocate_port(
+                            service_port,
+                            self.project.id,
+                            self.project.name,
+                            service_key,
+                            service.name or service_key,
+                            tech_stack
+                        )
 
     def stop_all_services(self):
         """停止所有服务"""
@@ -672,9 +778,6 @@ class ProjectCard(ctk.CTkFrame):
             service = self.project.services.get(service_key)
             if service and service.enabled:
                 process_manager.stop_service(self.project.id, service_key)
-        
-        # 延迟更新UI
-        self.after(500, self.update_all_status)
 
     def update_all_status(self):
         """更新所有服务状态"""
@@ -691,6 +794,12 @@ class ProjectFormDialog(ctk.CTkToplevel):
         self.on_save = on_save
         self.is_edit = project is not None
 
+        # 智能建议缓存：技术栈按 (命令, 目录) 缓存，端口探测结果短时缓存
+        self._tech_stack_cache: Dict[tuple, str] = {}
+        self._port_probe_cache: Dict[int, tuple] = {}
+        # 自动检测的轮次，只接受最新一轮的结果
+        self._detect_gen = 0
+
         self.title("编辑项目" if self.is_edit else "添加项目")
         self.geometry("600x700")
         self.configure(fg_color="#1a1a1a")
@@ -725,6 +834,8 @@ class ProjectFormDialog(ctk.CTkToplevel):
             width=55,
             command=self.browse_path
         ).pack(side="left", padx=(5, 0))
+        self.detect_status_label = ctk.CTkLabel(path_frame, text="", text_color="#888888")
+        self.detect_status_label.pack(side="left", padx=(8, 0))
 
         # 后端服务
         self._create_section("后端服务")
@@ -750,7 +861,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
             port_label_frame,
             text="",
             text_color="#888888",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         )
         self.backend_port_hint.pack(side="left", padx=10)
         
@@ -765,7 +876,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
             height=24,
             fg_color="#6c757d",
             hover_color="#5a6268",
-            command=lambda: self._suggest_port("backend")
+            command=partial(self._suggest_port, "backend")
         ).pack(side="left", padx=5)
 
         # 前端服务
@@ -792,7 +903,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
             port_label_frame2,
             text="",
             text_color="#888888",
-            font=ctk.CTkFont(size=10)
+            font=F(size=10)
         )
         self.frontend_port_hint.pack(side="left", padx=10)
         
@@ -807,7 +918,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
             height=24,
             fg_color="#6c757d",
             hover_color="#5a6268",
-            command=lambda: self._suggest_port("frontend")
+            command=partial(self._suggest_port, "frontend")
         ).pack(side="left", padx=5)
 
         # 底部按钮
@@ -832,6 +943,19 @@ class ProjectFormDialog(ctk.CTkToplevel):
             command=self.save
         ).pack(side="right", padx=(0, 10))
 
+        # 按服务类型索引表单控件
+        self._service_widgets = {
+            key: {
+                "enabled": getattr(self, f"{key}_enabled"),
+                "name": getattr(self, f"{key}_name"),
+                "cmd": getattr(self, f"{key}_cmd"),
+                "cwd": getattr(self, f"{key}_cwd"),
+                "port": getattr(self, f"{key}_port"),
+                "hint": getattr(self, f"{key}_port_hint"),
+            }
+            for key in ("backend", "frontend")
+        }
+
         # 填充数据
         if self.is_edit:
             self._fill_data()
@@ -841,7 +965,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
         label = ctk.CTkLabel(
             self.scroll_frame,
             text=title,
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=F(size=16, weight="bold")
         )
         label.pack(anchor="w", pady=(20, 0))
         separator = ctk.CTkFrame(self.scroll_frame, height=2, fg_color="#333333")
@@ -887,46 +1011,43 @@ class ProjectFormDialog(ctk.CTkToplevel):
             self._auto_detect(path)
 
     def _auto_detect(self, path: str):
-        """自动检测项目结构并填充表单"""
+        """自动检测项目结构并填充表单（后台线程检测）"""
+        self._detect_gen += 1
+        gen = self._detect_gen
+        self.detect_status_label.configure(text="检测中...")
+        threading.Thread(target=lambda: self._detect_worker(path, gen), daemon=True).start()
+
+    def _detect_worker(self, path: str, gen: int):
+        """后台执行项目检测"""
         try:
             detected = detect_project(path)
-            
+        except Exception as e:
+            print(f"检测失败: {e}")
+            detected = None
+        try:
+            self.after(0, self._apply_detected, gen, detected)
+        except (RuntimeError, tk.TclError):
+            # 对话框已关闭
+            pass
+
+    def _apply_detected(self, gen: int, detected):
+        """用检测结果填充表单（主线程），忽略已被新一轮检测取代的结果"""
+        if gen != self._detect_gen or not self.winfo_exists():
+            return
+        self.detect_status_label.configure(text="")
+        if detected is None:
+            return
+        try:
             # 填充项目名称（如果为空）
             if not self.name_entry.get().strip():
                 self.name_entry.delete(0, "end")
                 self.name_entry.insert(0, detected.name)
 
-            # 填充后端服务
+            # 填充后端/前端服务
             if detected.backend:
-                self.backend_enabled.select()
-                self._clear_and_insert(self.backend_name, detected.backend.name)
-                self._clear_and_insert(self.backend_cmd, detected.backend.command)
-                self._clear_and_insert(self.backend_cwd, detected.backend.cwd)
-                if detected.backend.port:
-                    self._clear_and_insert(self.backend_port, str(detected.backend.port))
-                    # 显示端口来源
-                    if detected.backend.port_source:
-                        confidence_text = f"{detected.backend.port_confidence*100:.0f}%"
-                        hint_text = f"来源: {detected.backend.port_source} (置信度: {confidence_text})"
-                        if detected.backend.env_var:
-                            hint_text += f" [环境变量: {detected.backend.env_var}]"
-                        self.backend_port_hint.configure(text=hint_text, text_color="#4ec9b0")
-            
-            # 填充前端服务
+                self._apply_detected_service("backend", detected.backend)
             if detected.frontend:
-                self.frontend_enabled.select()
-                self._clear_and_insert(self.frontend_name, detected.frontend.name)
-                self._clear_and_insert(self.frontend_cmd, detected.frontend.command)
-                self._clear_and_insert(self.frontend_cwd, detected.frontend.cwd)
-                if detected.frontend.port:
-                    self._clear_and_insert(self.frontend_port, str(detected.frontend.port))
-                    # 显示端口来源
-                    if detected.frontend.port_source:
-                        confidence_text = f"{detected.frontend.port_confidence*100:.0f}%"
-                        hint_text = f"来源: {detected.frontend.port_source} (置信度: {confidence_text})"
-                        if detected.frontend.env_var:
-                            hint_text += f" [环境变量: {detected.frontend.env_var}]"
-                        self.frontend_port_hint.configure(text=hint_text, text_color="#4ec9b0")
+                self._apply_detected_service("frontend", detected.frontend)
 
             # 显示检测结果提示
             msg_parts = []
@@ -943,11 +1064,37 @@ class ProjectFormDialog(ctk.CTkToplevel):
         except Exception as e:
             print(f"检测失败: {e}")
 
+    def _apply_detected_service(self, key: str, svc):
+        """用检测结果填充指定服务的表单"""
+        widgets = self._service_widgets[key]
+        widgets["enabled"].select()
+        self._clear_and_insert(widgets["name"], svc.name)
+        self._clear_and_insert(widgets["cmd"], svc.command)
+        self._clear_and_insert(widgets["cwd"], svc.cwd)
+        if svc.port:
+            self._clear_and_insert(widgets["port"], str(svc.port))
+            # 显示端口来源
+            if svc.port_source:
+                hint_text = self._format_port_hint(svc.port_source, svc.port_confidence, svc.env_var)
+                widgets["hint"].configure(text=hint_text, text_color="#4ec9b0")
+
+    @staticmethod
+    def _format_port_hint(port_source: str, port_confidence: float, env_var: Optional[str]) -> str:
+        """生成端口来源提示文本"""
+        base = f"来源: {port_source} (置信度: {port_confidence*100:.0f}%)"
+        return base + (f" [环境变量: {env_var}]" if env_var else "")
+
     def _clear_and_insert(self, entry, value: str):
         """清空并插入值"""
         entry.delete(0, "end")
         entry.insert(0, value)
 
+    @staticmethod
+    def _parse_port(entry) -> Optional[int]:
+        """解析端口输入框，非数字返回None"""
+        s = entry.get().strip()
+        return int(s) if s.isdigit() else None
+
     def _suggest_port(self, service_type: str):
         """智能建议端口"""
         if service_type == "backend":
@@ -965,17 +1112,17 @@ class ProjectFormDialog(ctk.CTkToplevel):
             messagebox.showwarning("提示", f"请先填写{service_type}服务的启动命令")
             return
         
-        # 检测技术栈
-        tech_stack = port_manager.detect_tech_stack(cmd, cwd)
+        # 检测技术栈（命令和目录不变时复用上次结果）
+        key = (cmd, cwd)
+        tech_stack = self._tech_stack_cache.get(key)
+        if tech_stack is None:
+            tech_stack = self._tech_stack_cache.setdefault(key, port_manager.detect_tech_stack(cmd, cwd))
         
         # 获取已使用的端口
-        used_ports = set()
-        backend_port_str = self.backend_port.get().strip()
-        if backend_port_str.isdigit():
-            used_ports.add(int(backend_port_str))
-        frontend_port_str = self.frontend_port.get().strip()
-        if frontend_port_str.isdigit():
-            used_ports.add(int(frontend_port_str))
+        used_ports = {
+            p for p in (self._parse_port(self.backend_port), self._parse_port(self.frontend_port))
+            if p is not None
+        }
         
         # 建议端口
         try:
@@ -983,7 +1130,7 @@ class ProjectFormDialog(ctk.CTkToplevel):
             suggested_port = port_manager.suggest_port(tech_stack, project_id, used_ports)
             
             # 检查是否可用
-            is_available = port_manager.is_port_available(suggested_port)
+            is_available, occupant = self._probe_port(suggested_port)
             
             # 填充端口
             port_entry.delete(0, "end")
@@ -997,7 +1144,6 @@ class ProjectFormDialog(ctk.CTkToplevel):
             )
             
             if not is_available:
-                occupant = port_manager.get_port_occupant(suggested_port)
                 if occupant:
                     messagebox.showwarning(
                         "端口已占用",
@@ -1008,6 +1154,17 @@ class ProjectFormDialog(ctk.CTkToplevel):
         except Exception as e:
             messagebox.showerror("错误", f"端口建议失败: {e}")
 
+    def _probe_port(self, port: int, ttl: float = 1.0):
+        """探测端口可用性及占用进程（短时缓存，避免连续点击重复探测）"""
+        now = time.monotonic()
+        cached = self._port_probe_cache.get(port)
+        if cached and now - cached[0] < ttl:
+            return cached[1], cached[2]
+        
+        is_available, occupant = port_manager.check_port(port)
+        self._port_probe_cache[port] = (now, is_available, occupant)
+        return is_available, occupant
+
     def save(self):
         """保存项目"""
         name = self.name_entry.get().strip()
@@ -1034,23 +1191,21 @@ class ProjectFormDialog(ctk.CTkToplevel):
             )
 
         # 后端服务
-        backend_port = self.backend_port.get().strip()
         project.services["backend"] = ServiceConfig(
             enabled=self.backend_enabled.get(),
             name=self.backend_name.get().strip() or "后端服务",
             command=self.backend_cmd.get().strip(),
             cwd=self.backend_cwd.get().strip(),
-            port=int(backend_port) if backend_port.isdigit() else None
+            port=self._parse_port(self.backend_port)
         )
 
         # 前端服务
-        frontend_port = self.frontend_port.get().strip()
         project.services["frontend"] = ServiceConfig(
             enabled=self.frontend_enabled.get(),
             name=self.frontend_name.get().strip() or "前端服务",
             cwd=self.frontend_cwd.get().strip(),
             command=self.frontend_cmd.get().strip(),
-            port=int(frontend_port) if frontend_port.isdigit() else None
+            port=self._parse_port(self.frontend_port)
         )
 
         if self.on_save:
@@ -1071,11 +1226,28 @@ class DevManagerApp(ctk.CTk):
 
         # 设置窗口图标
         if os.path.exists(ICON_PATH):
-            self.iconbitmap(ICON_PATH)
-            self.after(100, lambda: self.iconbitmap(ICON_PATH))  # 确保图标生效
+            try:
+                self.iconbitmap(ICON_PATH)
+            except Exception:
+                # 首次设置失败时再延迟重试一次
+                self.after(100, partial(self.iconbitmap, ICON_PATH))
 
         self.project_manager = enhanced_project_manager
 
+        # 端口冲突检查的防抖与结果缓存
+        self._conflict_after_id = None
+        self._last_projects_sig = None
+        self._last_check_ts = 0.0
+        self._last_conflicts = []
+        self._conflict_check_running = False
+        self._conflict_check_pending = False
+
+        # 项目卡片复用
+        self._card_by_id: Dict[str, ProjectCard] = {}
+        self._card_order: List[str] = []  # 当前已排列的卡片对应的项目ID（按显示顺序）
+        self._empty_frame = None
+        self._build_after_id = None
+
         # 顶部栏（更现代的设计）
         header = ctk.CTkFrame(
             self,
@@ -1094,7 +1266,7 @@ class DevManagerApp(ctk.CTk):
         title_label = ctk.CTkLabel(
             title_frame,
             text="⚡ DevManager",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=F(size=24, weight="bold"),
             text_color=COLORS["text_primary"]
         )
         title_label.pack(side="left")
@@ -1102,7 +1274,7 @@ class DevManagerApp(ctk.CTk):
         version_label = ctk.CTkLabel(
             title_frame,
             text="Pro",
-            font=ctk.CTkFont(size=10, weight="bold"),
+            font=F(size=10, weight="bold"),
             text_color=COLORS["accent_blue"],
             fg_color=COLORS["bg_tertiary"],
             corner_radius=4,
@@ -1117,7 +1289,7 @@ class DevManagerApp(ctk.CTk):
             ip_label = ctk.CTkLabel(
                 title_frame,
                 text=f"🌐 {ipv4}",
-                font=ctk.CTkFont(size=11, family="Consolas"),
+                font=F(size=11, family="Consolas"),
                 text_color=COLORS["text_secondary"],
                 fg_color=COLORS["bg_tertiary"],
                 corner_radius=4,
@@ -1131,7 +1303,7 @@ class DevManagerApp(ctk.CTk):
             header,
             text="",
             text_color="#ffffff",
-            font=ctk.CTkFont(size=11, weight="bold"),
+            font=F(size=11, weight="bold"),
             fg_color=COLORS["accent_red"],
             corner_radius=6,
             padx=12,
@@ -1143,49 +1315,46 @@ class DevManagerApp(ctk.CTk):
         btn_container = ctk.CTkFrame(header, fg_color="transparent")
         btn_container.pack(side="right", padx=20, pady=15)
         
+        # 按钮公共样式
+        base_btn_kwargs = dict(
+            height=42,
+            corner_radius=10,
+            fg_color=COLORS["bg_tertiary"],
+            hover_color=COLORS["bg_hover"],
+            border_width=1,
+            border_color=COLORS["border"]
+        )
+
+        def _mkbtn(**overrides):
+            return ctk.CTkButton(btn_container, **{**base_btn_kwargs, **overrides})
+        
         # 添加项目按钮 - 主要操作
-        add_btn = ctk.CTkButton(
-            btn_container,
+        add_btn = _mkbtn(
             text="+ 添加项目",
             width=130,
-            height=42,
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=F(size=13, weight="bold"),
             fg_color=COLORS["cta_blue"],
             hover_color=COLORS["accent_blue"],
-            corner_radius=10,
+            border_width=0,
             command=self.add_project
         )
         add_btn.pack(side="right", padx=(10, 0))
 
         # 端口管理按钮
-        port_manager_btn = ctk.CTkButton(
-            btn_container,
+        port_manager_btn = _mkbtn(
             text="端口管理",
             width=110,
-            height=42,
-            font=ctk.CTkFont(size=12),
-            fg_color=COLORS["bg_tertiary"],
-            hover_color=COLORS["bg_hover"],
+            font=F(size=12),
             text_color=COLORS["text_primary"],
-            border_width=1,
-            border_color=COLORS["border"],
-            corner_radius=10,
             command=self.open_port_manager
         )
         port_manager_btn.pack(side="right", padx=(10, 0))
         
         # 刷新按钮
-        refresh_btn = ctk.CTkButton(
-            btn_container,
+        refresh_btn = _mkbtn(
             text="🔄",
             width=42,
-            height=42,
-            font=ctk.CTkFont(size=16),
-            fg_color=COLORS["bg_tertiary"],
-            hover_color=COLORS["bg_hover"],
-            border_width=1,
-            border_color=COLORS["border"],
-            corner_radius=10,
+            font=F(size=16),
             command=self.refresh_projects
         )
         refresh_btn.pack(side="right")
@@ -1211,60 +1380,108 @@ class DevManagerApp(ctk.CTk):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def refresh_projects(self):
-        """刷新项目列表"""
-        # 清空现有内容
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-
+        """刷新项目列表（按项目ID复用已有卡片）"""
         projects = self.project_manager.get_all()
 
+        # 取消尚未完成的上一轮构建
+        if self._build_after_id:
+            self.after_cancel(self._build_after_id)
+            self._build_after_id = None
+
+        # 销毁已删除项目的卡片
+        live_ids = {p.id for p in projects}
+        for project_id in [pid for pid in self._card_by_id if pid not in live_ids]:
+            self._card_by_id.pop(project_id).destroy()
+        self._card_order = [pid for pid in self._card_order if pid in live_ids]
+
         if not projects:
-            # 空状态设计
-            empty_frame = ctk.CTkFrame(
-                self.scroll_frame,
-                fg_color=COLORS["bg_tertiary"],
-                corner_radius=12,
-                border_width=2,
-                border_color=COLORS["border"]
-            )
-            empty_frame.pack(pady=100, padx=50)
-            
-            empty_icon = ctk.CTkLabel(
-                empty_frame,
-                text="📦",
-                font=ctk.CTkFont(size=48)
-            )
-            empty_icon.pack(pady=(40, 10))
-            
-            empty_label = ctk.CTkLabel(
-                empty_frame,
-                text="暂无项目",
-                text_color=COLORS["text_primary"],
-                font=ctk.CTkFont(size=18, weight="bold")
-            )
-            empty_label.pack(pady=(0, 5))
-            
-            empty_hint = ctk.CTkLabel(
-                empty_frame,
-                text="点击右上角「+ 添加项目」开始管理你的开发项目",
-                text_color=COLORS["text_secondary"],
-                font=ctk.CTkFont(size=12)
-            )
-            empty_hint.pack(pady=(0, 40))
+            self._show_empty_state()
             return
 
+        if self._empty_frame is not None:
+            self._empty_frame.destroy()
+            self._empty_frame = None
+
+        # 已有卡片立即更新内容
         for project in projects:
-            card = ProjectCard(
-                self.scroll_frame,
-                project,
-                on_edit=self.edit_project,
-                on_delete=self.delete_project
-            )
+            card = self._card_by_id.get(project.id)
+            if card:
+                card.update_from(project)
+
+        # 顺序未变的前缀保持原样，只重新排列其后的卡片，避免整个列表闪烁
+        keep = 0
+        for project_id, project in zip(self._card_order, projects):
+            if project_id != project.id:
+                break
+            keep += 1
+        for project_id in self._card_order[keep:]:
+            self._card_by_id[project_id].pack_forget()
+        del self._card_order[keep:]
+        self._build_cards_chunk(projects, keep)
+
+    def _build_cards_chunk(self, projects: List[Project], start: int = 0, batch: int = 5):
+        """从 start 起按顺序排列卡片，已有卡片直接排列，新卡片每批最多构建 batch 个，剩余部分通过after继续"""
+        self._build_after_id = None
+        built = 0
+        for index in range(start, len(projects)):
+            project = projects[index]
+            card = self._card_by_id.get(project.id)
+            if card is None:
+                if built >= batch:
+                    self._build_after_id = self.after(1, lambda: self._build_cards_chunk(projects, index, batch))
+                    return
+                card = ProjectCard(
+                    self.scroll_frame,
+                    project,
+                    on_edit=self.edit_project,
+                    on_delete=self.delete_project
+                )
+                self._card_by_id[project.id] = card
+                built += 1
             card.pack(fill="x", pady=(0, 20))
-        
-        # 刷新后检查冲突
+            self._card_order.append(project.id)
+        # 全部完成后检查冲突
         self.check_port_conflicts()
 
+    def _show_empty_state(self):
+        """显示空状态"""
+        if self._empty_frame is not None:
+            return
+
+        # 空状态设计
+        empty_frame = ctk.CTkFrame(
+            self.scroll_frame,
+            fg_color=COLORS["bg_tertiary"],
+            corner_radius=12,
+            border_width=2,
+            border_color=COLORS["border"]
+        )
+        empty_frame.pack(pady=100, padx=50)
+        self._empty_frame = empty_frame
+        
+        empty_icon = ctk.CTkLabel(
+            empty_frame,
+            text="📦",
+            font=F(size=48)
+        )
+        empty_icon.pack(pady=(40, 10))
+        
+        empty_label = ctk.CTkLabel(
+            empty_frame,
+            text="暂无项目",
+            text_color=COLORS["text_primary"],
+            font=F(size=18, weight="bold")
+        )
+        empty_label.pack(pady=(0, 5))
+        
+        empty_hint = ctk.CTkLabel(
+            empty_frame,
+            text="点击右上角「+ 添加项目」开始管理你的开发项目",
+            text_color=COLORS["text_secondary"],
+            font=F(size=12)
+        )
+        empty_hint.pack(pady=(0, 40))
+
     def add_project(self):
         """添加项目"""
         EnhancedProjectFormDialog(self, on_save=self.refresh_projects)
@@ -1292,8 +1509,65 @@ class DevManagerApp(ctk.CTk):
         PortManagerDialog(self, self.project_manager.get_all())
     
     def check_port_conflicts(self):
-        """检查端口冲突并显示警告"""
-        conflicts = port_manager.check_conflicts(self.project_manager.get_all())
+        """检查端口冲突并显示警告（200ms防抖，合并连续刷新）"""
+        if self._conflict_after_id:
+            self.after_cancel(self._conflict_after_id)
+        self._conflict_after_id = self.after(200, self._do_check_port_conflicts)
+
+    @staticmethod
+    def _projects_signature(projects: List[Project]) -> int:
+        """计算影响冲突检测的项目端口签名"""
+        items = []
+        for p in projects:
+            services = []
+            for key, s in p.services.items():
+                port_config = getattr(s, 'port_config', None)
+                port = get_service_port(s)
+                original_port = port_config.original_port if port_config else None
+                services.append((key, s.enabled, port, original_port))
+            items.append((p.id, tuple(services)))
+        return hash(tuple(items))
+
+    def _do_check_port_conflicts(self):
+        """执行端口冲突检查（项目端口未变化时2秒内复用结果）"""
+        self._conflict_after_id = None
+        projects = self.project_manager.get_all()
+        sig = self._projects_signature(projects)
+        if sig == self._last_projects_sig and time.monotonic() - self._last_check_ts < 2.0:
+            self._apply_conflict_result(self._last_conflicts)
+            return
+        
+        # 已有检查在后台运行时只标记，结束后再补一次
+        if self._conflict_check_running:
+            self._conflict_check_pending = True
+            return
+        
+        self._conflict_check_running = True
+        threading.Thread(target=self._bg_check_conflicts, args=(projects, sig), daemon=True).start()
+
+    def _bg_check_conflicts(self, projects: List[Project], sig: int):
+        """后台线程检查端口冲突"""
+        try:
+            conflicts = port_manager.check_conflicts(projects)
+        except Exception as e:
+            print(f"检查端口冲突失败: {e}")
+            conflicts = []
+        self.after(0, lambda: self._on_conflict_check_done(conflicts, sig))
+
+    def _on_conflict_check_done(self, conflicts: List[Dict], sig: int):
+        """后台检查完成（UI线程）"""
+        self._conflict_check_running = False
+        self._last_projects_sig = sig
+        self._last_check_ts = time.monotonic()
+        self._last_conflicts = conflicts
+        self._apply_conflict_result(conflicts)
+        
+        if self._conflict_check_pending:
+            self._conflict_check_pending = False
+            self._do_check_port_conflicts()
+
+    def _apply_conflict_result(self, conflicts: List[Dict]):
+        """更新端口冲突警告标签"""
         if conflicts:
             conflict_count = len(conflicts)
             self.conflict_warning.configure(text=f"⚠️ {conflict_count} 个端口冲突")
@@ -1305,7 +1579,6 @@ class DevManagerApp(ctk.CTk):
         """获取本机IPv4地址（局域网IP）- 从以太网或WiFi适配器获取"""
         try:
             import subprocess
-            import re
             
             # 执行 ipconfig 命令
             result = subprocess.run(
@@ -1319,31 +1592,20 @@ class DevManagerApp(ctk.CTk):
             if result.returncode != 0:
                 return None
             
-            output = result.stdout
-            
-            # 查找以太网或WiFi适配器的IPv4地址
-            # 匹配模式：先找到适配器名称，然后找到对应的IPv4地址
-            lines = output.split('\n')
-            current_adapter = None
-            
-            for i, line in enumerate(lines):
-                # 检测适配器名称（以太网、WLAN、Wi-Fi等）
-                if '适配器' in line or 'adapter' in line.lower():
-                    adapter_name = line.strip()
-                    # 优先使用以太网或WiFi，跳过虚拟适配器
-                    if any(keyword in adapter_name for keyword in ['以太网', 'Ethernet', 'WLAN', 'Wi-Fi', '无线']):
-                        if not any(skip in adapter_name for skip in ['虚拟', 'Virtual', 'VPN', 'VMware', 'VirtualBox', 'Hyper-V']):
-                            current_adapter = adapter_name
+            # 按适配器分段扫描，优先使用以太网或WiFi，跳过虚拟适配器
+            for section in _ADAPTER_SECTION_RE.finditer(result.stdout):
+                adapter_name = section.group('adapter').strip()
+                if not any(keyword in adapter_name for keyword in _ADAPTER_KEYWORDS):
+                    continue
+                if any(skip in adapter_name for skip in _ADAPTER_SKIP):
+                    continue
                 
-                # 在当前适配器下查找IPv4地址
-                if current_adapter and 'IPv4' in line:
-                    # 提取IP地址（格式：IPv4 地址 . . . . . . . . . . . . : 10.250.9.82）
-                    match = re.search(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})', line)
-                    if match:
-                        ip = match.group(1)
-                        # 排除本地回环地址和APIPA地址
-                        if not ip.startswith('127.') and not ip.startswith('169.254.'):
-                            return ip
+                # 提取IP地址（格式：IPv4 地址 . . . . . . . . . . . . : 10.250.9.82）
+                for match in _IPV4_LINE_RE.finditer(section.group('body')):
+                    ip = match.group(1)
+                    # 排除本地回环地址和APIPA地址
+                    if not ip.startswith('127.') and not ip.startswith('169.254.'):
+                        return ip
             
             return None
         except:
@@ -1352,17 +1614,45 @@ class DevManagerApp(ctk.CTk):
     def on_close(self):
         """关闭应用"""
         if messagebox.askyesno("退出", "退出将停止所有运行中的服务，确定退出吗？"):
+            # 后台停止服务，避免窗口卡死
+            self.protocol("WM_DELETE_WINDOW", lambda: None)
+            ctk.CTkLabel(
+                self,
+                text="正在停止服务...",
+                text_color=COLORS["text_secondary"],
+                font=F(size=12)
+            ).place(relx=0.5, rely=0.5, anchor="center")
+            threading.Thread(target=self._shutdown_worker, daemon=True).start()
+
+    def _shutdown_worker(self):
+        """后台停止所有服务后关闭窗口"""
+        try:
             process_manager.stop_all()
-            self.destroy()
+        except Exception as e:
+            print(f"停止服务失败: {e}")
+        process_scanner.stop()
+        enhanced_project_manager.flush()
+        self.after(0, self.destroy)
 
 
 class ProcessScanDialog(ctk.CTkToplevel):
     """进程扫描对话框"""
 
+    PAGE_SIZE = 30  # 每次渲染的结果行数
+
     def __init__(self, master, projects: List[Project]):
         super().__init__(master)
         self.projects = projects
         self.external_processes: List[ExternalProcess] = []
+        self._project_by_id: Dict[str, Project] = {p.id: p for p in projects}
+        self._last_scan_ts = 0.0
+        self._last_scan_result: Optional[List[ExternalProcess]] = None
+        self._pending_rows: List[tuple] = []
+        self._scan_gen = 0
+        self._result_queue = queue.Queue()
+        self._drain_after_id = None
+        self._waiting_gen = -1
+        self._lazy_after_id = None
 
         self.title("扫描系统进程")
         self.geometry("900x600")
@@ -1378,14 +1668,14 @@ class ProcessScanDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text="🔍 扫描系统中运行的开发相关进程",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=F(size=16, weight="bold")
         ).pack(anchor="w", padx=15, pady=(10, 5))
 
         ctk.CTkLabel(
             info_frame,
             text="检测 cmd、PowerShell、Python、Node.js 等进程，并根据工作目录匹配到已配置的项目",
             text_color="#888888",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
         # 扫描按钮
@@ -1430,21 +1720,66 @@ class ProcessScanDialog(ctk.CTkToplevel):
         # 自动开始扫描
         self.after(100, self.do_scan)
 
+    def destroy(self):
+        """关闭时停止后台进程扫描线程"""
+        process_scanner.stop()
+        super().destroy()
+
     def do_scan(self):
         """执行扫描"""
+        # 新一轮扫描，之前未返回的结果全部作废
+        self._scan_gen += 1
         self.scan_btn.configure(state="disabled")
         self.status_label.configure(text="正在扫描...")
 
         # 清空结果
         for widget in self.scroll_frame.winfo_children():
             widget.destroy()
+        self._pending_rows = []
+
+        # 没有项目可匹配时跳过扫描
+        if not self.projects:
+            self.show_results([])
+            return
+
+        # 3秒内重复扫描直接复用上次结果
+        if self._last_scan_result is not None and time.monotonic() - self._last_scan_ts < 3.0:
+            self.show_results(self._last_scan_result)
+            return
+
+        # 在后台线程执行扫描，结果经队列交回主线程
+        gen = self._waiting_gen = self._scan_gen
 
-        # 在后台线程执行扫描
         def scan_thread():
             processes = scan_and_match(self.projects)
-            self.after(0, lambda: self.show_results(processes))
+            self._result_queue.put((gen, processes))
 
         threading.Thread(target=scan_thread, daemon=True).start()
+        if self._drain_after_id is None:
+            self._drain_after_id = self.after(100, self._drain_results)
+
+    def _drain_results(self):
+        """定期取出扫描结果，只接受最新一轮的结果"""
+        self._drain_after_id = None
+        latest = None
+        while True:
+            try:
+                gen, processes = self._result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if gen == self._scan_gen:
+                latest = processes
+        if latest is not None:
+            self._on_scan_done(latest)
+        elif self._waiting_gen == self._scan_gen:
+            # 最新一轮扫描仍在进行
+            self._drain_after_id = self.after(100, self._drain_results)
+
+    def _on_scan_done(self, processes: List[ExternalProcess]):
+        """扫描完成，缓存结果并显示"""
+        self._last_scan_ts = time.monotonic()
+        self._last_scan_result = processes
+        self.show_results(processes)
 
     def show_results(self, processes: List[ExternalProcess]):
         """显示扫描结果"""
@@ -1457,7 +1792,7 @@ class ProcessScanDialog(ctk.CTkToplevel):
                 self.scroll_frame,
                 text="未检测到运行中的开发相关进程",
                 text_color="#666666",
-                font=ctk.CTkFont(size=14)
+                font=F(size=14)
             ).pack(pady=30)
             return
 
@@ -1467,60 +1802,81 @@ class ProcessScanDialog(ctk.CTkToplevel):
         matched = [p for p in processes if p.matched_project_id]
         unmatched = [p for p in processes if not p.matched_project_id]
 
+        # 生成待渲染队列，只渲染首屏，滚动接近底部时再追加
+        pending = []
         if matched:
-            self._create_section("✅ 已匹配到项目的进程")
-            for proc in matched:
-                self._create_process_card(proc, matched=True)
-
+            pending.append(("✅ 已匹配到项目的进程", None, False))
+            pending.extend((None, proc, True) for proc in matched)
         if unmatched:
-            self._create_section("❓ 未匹配的进程")
-            for proc in unmatched:
-                self._create_process_card(proc, matched=False)
+            pending.append(("❓ 未匹配的进程", None, False))
+            pending.extend((None, proc, False) for proc in unmatched)
+        self._pending_rows = pending
+        self._render_more_rows()
+        if self._pending_rows and self._lazy_after_id is None:
+            self._lazy_after_id = self.after(200, self._check_scroll_position)
+
+    def _render_more_rows(self):
+        """渲染下一页结果"""
+        page = self._pending_rows[:self.PAGE_SIZE]
+        del self._pending_rows[:self.PAGE_SIZE]
+        for title, proc, matched in page:
+            if title:
+                self._create_section(title)
+            else:
+                self._create_process_card(proc, matched=matched)
+
+    def _check_scroll_position(self):
+        """滚动到接近底部时追加渲染"""
+        self._lazy_after_id = None
+        if not self._pending_rows:
+            return
+        try:
+            if self.scroll_frame._parent_canvas.yview()[1] > 0.9:
+                self._render_more_rows()
+        except Exception:
+            return  # 窗口已销毁
+        self._lazy_after_id = self.after(200, self._check_scroll_position)
 
     def _create_section(self, title: str):
         """创建分区标题"""
         label = ctk.CTkLabel(
             self.scroll_frame,
             text=title,
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=F(size=14, weight="bold")
         )
         label.pack(anchor="w", pady=(15, 8))
 
     def _create_process_card(self, proc: ExternalProcess, matched: bool):
-        """创建进程卡片"""
+        """创建进程卡片（单个Frame + grid布局）"""
         card = ctk.CTkFrame(self.scroll_frame, fg_color="#2b2b2b", corner_radius=8)
         card.pack(fill="x", pady=(0, 8))
+        card.grid_columnconfigure(0, weight=1)
 
-        # 头部：进程名和 PID
-        header = ctk.CTkFrame(card, fg_color="transparent")
-        header.pack(fill="x", padx=12, pady=(10, 5))
-
-        name_text = f"{proc.name}"
+        parts = [proc.name]
         if matched:
             # 找到匹配的项目名
-            project_name = "未知项目"
-            for p in self.projects:
-                if p.id == proc.matched_project_id:
-                    project_name = p.name
-                    break
-            name_text += f"  →  {project_name}"
+            project = self._project_by_id.get(proc.matched_project_id)
+            project_name = project.name if project else "未知项目"
+            parts.append(f"  →  {project_name}")
             if proc.matched_service:
-                service_text = {"frontend": "前端", "backend": "后端"}.get(proc.matched_service, proc.matched_service)
-                name_text += f" ({service_text})"
+                service_text = _SERVICE_LABEL.get(proc.matched_service, proc.matched_service)
+                parts.append(f" ({service_text})")
+        name_text = "".join(parts)
 
+        # 第一行：进程名和 PID
         ctk.CTkLabel(
-            header,
+            card,
             text=name_text,
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=F(size=13, weight="bold"),
             text_color="#28a745" if matched else "#ffc107"
-        ).pack(side="left")
+        ).grid(row=0, column=0, sticky="w", padx=12, pady=(10, 5))
 
         ctk.CTkLabel(
-            header,
+            card,
             text=f"PID: {proc.pid}",
             text_color="#888888",
-            font=ctk.CTkFont(size=11)
-        ).pack(side="right")
+            font=F(size=11)
+        ).grid(row=0, column=1, sticky="e", padx=12, pady=(10, 5))
 
         # 工作目录
         if proc.cwd:
@@ -1528,18 +1884,17 @@ class ProcessScanDialog(ctk.CTkToplevel):
                 card,
                 text=f"📁 {proc.cwd}",
                 text_color="#666666",
-                font=ctk.CTkFont(size=11)
-            ).pack(anchor="w", padx=12)
+                font=F(size=11)
+            ).grid(row=1, column=0, columnspan=2, sticky="w", padx=12)
 
         # 命令行（截断显示）
         if proc.command_line:
-            cmd_display = proc.command_line[:100] + "..." if len(proc.command_line) > 100 else proc.command_line
             ctk.CTkLabel(
                 card,
-                text=f"💻 {cmd_display}",
+                text=f"💻 {proc.cmd_display}",
                 text_color="#666666",
-                font=ctk.CTkFont(size=11)
-            ).pack(anchor="w", padx=12, pady=(0, 10))
+                font=F(size=11)
+            ).grid(row=2, column=0, columnspan=2, sticky="w", padx=12, pady=(0, 10))
 
 
 def main():
@@ -9,7 +9,7 @@ import os
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "projects.json")
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceConfig:
     """服务配置"""
     enabled: bool = True
@@ -41,7 +41,7 @@ class ServiceConfig:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Project:
     """项目配置"""
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -52,26 +52,26 @@ class Project:
     services: Dict[str, ServiceConfig] = field(default_factory=dict)
 
     def to_dict(self) -> dict:
+        to_dict = ServiceConfig.to_dict
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "path": self.path,
             "created_at": self.created_at,
-            "services": {k: v.to_dict() for k, v in self.services.items()}
+            "services": {k: to_dict(v) for k, v in self.services.items()}
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Project":
-        services = {}
-        for k, v in data.get("services", {}).items():
-            services[k] = ServiceConfig.from_dict(v)
+        from_dict = ServiceConfig.from_dict
+        services = {k: from_dict(v) for k, v in data.get("services", {}).items()}
         return cls(
-            id=data.get("id", str(uuid.uuid4())),
+            id=data.get("id") or str(uuid.uuid4()),
             name=data.get("name", ""),
             description=data.get("description", ""),
             path=data.get("path", ""),
-            created_at=data.get("created_at", datetime.now().isoformat()),
+            created_at=data.get("created_at") or datetime.now().isoformat(),
             services=services
         )
 
@@ -1,12 +1,177 @@
 """深度端口检测器 - 从源码文件中精确读取端口配置"""
 import os
+import sys
 import json
 import re
+import mmap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+# 配置文件只读取开头部分，端口声明几乎总在前几 KB
+_MAX_CONFIG_BYTES = 64 * 1024
+# 入口源码额外读取末尾部分（app.run / listen 通常在文件末尾）
+_SOURCE_TAIL_BYTES = 100 * 1024
+
+# 检测结果缓存上限（按项目路径 LRU 淘汰）
+_CACHE_SIZE = 128
+
+# .env 中的端口变量，按优先级排序
+_ENV_PORT_KEYS = ('PORT', 'VITE_PORT', 'REACT_APP_PORT', 'VUE_APP_PORT')
+_ENV_PORT_RANK = {key: rank for rank, key in enumerate(_ENV_PORT_KEYS)}
+
+# 各检查项的候选文件
+_ENV_FILES = ('.env', '.env.local', '.env.development', '.env.dev')
+_VITE_CONFIG_FILES = ('vite.config.js', 'vite.config.ts', 'vite.config.mjs')
+_PY_ENTRY_FILES = ('main.py', 'app.py', 'run.py', 'server.py')
+_JS_ENTRY_FILES = ('server.js', 'app.js', 'index.js', 'src/server.js', 'src/app.js', 'src/index.js')
+
+# 检测结果中反复出现的来源/变量名，共用同一个字符串对象
+_ENV_VAR_PORT = sys.intern("PORT")
+_PKG_SCRIPT_NAMES = ('dev', 'start', 'serve')
+_PKG_SCRIPT_SOURCES = {name: sys.intern(f"package.json (scripts.{name})") for name in _PKG_SCRIPT_NAMES}
+
+# 影响检测结果的候选文件，用于计算缓存签名
+_FRONTEND_FILES = ('package.json',) + _VITE_CONFIG_FILES + (
+    'vue.config.js', 'webpack.config.js', 'next.config.js') + _ENV_FILES
+_BACKEND_FILES = _PY_ENTRY_FILES + _JS_ENTRY_FILES + _ENV_FILES
+
+# 预编译的端口匹配正则（模块加载时编译一次）
+# 同类规则合并为一个带命名分组的交替式，单次扫描即可；
+# 分组序号越小优先级越高，由 _search_by_priority 选出最优匹配
+_PKG_RE = re.compile(
+    r'--port[=\s]+(?P<long_port>\d+)'
+    r'|-p[=\s]+(?P<short_port>\d+)'
+    r'|PORT[=\s]+(?P<env_port>\d+)'
+    r'|port[=\s]+(?P<port>\d+)'
+)
+
+# package.json 中的 scripts 块（脚本值为字符串，块内不含嵌套花括号）
+_SCRIPTS_BLOCK_RE = re.compile(r'"scripts"\s*:\s*(\{[^{}]*\})')
+
+_VITE_RE = re.compile(
+    r'server\s*:\s*\{[^}]*port\s*:\s*(?P<server_port>\d+)'
+    r'|port\s*:\s*(?P<port>\d+)'
+    r'|PORT\s*:\s*(?P<env_port>\d+)'
+)
+
+_VUE_RE = re.compile(
+    r'devServer\s*:\s*\{[^}]*port\s*:\s*(?P<dev_server_port>\d+)'
+    r'|port\s*:\s*(?P<port>\d+)'
+)
+
+_WEBPACK_RE = re.compile(r'devServer\s*:\s*\{[^}]*port\s*:\s*(\d+)')
+
+# 入口源码规则使用 bytes 正则，可直接扫描 mmap 而无需解码复制
+# 端口规则与环境变量规则合并；全部区分大小写，大小写变体显式列出
+_PY_RE = re.compile(
+    # 1. app.run(port=5000) 或 app.run(debug=True, port=5000) - 最高优先级
+    rb'\.run\([^)]*\bport\s*=\s*(?P<app_run>\d+)'
+    # 2. uvicorn.run(app, host="0.0.0.0", port=8000)
+    rb'|uvicorn\.run\([^)]*\bport\s*=\s*(?P<uvicorn_run>\d+)'
+    # 3. cfg.get('port', 8123) 或 config.get('settings', {}).get('port', 8123)
+    rb'|\.get\([\'"]port[\'"]\s*,\s*(?P<config_get>\d+)\)'
+    # 4. PORT = 8000 (全局变量)
+    rb'|^\s*PORT\s*=\s*(?P<global_port>\d+)'
+    # 5. port = 8000 (变量)
+    rb'|^\s*port\s*=\s*(?P<var_port>\d+)'
+    # 6. --port 8000 (命令行参数)
+    rb'|--port[=\s]+(?P<cli_port>\d+)'
+    # 7. os.environ['PORT'] / os.environ.get('PORT') / os.getenv('PORT')
+    rb'|(?P<env_var>os\.environ(?:\[|\.get\()\s*["\']PORT["\']|os\.getenv\(\s*["\']PORT["\'])',
+    re.MULTILINE
+)
+
+# 分组名 -> (置信度, 说明)
+_PY_RULES = {
+    'app_run': (0.95, "从 app.run() 读取"),
+    'uvicorn_run': (0.95, "从 uvicorn.run() 读取"),
+    'config_get': (0.9, "从配置读取默认端口"),
+    'global_port': (0.8, "从全局变量 PORT 读取"),
+    'var_port': (0.7, "从变量 port 读取"),
+    'cli_port': (0.6, "从命令行参数读取"),
+}
+
+_NODE_RE = re.compile(
+    # const PORT = 3000
+    rb'(?:const|let|var)\s+PORT\s*=\s*(?P<const_port>\d+)'
+    # app.listen(3000)
+    rb'|\.listen\(\s*(?P<listen>\d+)'
+    # port: 3000
+    rb'|port\s*:\s*(?P<port>\d+)'
+)
+
+# 命令中的端口覆盖
+_CMD_PS_ENV_RE = re.compile(r'\$env:(\w+)\s*=\s*(\d+)')
+_CMD_BASH_ENV_RE = re.compile(r'^(\w+)=(\d+)\s+')
+_CMD_LONG_PORT_RE = re.compile(r'--port[=\s]+(\d+)')
+_CMD_SHORT_PORT_RE = re.compile(r'-p[=\s]+(\d+)')
+
+
+def _scan_source_file(path: str, regex: re.Pattern, marker: Optional[bytes] = None):
+    """扫描入口源码，返回 ((规则名, 匹配值) 或 None, 是否包含 marker)
+    
+    小文件整体读取；大文件通过 mmap 只扫描开头和末尾窗口，不复制整个文件
+    """
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size <= _MAX_CONFIG_BYTES + _SOURCE_TAIL_BYTES:
+            data = f.read()
+            windows = ((0, file_size),)
+        else:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            windows = ((0, _MAX_CONFIG_BYTES), (file_size - _SOURCE_TAIL_BYTES, file_size))
+    
+    try:
+        best = None
+        has_marker = False
+        for start, end in windows:
+            match = _search_by_priority(regex, data, start, end)
+            if match and (best is None or match.lastindex < best[0]):
+                best = (match.lastindex, match.lastgroup, match.group(match.lastgroup))
+            if marker and not has_marker:
+                has_marker = data.find(marker, start, end) != -1
+        return (best[1:] if best else None), has_marker
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def _parse_env_port(lines) -> Optional[int]:
+    """逐行解析 .env，返回优先级最高的端口变量值"""
+    best_rank, best_port = len(_ENV_PORT_KEYS), None
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] == '#':
+            continue
+        key, sep, value = line.partition('=')
+        rank = _ENV_PORT_RANK.get(key.rstrip()) if sep else None
+        if rank is None or rank >= best_rank:
+            continue
+        value = value.split('#', 1)[0].strip().strip('"\'')
+        if value.isdigit():
+            best_rank, best_port = rank, int(value)
+            if rank == 0:
+                break
+    return best_port
+
+
+def _search_by_priority(regex: re.Pattern, content, pos: int = 0,
+                        endpos: int = sys.maxsize) -> Optional[re.Match]:
+    """单次扫描合并后的正则，返回优先级最高的匹配（分组序号最小）"""
+    best = None
+    for match in regex.finditer(content, pos, endpos):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+    return best
+
+
+@dataclass(slots=True)
 class PortDetectionResult:
     """端口检测结果"""
     port: Optional[int]
@@ -19,71 +184,120 @@ class PortDetectionResult:
 class PortDetector:
     """深度端口检测器"""
     
+    def __init__(self):
+        # (类型, 项目路径) -> (文件签名, 检测结果)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[tuple, PortDetectionResult]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # 项目路径 -> (.env 文件签名, 检测结果)，前后端检测共用
+        self._env_cache: Dict[str, Tuple[tuple, Optional[PortDetectionResult]]] = {}
+    
     def detect_frontend_port(self, project_path: str) -> PortDetectionResult:
         """检测前端项目端口（深入读取配置文件）"""
-        
-        # 1. 检查 package.json 中的 scripts
-        pkg_result = self._check_package_json(project_path)
-        if pkg_result and pkg_result.confidence > 0.7:
-            return pkg_result
-        
-        # 2. 检查 vite.config.js/ts
-        vite_result = self._check_vite_config(project_path)
-        if vite_result and vite_result.confidence > 0.8:
-            return vite_result
-        
-        # 3. 检查 .env 文件
-        env_result = self._check_env_files(project_path)
-        if env_result and env_result.confidence > 0.7:
-            return env_result
-        
-        # 4. 检查 vue.config.js
-        vue_result = self._check_vue_config(project_path)
-        if vue_result and vue_result.confidence > 0.8:
-            return vue_result
-        
-        # 5. 检查 webpack.config.js
-        webpack_result = self._check_webpack_config(project_path)
-        if webpack_result and webpack_result.confidence > 0.7:
-            return webpack_result
-        
-        # 6. 检查 next.config.js
-        next_result = self._check_next_config(project_path)
-        if next_result and next_result.confidence > 0.8:
-            return next_result
-        
-        # 返回最高置信度的结果或默认值
-        results = [r for r in [pkg_result, vite_result, env_result, vue_result, webpack_result, next_result] if r]
-        if results:
-            return max(results, key=lambda x: x.confidence)
-        
-        return PortDetectionResult(
-            port=None,
-            source="default",
-            confidence=0.0,
-            details="未找到端口配置"
-        )
+        return self._cached("frontend", project_path, _FRONTEND_FILES, self._detect_frontend_port)
     
     def detect_backend_port(self, project_path: str) -> PortDetectionResult:
         """检测后端项目端口（深入读取配置文件）"""
+        return self._cached("backend", project_path, _BACKEND_FILES, self._detect_backend_port)
+    
+    def detect_batch(self, project_paths: List[str],
+                     max_workers: int = 8) -> Dict[str, Tuple[PortDetectionResult, PortDetectionResult]]:
+        """并行检测多个项目的端口，返回 {路径: (前端结果, 后端结果)}"""
+        paths = list(dict.fromkeys(project_paths))
+        results: Dict[str, List[Optional[PortDetectionResult]]] = {p: [None, None] for p in paths}
+        if not paths:
+            return {}
+        
+        # 检测以文件 IO 为主，线程可以并行
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(paths) * 2)) as executor:
+            futures = {}
+            for path in paths:
+                futures[executor.submit(self.detect_frontend_port, path)] = (path, 0)
+                futures[executor.submit(self.detect_backend_port, path)] = (path, 1)
+            for future in as_completed(futures):
+                path, index = futures[future]
+                results[path][index] = future.result()
+        
+        return {p: (r[0], r[1]) for p, r in results.items()}
+    
+    def invalidate(self, project_path: Optional[str] = None):
+        """清除检测缓存（不传路径时清除全部，否则清除该路径及其子目录）"""
+        with self._cache_lock:
+            if project_path is None:
+                self._cache.clear()
+                self._env_cache.clear()
+                return
+            prefix = os.path.normcase(os.path.abspath(project_path))
+            for key in list(self._cache):
+                path = os.path.normcase(os.path.abspath(key[1]))
+                if path == prefix or path.startswith(prefix + os.sep):
+                    del self._cache[key]
+            for key in list(self._env_cache):
+                path = os.path.normcase(os.path.abspath(key))
+                if path == prefix or path.startswith(prefix + os.sep):
+                    del self._env_cache[key]
+    
+    def _cached(self, kind: str, project_path: str, files, detect) -> PortDetectionResult:
+        """按候选文件的修改时间缓存检测结果，文件未变化时直接返回"""
+        signature = self._file_signature(project_path, files)
+        key = (kind, project_path)
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] == signature:
+                self._cache.move_to_end(key)
+                return hit[1]
+        
+        result = detect(project_path)
+        with self._cache_lock:
+            self._cache[key] = (signature, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _file_signature(project_path: str, files) -> tuple:
+        """候选文件的 (修改时间, 大小) 签名，不存在的文件记为 None"""
+        signature = []
+        join = os.path.join
+        for name in files:
+            try:
+                st = os.stat(join(project_path, name))
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _detect_frontend_port(self, project_path: str) -> PortDetectionResult:
+        """检测前端项目端口（无缓存）"""
+        # 按优先级依次检查，置信度超过阈值立即返回
+        return self._run_checks(project_path, (
+            (self._check_package_json, 0.7),   # 1. package.json 中的 scripts
+            (self._check_vite_config, 0.8),    # 2. vite.config.js/ts
+            (self._check_env_files, 0.7),      # 3. .env 文件
+            (self._check_vue_config, 0.8),     # 4. vue.config.js
+            (self._check_webpack_config, 0.7), # 5. webpack.config.js
+            (self._check_next_config, 0.8),    # 6. next.config.js
+        ))
+    
+    def _detect_backend_port(self, project_path: str) -> PortDetectionResult:
+        """检测后端项目端口（无缓存）"""
+        return self._run_checks(project_path, (
+            (self._check_python_port, 0.7),        # 1. Python 项目
+            (self._check_env_files, 0.7),          # 2. .env 文件
+            (self._check_node_backend_port, 0.7),  # 3. Node.js 后端
+        ))
+    
+    def _run_checks(self, project_path: str, checks) -> PortDetectionResult:
+        """依次执行检查，命中高置信度结果即短路返回"""
+        results = []
+        for check, threshold in checks:
+            result = check(project_path)
+            if result:
+                if result.confidence > threshold:
+                    return result
+                results.append(result)
         
-        # 1. 检查 Python 项目
-        python_result = self._check_python_port(project_path)
-        if python_result and python_result.confidence > 0.7:
-            return python_result
-        
-        # 2. 检查 .env 文件
-        env_result = self._check_env_files(project_path)
-        if env_result and env_result.confidence > 0.7:
-            return env_result
-        
-        # 3. 检查 Node.js 后端
-        node_result = self._check_node_backend_port(project_path)
-        if node_result and node_result.confidence > 0.7:
-            return node_result
-        
-        # 返回最高置信度的结果
-        results = [r for r in [python_result, env_result, node_result] if r]
+        # 返回最高置信度的结果或默认值
         if results:
             return max(results, key=lambda x: x.confidence)
         
@@ -97,46 +311,45 @@ class PortDetector:
     def _check_package_json(self, project_path: str) -> Optional[PortDetectionResult]:
         """检查 package.json 中的端口配置"""
         pkg_path = os.path.join(project_path, "package.json")
-        if not os.path.exists(pkg_path):
-            return None
-        
+        # 不再预先 os.path.exists，文件不存在时 open 抛出的异常由下方 except 处理
         try:
             with open(pkg_path, 'r', encoding='utf-8') as f:
-                pkg = json.load(f)
+                content = f.read()
             
-            scripts = pkg.get('scripts', {})
+            # 只解析 scripts 块，避免解析庞大的 dependencies；格式特殊时回退到完整解析
+            scripts = None
+            block = _SCRIPTS_BLOCK_RE.search(content)
+            if block:
+                try:
+                    scripts = json.loads(block.group(1))
+                except ValueError:
+                    scripts = None
+            if scripts is None:
+                scripts = json.loads(content).get('scripts', {})
             
             # 检查 dev/start 脚本中的端口
-            for script_name in ['dev', 'start', 'serve']:
+            for script_name in _PKG_SCRIPT_NAMES:
                 if script_name in scripts:
                     script = scripts[script_name]
                     
                     # 匹配 --port 3000, -p 3000, PORT=3000 等
-                    patterns = [
-                        r'--port[=\s]+(\d+)',
-                        r'-p[=\s]+(\d+)',
-                        r'PORT[=\s]+(\d+)',
-                        r'port[=\s]+(\d+)',
-                    ]
-                    
-                    for pattern in patterns:
-                        match = re.search(pattern, script)
-                        if match:
-                            port = int(match.group(1))
-                            return PortDetectionResult(
-                                port=port,
-                                source=f"package.json (scripts.{script_name})",
-                                confidence=0.9,
-                                details=f"从脚本中读取: {script}"
-                            )
+                    match = _search_by_priority(_PKG_RE, script)
+                    if match:
+                        port = int(match.group(match.lastgroup))
+                        return PortDetectionResult(
+                            port=port,
+                            source=_PKG_SCRIPT_SOURCES[script_name],
+                            confidence=0.9,
+                            details=f"从脚本中读取: {script}"
+                        )
                     
                     # 检查环境变量引用
                     if 'PORT' in script or '$PORT' in script or '%PORT%' in script:
                         return PortDetectionResult(
                             port=None,
-                            source=f"package.json (scripts.{script_name})",
+                            source=_PKG_SCRIPT_SOURCES[script_name],
                             confidence=0.6,
-                            env_var="PORT",
+                            env_var=_ENV_VAR_PORT,
                             details=f"使用环境变量 PORT: {script}"
                         )
             
@@ -146,32 +359,23 @@ class PortDetector:
     
     def _check_vite_config(self, project_path: str) -> Optional[PortDetectionResult]:
         """检查 vite.config.js/ts 中的端口配置"""
-        for config_file in ['vite.config.js', 'vite.config.ts', 'vite.config.mjs']:
-            config_path = os.path.join(project_path, config_file)
-            if not os.path.exists(config_path):
-                continue
-            
+        join = os.path.join
+        for config_file in _VITE_CONFIG_FILES:
+            config_path = join(project_path, config_file)
             try:
                 with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                    content = f.read(_MAX_CONFIG_BYTES)
                 
                 # 匹配 server: { port: 3000 }
-                patterns = [
-                    r'server\s*:\s*\{[^}]*port\s*:\s*(\d+)',
-                    r'port\s*:\s*(\d+)',
-                    r'PORT\s*:\s*(\d+)',
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, content)
-                    if match:
-                        port = int(match.group(1))
-                        return PortDetectionResult(
-                            port=port,
-                            source=config_file,
-                            confidence=0.95,
-                            details=f"从 Vite 配置文件读取"
-                        )
+                match = _search_by_priority(_VITE_RE, content)
+                if match:
+                    port = int(match.group(match.lastgroup))
+                    return PortDetectionResult(
+                        port=port,
+                        source=config_file,
+                        confidence=0.95,
+                        details=f"从 Vite 配置文件读取"
+                    )
                 
                 # 检查环境变量引用
                 if 'process.env.PORT' in content or 'import.meta.env.PORT' in content:
@@ -179,7 +383,7 @@ class PortDetector:
                         port=None,
                         source=config_file,
                         confidence=0.7,
-                        env_var="PORT",
+                        env_var=_ENV_VAR_PORT,
                         details="Vite 配置使用环境变量 PORT"
                     )
                 
@@ -189,36 +393,34 @@ class PortDetector:
         return None
     
     def _check_env_files(self, project_path: str) -> Optional[PortDetectionResult]:
-        """检查 .env 文件中的端口配置"""
-        env_files = ['.env', '.env.local', '.env.development', '.env.dev']
-        
-        for env_file in env_files:
-            env_path = os.path.join(project_path, env_file)
-            if not os.path.exists(env_path):
-                continue
-            
+        """检查 .env 文件中的端口配置（.env 文件未变化时复用上次结果）"""
+        signature = self._file_signature(project_path, _ENV_FILES)
+        cached = self._env_cache.get(project_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        result = self._read_env_files(project_path)
+        self._env_cache[project_path] = (signature, result)
+        if len(self._env_cache) > _CACHE_SIZE:
+            self._env_cache.pop(next(iter(self._env_cache)), None)
+        return result
+    
+    def _read_env_files(self, project_path: str) -> Optional[PortDetectionResult]:
+        """依次读取 .env 文件，返回第一个找到的端口配置"""
+        join = os.path.join
+        for env_file in _ENV_FILES:
+            env_path = join(project_path, env_file)
             try:
-                with open(env_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
                 # 匹配 PORT=3000, VITE_PORT=3000 等
-                patterns = [
-                    r'^PORT\s*=\s*(\d+)',
-                    r'^VITE_PORT\s*=\s*(\d+)',
-                    r'^REACT_APP_PORT\s*=\s*(\d+)',
-                    r'^VUE_APP_PORT\s*=\s*(\d+)',
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, content, re.MULTILINE)
-                    if match:
-                        port = int(match.group(1))
-                        return PortDetectionResult(
-                            port=port,
-                            source=env_file,
-                            confidence=0.85,
-                            details=f"从环境变量文件读取"
-                        )
+                with open(env_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    port = _parse_env_port(f)
+                if port is not None:
+                    return PortDetectionResult(
+                        port=port,
+                        source=env_file,
+                        confidence=0.85,
+                        details=f"从环境变量文件读取"
+                    )
                 
             except Exception as e:
                 continue
@@ -228,29 +430,20 @@ class PortDetector:
     def _check_vue_config(self, project_path: str) -> Optional[PortDetectionResult]:
         """检查 vue.config.js 中的端口配置"""
         config_path = os.path.join(project_path, "vue.config.js")
-        if not os.path.exists(config_path):
-            return None
-        
         try:
             with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+                content = f.read(_MAX_CONFIG_BYTES)
             
             # 匹配 devServer: { port: 8080 }
-            patterns = [
-                r'devServer\s*:\s*\{[^}]*port\s*:\s*(\d+)',
-                r'port\s*:\s*(\d+)',
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    port = int(match.group(1))
-                    return PortDetectionResult(
-                        port=port,
-                        source="vue.config.js",
-                        confidence=0.9,
-                        details="从 Vue 配置文件读取"
-                    )
+            match = _search_by_priority(_VUE_RE, content)
+            if match:
+                port = int(match.group(match.lastgroup))
+                return PortDetectionResult(
+                    port=port,
+                    source="vue.config.js",
+                    confidence=0.9,
+                    details="从 Vue 配置文件读取"
+                )
             
         except Exception as e:
             pass
@@ -260,15 +453,12 @@ class PortDetector:
     def _check_webpack_config(self, project_path: str) -> Optional[PortDetectionResult]:
         """检查 webpack.config.js 中的端口配置"""
         config_path = os.path.join(project_path, "webpack.config.js")
-        if not os.path.exists(config_path):
-            return None
-        
         try:
             with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+                content = f.read(_MAX_CONFIG_BYTES)
             
             # 匹配 devServer: { port: 3000 }
-            match = re.search(r'devServer\s*:\s*\{[^}]*port\s*:\s*(\d+)', content)
+            match = _WEBPACK_RE.search(content)
             if match:
                 port = int(match.group(1))
                 return PortDetectionResult(
@@ -286,12 +476,9 @@ class PortDetector:
     def _check_next_config(self, project_path: str) -> Optional[PortDetectionResult]:
         """检查 next.config.js 中的端口配置"""
         config_path = os.path.join(project_path, "next.config.js")
-        if not os.path.exists(config_path):
-            return None
-        
         try:
             with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+                content = f.read(_MAX_CONFIG_BYTES)
             
             # Next.js 通常通过环境变量设置端口
             if 'PORT' in content or 'process.env.PORT' in content:
@@ -299,7 +486,7 @@ class PortDetector:
                     port=None,
                     source="next.config.js",
                     confidence=0.7,
-                    env_var="PORT",
+                    env_var=_ENV_VAR_PORT,
                     details="Next.js 使用环境变量 PORT"
                 )
             
@@ -312,67 +499,32 @@ class PortDetector:
         """检查 Python 项目中的端口配置"""
         
         # 检查常见的 Python 入口文件
-        entry_files = ['main.py', 'app.py', 'run.py', 'server.py']
-        
-        for entry_file in entry_files:
-            file_path = os.path.join(project_path, entry_file)
-            if not os.path.exists(file_path):
-                continue
-            
+        join = os.path.join
+        for entry_file in _PY_ENTRY_FILES:
+            file_path = join(project_path, entry_file)
             try:
-                # 限制读取大小，避免超大文件（只读取最后100KB，通常app.run在文件末尾）
-                file_size = os.path.getsize(file_path)
-                if file_size > 500 * 1024:  # 如果文件大于500KB
-                    with open(file_path, 'rb') as f:
-                        # 读取文件末尾100KB
-                        f.seek(max(0, file_size - 100 * 1024))
-                        content = f.read().decode('utf-8', errors='ignore')
-                else:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                
+                # 限制扫描范围，避免超大文件（只扫描开头和末尾，通常app.run在文件末尾）
                 # 匹配各种端口定义方式（按优先级排序）
-                patterns = [
-                    # 1. app.run(port=5000) 或 app.run(debug=True, port=5000) - 最高优先级
-                    (r'\.run\([^)]*\bport\s*=\s*(\d+)', 0.95, "从 app.run() 读取"),
-                    # 2. uvicorn.run(app, host="0.0.0.0", port=8000)
-                    (r'uvicorn\.run\([^)]*\bport\s*=\s*(\d+)', 0.95, "从 uvicorn.run() 读取"),
-                    # 3. cfg.get('port', 8123) 或 config.get('settings', {}).get('port', 8123)
-                    (r'\.get\([\'"]port[\'"]\s*,\s*(\d+)\)', 0.9, "从配置读取默认端口"),
-                    # 4. PORT = 8000 (全局变量)
-                    (r'^\s*PORT\s*=\s*(\d+)', 0.8, "从全局变量 PORT 读取"),
-                    # 5. port = 8000 (变量)
-                    (r'^\s*port\s*=\s*(\d+)', 0.7, "从变量 port 读取"),
-                    # 6. --port 8000 (命令行参数)
-                    (r'--port[=\s]+(\d+)', 0.6, "从命令行参数读取"),
-                ]
-                
-                for pattern, confidence, details in patterns:
-                    match = re.search(pattern, content, re.MULTILINE | re.IGNORECASE)
-                    if match:
-                        port = int(match.group(1))
+                match, _ = _scan_source_file(file_path, _PY_RE)
+                if match:
+                    rule, value = match
+                    if rule in _PY_RULES:
+                        confidence, details = _PY_RULES[rule]
                         return PortDetectionResult(
-                            port=port,
+                            port=int(value),
                             source=entry_file,
                             confidence=confidence,
                             details=details
                         )
-                
-                # 检查环境变量引用
-                if 'os.environ' in content or 'os.getenv' in content:
-                    env_patterns = [
-                        r'os\.environ(?:\[|\.get\()\s*["\']PORT["\']',
-                        r'os\.getenv\(\s*["\']PORT["\']',
-                    ]
-                    for pattern in env_patterns:
-                        if re.search(pattern, content):
-                            return PortDetectionResult(
-                                port=None,
-                                source=entry_file,
-                                confidence=0.75,
-                                env_var="PORT",
-                                details=f"Python 代码使用环境变量 PORT"
-                            )
+                    
+                    # 检查环境变量引用
+                    return PortDetectionResult(
+                        port=None,
+                        source=entry_file,
+                        confidence=0.75,
+                        env_var=_ENV_VAR_PORT,
+                        details=f"Python 代码使用环境变量 PORT"
+                    )
                 
             except Exception as e:
                 continue
@@ -383,45 +535,28 @@ class PortDetector:
         """检查 Node.js 后端项目的端口配置"""
         
         # 检查常见的入口文件
-        entry_files = ['server.js', 'app.js', 'index.js', 'src/server.js', 'src/app.js', 'src/index.js']
-        
-        for entry_file in entry_files:
-            file_path = os.path.join(project_path, entry_file)
-            if not os.path.exists(file_path):
-                continue
-            
+        join = os.path.join
+        for entry_file in _JS_ENTRY_FILES:
+            file_path = join(project_path, entry_file)
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
                 # 匹配端口定义
-                patterns = [
-                    # const PORT = 3000
-                    r'(?:const|let|var)\s+PORT\s*=\s*(\d+)',
-                    # app.listen(3000)
-                    r'\.listen\(\s*(\d+)',
-                    # port: 3000
-                    r'port\s*:\s*(\d+)',
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, content)
-                    if match:
-                        port = int(match.group(1))
-                        return PortDetectionResult(
-                            port=port,
-                            source=entry_file,
-                            confidence=0.85,
-                            details="从 Node.js 源码读取"
-                        )
+                match, uses_env = _scan_source_file(file_path, _NODE_RE, b'process.env.PORT')
+                if match:
+                    port = int(match[1])
+                    return PortDetectionResult(
+                        port=port,
+                        source=entry_file,
+                        confidence=0.85,
+                        details="从 Node.js 源码读取"
+                    )
                 
                 # 检查环境变量引用
-                if 'process.env.PORT' in content:
+                if uses_env:
                     return PortDetectionResult(
                         port=None,
                         source=entry_file,
                         confidence=0.7,
-                        env_var="PORT",
+                        env_var=_ENV_VAR_PORT,
                         details="Node.js 代码使用环境变量 PORT"
                     )
                 
@@ -438,22 +573,22 @@ class PortDetector:
         """
         
         # PowerShell 风格: $env:PORT=3764
-        match = re.search(r'\$env:(\w+)\s*=\s*(\d+)', command)
+        match = _CMD_PS_ENV_RE.search(command)
         if match:
             return (match.group(1), int(match.group(2)))
         
         # Bash 风格: PORT=3764 npm start
-        match = re.search(r'^(\w+)=(\d+)\s+', command)
+        match = _CMD_BASH_ENV_RE.search(command)
         if match:
             return (match.group(1), int(match.group(2)))
         
         # 命令行参数: --port 3764
-        match = re.search(r'--port[=\s]+(\d+)', command)
+        match = _CMD_LONG_PORT_RE.search(command)
         if match:
             return ("PORT", int(match.group(1)))
         
         # 命令行参数: -p 3764
-        match = re.search(r'-p[=\s]+(\d+)', command)
+        match = _CMD_SHORT_PORT_RE.search(command)
         if match:
             return ("PORT", int(match.group(1)))
         
@@ -3,10 +3,59 @@ import customtkinter as ctk
 from tkinter import messagebox
 import os
 import json
+import mmap
 import re
+import threading
 from typing import Optional
-from enhanced_models import Project, ServiceConfig, enhanced_project_manager
+from enhanced_models import Project, ServiceConfig, PortConfig, enhanced_project_manager
 from port_detector import port_detector
+from port_manager import get_service_port
+from ui_fonts import F
+
+# 改写源文件端口用的正则（模块加载时编译一次）
+_ENV_PORT_RE = re.compile(r'^(PORT|VITE_PORT|REACT_APP_PORT|VUE_APP_PORT)\s*=\s*\d+', re.MULTILINE)
+# 只有以这些前缀开头的行才需要交给正则处理
+_ENV_PORT_PREFIXES = ('PORT', 'VITE_PORT', 'REACT_APP_PORT', 'VUE_APP_PORT')
+_VITE_PORT_RE = re.compile(r'port\s*:\s*\d+')
+_PY_PORT_RE = re.compile(r'port\s*=\s*\d+')
+# 原地改写用的字节版本（直接在 mmap 上匹配，不解码整个文件）
+_VITE_PORT_BYTES_RE = re.compile(rb'port\s*:\s*\d+')
+_PY_PORT_BYTES_RE = re.compile(rb'port\s*=\s*\d+')
+
+
+def _splice_port(pattern, content: str, replacement: str) -> Optional[str]:
+    """按匹配位置切片拼接替换端口，没有需要改动的匹配时返回 None"""
+    parts = []
+    last = 0
+    for m in pattern.finditer(content):
+        if m.group() == replacement:
+            continue
+        parts.append(content[last:m.start()])
+        parts.append(replacement)
+        last = m.end()
+    if not parts:
+        return None
+    parts.append(content[last:])
+    return ''.join(parts)
+
+
+def _patch_port_in_place(file_path: str, pattern, replacement: bytes) -> Optional[bool]:
+    """等长替换时直接覆写匹配位置；无需修改返回 False，长度不同返回 None 交给常规改写"""
+    with open(file_path, 'r+b') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'port') == -1:
+                return False
+            spans = [m.span() for m in pattern.finditer(mm) if m.group() != replacement]
+        if not spans:
+            return False
+        if any(end - start != len(replacement) for start, end in spans):
+            return None
+        for start, _ in spans:
+            f.seek(start)
+            f.write(replacement)
+    return True
 
 
 class PortEditDialog(ctk.CTkToplevel):
@@ -30,7 +79,7 @@ class PortEditDialog(ctk.CTkToplevel):
         title_label = ctk.CTkLabel(
             self,
             text=f"🔧 修改 {service.name or service_key} 端口",
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=F(size=18, weight="bold")
         )
         title_label.pack(pady=(20, 10))
         
@@ -39,7 +88,7 @@ class PortEditDialog(ctk.CTkToplevel):
         info_frame.pack(fill="x", padx=20, pady=(0, 20))
         
         # 兼容新旧ServiceConfig
-        current_port = getattr(service, 'port', None) or (service.port_config.port if hasattr(service, 'port_config') and service.port_config else None)
+        current_port = get_service_port(service)
         original_port = None
         if hasattr(service, 'port_config') and service.port_config:
             original_port = service.port_config.original_port
@@ -64,7 +113,7 @@ class PortEditDialog(ctk.CTkToplevel):
             ctk.CTkLabel(
                 info_frame,
                 text=f"原始端口: {original_port}",
-                font=ctk.CTkFont(size=13),
+                font=F(size=13),
                 text_color="#8E8E93"
             ).pack(pady=(10, 2), padx=15, anchor="w")
             
@@ -79,7 +128,7 @@ class PortEditDialog(ctk.CTkToplevel):
             ctk.CTkLabel(
                 info_frame,
                 text=port_text,
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=F(size=14, weight="bold"),
                 text_color=port_color
             ).pack(pady=(2, 5), padx=15, anchor="w")
         else:
@@ -87,27 +136,26 @@ class PortEditDialog(ctk.CTkToplevel):
             ctk.CTkLabel(
                 info_frame,
                 text=f"当前端口: {current_port}",
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=F(size=14, weight="bold"),
                 text_color="#000000"
             ).pack(pady=(10, 5), padx=15, anchor="w")
         
-        # 检测端口来源
-        port_result = self._detect_port_source()
-        if port_result:
-            ctk.CTkLabel(
-                info_frame,
-                text=f"来源: {port_result['source']}",
-                font=ctk.CTkFont(size=12),
-                text_color="#8E8E93"
-            ).pack(pady=(0, 5), padx=15, anchor="w")
-            
-            if port_result['file_path']:
-                ctk.CTkLabel(
-                    info_frame,
-                    text=f"文件: {port_result['file_path']}",
-                    font=ctk.CTkFont(size=11, family="Consolas"),
-                    text_color="#8E8E93"
-                ).pack(pady=(0, 10), padx=15, anchor="w")
+        # 端口来源（后台线程检测，完成后再填充）
+        self.source_label = ctk.CTkLabel(
+            info_frame,
+            text="来源: 检测中...",
+            font=F(size=12),
+            text_color="#8E8E93"
+        )
+        self.source_label.pack(pady=(0, 5), padx=15, anchor="w")
+        
+        self.file_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=F(size=11, family="Consolas"),
+            text_color="#8E8E93"
+        )
+        threading.Thread(target=self._detect_async, daemon=True).start()
         
         # 新端口输入
         input_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -116,14 +164,14 @@ class PortEditDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             input_frame,
             text="新端口:",
-            font=ctk.CTkFont(size=13)
+            font=F(size=13)
         ).pack(side="left", padx=(0, 10))
         
         self.new_port_entry = ctk.CTkEntry(
             input_frame,
             width=150,
             height=35,
-            font=ctk.CTkFont(size=14)
+            font=F(size=14)
         )
         self.new_port_entry.pack(side="left")
         self.new_port_entry.insert(0, str(current_port) if current_port else "")
@@ -136,7 +184,7 @@ class PortEditDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             method_frame,
             text="修改方式:",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=F(size=14, weight="bold"),
             text_color="#000000"
         ).pack(pady=(15, 10), padx=15, anchor="w")
         
@@ -148,14 +196,14 @@ class PortEditDialog(ctk.CTkToplevel):
             text="只修改 DevManager 配置 (推荐)",
             variable=self.method_var,
             value="devmanager",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         )
         devmanager_radio.pack(pady=(0, 5), padx=20, anchor="w")
         
         ctk.CTkLabel(
             method_frame,
             text="不修改项目源码，只在 DevManager 中记录新端口",
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             text_color="#8E8E93"
         ).pack(pady=(0, 15), padx=40, anchor="w")
         
@@ -165,14 +213,14 @@ class PortEditDialog(ctk.CTkToplevel):
             text="修改配置文件",
             variable=self.method_var,
             value="config",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         )
         config_radio.pack(pady=(0, 5), padx=20, anchor="w")
         
         ctk.CTkLabel(
             method_frame,
             text="直接修改 vite.config.js、.env、main.py 等配置文件",
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             text_color="#8E8E93"
         ).pack(pady=(0, 15), padx=40, anchor="w")
         
@@ -180,7 +228,7 @@ class PortEditDialog(ctk.CTkToplevel):
         warning_label = ctk.CTkLabel(
             self,
             text="⚠️ 修改配置文件会直接修改项目源码，请确保已备份",
-            font=ctk.CTkFont(size=11),
+            font=F(size=11),
             text_color="#666666"
         )
         warning_label.pack(pady=(0, 20))
@@ -213,6 +261,32 @@ class PortEditDialog(ctk.CTkToplevel):
             command=self.apply_changes
         ).pack(side="right")
     
+    def _detect_async(self):
+        """后台检测端口来源"""
+        try:
+            port_result = self._detect_port_source()
+        except Exception as e:
+            print(f"检测端口来源失败: {e}")
+            port_result = None
+        try:
+            self.after(0, self._apply_detection_result, port_result)
+        except RuntimeError:
+            # 对话框已关闭
+            pass
+    
+    def _apply_detection_result(self, port_result: Optional[dict]):
+        """显示端口来源检测结果（主线程）"""
+        if not self.winfo_exists():
+            return
+        if not port_result:
+            self.source_label.pack_forget()
+            return
+        
+        self.source_label.configure(text=f"来源: {port_result['source']}")
+        if port_result['file_path']:
+            self.file_label.configure(text=f"文件: {port_result['file_path']}")
+            self.file_label.pack(pady=(0, 10), padx=15, anchor="w")
+    
     def _detect_port_source(self) -> Optional[dict]:
         """检测端口来源"""
         project_path = self.project.path
@@ -222,7 +296,7 @@ class PortEditDialog(ctk.CTkToplevel):
         else:
             result = port_detector.detect_backend_port(project_path)
         
-        service_port = getattr(self.service, 'port', None) or (self.service.port_config.port if hasattr(self.service, 'port_config') and self.service.port_config else None)
+        service_port = get_service_port(self.service)
         if result.port == service_port:
             # 找到配置文件
             file_path = None
@@ -252,7 +326,8 @@ class PortEditDialog(ctk.CTkToplevel):
         """应用修改"""
         new_port_str = self.new_port_entry.get().strip()
         
-        if not new_port_str.isdigit():
+        # 只接受 ASCII 数字（isdigit 会放行 "²" 等字符，int() 随后会抛异常）
+        if not (new_port_str.isascii() and new_port_str.isdigit()):
             messagebox.showerror("错误", "端口必须是数字")
             return
         
@@ -288,30 +363,35 @@ class PortEditDialog(ctk.CTkToplevel):
         """修改配置文件"""
         project_path = self.project.path
         
-        # 尝试修改各种配置文件
+        # 一次列出目录，之后用集合判断文件是否存在（normcase 兼容 Windows 大小写）
+        try:
+            names = {os.path.normcase(n) for n in os.listdir(project_path)}
+        except OSError:
+            names = set()
+        
+        def candidates(file_names):
+            for name in file_names:
+                if os.path.normcase(name) in names:
+                    yield os.path.join(project_path, name)
+        
+        # 尝试修改各种配置文件（单个文件失败不影响其他文件，异常在 _modify_* 内处理）
         modified = False
         
         # 1. 修改 .env 文件
-        for env_file in ['.env', '.env.local', '.env.development']:
-            env_path = os.path.join(project_path, env_file)
-            if os.path.exists(env_path):
-                if self._modify_env_file(env_path, new_port):
-                    modified = True
+        for env_path in candidates(['.env', '.env.local', '.env.development']):
+            if self._modify_env_file(env_path, new_port):
+                modified = True
         
         # 2. 修改 vite.config.js/ts
-        for config_file in ['vite.config.js', 'vite.config.ts']:
-            config_path = os.path.join(project_path, config_file)
-            if os.path.exists(config_path):
-                if self._modify_vite_config(config_path, new_port):
-                    modified = True
+        for config_path in candidates(['vite.config.js', 'vite.config.ts']):
+            if self._modify_vite_config(config_path, new_port):
+                modified = True
         
         # 3. 修改 Python 文件
         if self.service_key == "backend":
-            for py_file in ['main.py', 'app.py', 'run.py']:
-                py_path = os.path.join(project_path, py_file)
-                if os.path.exists(py_path):
-                    if self._modify_python_file(py_path, new_port):
-                        modified = True
+            for py_path in candidates(['main.py', 'app.py', 'run.py']):
+                if self._modify_python_file(py_path, new_port):
+                    modified = True
         
         return modified
     
@@ -321,13 +401,16 @@ class PortEditDialog(ctk.CTkToplevel):
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # 替换 PORT=xxx
-            new_content = re.sub(
-                r'^(PORT|VITE_PORT|REACT_APP_PORT|VUE_APP_PORT)\s*=\s*\d+',
-                f'\\1={new_port}',
-                content,
-                flags=re.MULTILINE
-            )
+            # 文件里根本没有 PORT 时无需逐行处理
+            if 'PORT' not in content:
+                return False
+            
+            # 替换 PORT=xxx（先用前缀快速过滤，只对候选行执行正则）
+            lines = content.splitlines(keepends=True)
+            for i, line in enumerate(lines):
+                if line.startswith(_ENV_PORT_PREFIXES):
+                    lines[i] = _ENV_PORT_RE.sub(f'\\1={new_port}', line)
+            new_content = ''.join(lines)
             
             if new_content != content:
                 with open(file_path, 'w', encoding='utf-8') as f:
@@ -342,17 +425,22 @@ class PortEditDialog(ctk.CTkToplevel):
     def _modify_vite_config(self, file_path: str, new_port: int) -> bool:
         """修改 vite.config.js/ts"""
         try:
+            # 端口位数不变时原地覆写，否则回退到读取整个文件改写
+            patched = _patch_port_in_place(file_path, _VITE_PORT_BYTES_RE, f'port: {new_port}'.encode())
+            if patched is not None:
+                return patched
+            
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # 替换 port: xxxx
-            new_content = re.sub(
-                r'port\s*:\s*\d+',
-                f'port: {new_port}',
-                content
-            )
+            # 不含 port 的文件直接跳过，省去正则扫描
+            if 'port' not in content:
+                return False
             
-            if new_content != content:
+            # 替换 port: xxxx（只对匹配位置切片拼接，不重建整个文件）
+            new_content = _splice_port(_VITE_PORT_RE, content, f'port: {new_port}')
+            
+            if new_content is not None:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(new_content)
                 return True
@@ -365,17 +453,22 @@ class PortEditDialog(ctk.CTkToplevel):
     def _modify_python_file(self, file_path: str, new_port: int) -> bool:
         """修改 Python 文件"""
         try:
+            # 端口位数不变时原地覆写，否则回退到读取整个文件改写
+            patched = _patch_port_in_place(file_path, _PY_PORT_BYTES_RE, f'port={new_port}'.encode())
+            if patched is not None:
+                return patched
+            
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # 替换 port=xxxx
-            new_content = re.sub(
-                r'port\s*=\s*\d+',
-                f'port={new_port}',
-                content
-            )
+            # 不含 port 的文件直接跳过，省去正则扫描
+            if 'port' not in content:
+                return False
             
-            if new_content != content:
+            # 替换 port=xxxx（只对匹配位置切片拼接，不重建整个文件）
+            new_content = _splice_port(_PY_PORT_RE, content, f'port={new_port}')
+            
+            if new_content is not None:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(new_content)
                 return True
@@ -393,6 +486,9 @@ class PortEditDialog(ctk.CTkToplevel):
             if self.service.port_config.original_port is None:
                 self.service.port_config.original_port = self.service.port_config.port
             self.service.port_config.port = new_port
+        elif hasattr(self.service, 'port_config'):
+            # 新结构但尚无端口配置（ServiceConfig 使用 __slots__，不能动态添加 port 属性）
+            self.service.port_config = PortConfig(port=new_port)
         else:
             self.service.port = new_port
         
@@ -1,16 +1,23 @@
 """端口管理核心模块 - 智能端口分配、冲突检测、占用扫描"""
 import socket
 import psutil
-from typing import Dict, List, Optional, Set, Tuple
-from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import atexit
 import json
 import os
+import re
+import threading
+import time
 
 PORT_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "port_config.json")
 
 
-@dataclass
+@dataclass(slots=True)
 class PortAllocation:
     """端口分配记录"""
     port: int
@@ -36,7 +43,63 @@ class PortAllocation:
     
     @classmethod
     def from_dict(cls, data: dict) -> "PortAllocation":
-        return cls(**data)
+        # 忽略未知字段，避免旧版/手改的配置导致加载失败
+        return cls(**{k: data[k] for k in _ALLOCATION_FIELDS if k in data})
+
+
+_ALLOCATION_FIELDS = tuple(f.name for f in fields(PortAllocation))
+
+# 命令行技术栈特征：分组顺序即优先级，一次扫描后取序号最小的命中分组
+_TECH_RE = re.compile(
+    r'(?P<vite>npm run dev|vite)'
+    r'|(?P<create_react_app>npm start|react-scripts)'
+    r'|(?P<vue>vue-cli-service)'
+    r'|(?P<webpack_dev_server>webpack-dev-server)'
+    r'|(?P<fastapi>uvicorn|fastapi)'
+    r'|(?P<flask>flask)'
+    r'|(?P<django>django|manage\.py runserver)'
+)
+# Node.js 后端特征，在 Python 入口判断之后才检查
+_NODE_TECH_RE = re.compile(r'(?P<express>express)|(?P<nestjs>nest)')
+_PY_ENTRY_RE = re.compile(r'main\.py|app\.py|run\.py')
+
+# requirements.txt 框架识别缓存 {文件路径: (mtime_ns, 技术栈或 None)}
+_REQS_CACHE: Dict[str, Tuple[int, Optional[str]]] = {}
+
+
+def _match_tech(regex, text: str) -> Optional[str]:
+    """返回优先级最高的命中分组对应的技术栈名称"""
+    best = None
+    for m in regex.finditer(text):
+        if best is None or m.lastindex < best.lastindex:
+            best = m
+            if m.lastindex == 1:
+                break
+    return best.lastgroup.replace('_', '-') if best else None
+
+
+def _requirements_tech(path: str) -> Optional[str]:
+    """从 requirements.txt 识别 Python 框架（按修改时间缓存）"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _REQS_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    tech = None
+    try:
+        with open(path, "r") as f:
+            content = f.read().lower()
+        if "fastapi" in content:
+            tech = "fastapi"
+        elif "flask" in content:
+            tech = "flask"
+    except:
+        pass
+    _REQS_CACHE[path] = (mtime, tech)
+    return tech
 
 
 @dataclass
@@ -49,6 +112,91 @@ class PortRange:
     description: str = ""
 
 
+def get_service_port(service) -> Optional[int]:
+    """获取服务端口（兼容新旧 ServiceConfig）"""
+    port = getattr(service, 'port', None)
+    if port:
+        return port
+    port_config = getattr(service, 'port_config', None)
+    return port_config.port if port_config else None
+
+
+def _probe_port(port: int) -> bool:
+    """绑定探测单个端口是否可用"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # bind 不受超时影响，无需 settimeout；POSIX 上忽略 TIME_WAIT 残留连接
+            # （Windows 的 SO_REUSEADDR 允许抢占正在监听的端口，不能设置）
+            if os.name != 'nt':
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind(("127.0.0.1", port))
+            return True
+    except (socket.error, OSError):
+        return False
+
+
+def scan_ports_parallel(ports: Iterable[int], max_workers: int = 32) -> Dict[int, bool]:
+    """并行探测一批端口的可用性，返回 {端口: 是否可用}"""
+    ports = list(ports)
+    if not ports:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ports))) as executor:
+        return dict(zip(ports, executor.map(_probe_port, ports)))
+
+
+# 监听端口快照缓存 (时间戳, {端口: PID})
+_listen_snapshot_cache: Tuple[float, Optional[Dict[int, Optional[int]]]] = (0.0, None)
+
+
+def _listening_ports(ttl: float = 1.0) -> Optional[Dict[int, Optional[int]]]:
+    """获取当前所有监听端口 {端口: PID}，1秒内复用快照；无权限时返回None"""
+    global _listen_snapshot_cache
+    now = time.monotonic()
+    ts, snapshot = _listen_snapshot_cache
+    if snapshot is not None and now - ts < ttl:
+        return snapshot
+    
+    try:
+        snapshot = {}
+        listen = psutil.CONN_LISTEN
+        setdefault = snapshot.setdefault
+        for conn in psutil.net_connections(kind='tcp'):
+            if conn.status != listen:
+                continue
+            laddr = conn.laddr
+            if laddr:
+                setdefault(laddr.port, conn.pid)
+    except (psutil.AccessDenied, PermissionError):
+        return None
+    
+    _listen_snapshot_cache = (now, snapshot)
+    return snapshot
+
+
+def _occupant_from_pid(pid: Optional[int], cache: Optional[Dict[int, Dict]] = None) -> Dict:
+    """根据 PID 获取进程信息，同一 PID 只查询一次（传入 cache 时）"""
+    if cache is not None and pid in cache:
+        return dict(cache[pid])
+    
+    try:
+        if pid is None:
+            raise ValueError("无 PID")
+        proc = psutil.Process(pid)
+        info = {
+            "pid": pid,
+            "name": proc.name(),
+            "cmdline": " ".join(proc.cmdline()),
+            "status": proc.status()
+        }
+    except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError, TypeError):
+        info = {"pid": pid, "name": "Unknown", "cmdline": "", "status": ""}
+    
+    if cache is not None:
+        cache[pid] = info
+        return dict(info)
+    return info
+
+
 class PortManager:
     """端口管理器 - 智能分配、冲突检测、占用扫描"""
     
@@ -106,8 +254,26 @@ class PortManager:
         "nestjs": 3000,
     }
     
+    # 端口可用性探测结果的缓存时间（秒）
+    AVAILABILITY_TTL = 1.0
+    # 监听端口占用索引的缓存时间（秒）
+    LISTEN_INDEX_TTL = 2.0
+    # 更新最后使用时间后延迟写盘的时间（秒）
+    LAST_USED_SAVE_DELAY = 2.0
+    
     def __init__(self):
         self.allocations: Dict[int, PortAllocation] = {}
+        # 分配记录索引（分配/释放/加载后重建）
+        self._by_project: Dict[str, Set[int]] = {}  # 项目ID -> 端口集合
+        self._by_tech: Dict[str, int] = {}  # 技术栈 -> 分配数
+        self._by_project_name: Dict[str, int] = {}  # 项目名 -> 分配数
+        self._avail_cache: Dict[int, Tuple[float, bool]] = {}  # 端口 -> (探测时间, 是否可用)
+        self._listen_index_cache: Tuple[float, Optional[Dict[int, Dict]]] = (0.0, None)
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 串行化写盘，避免多个线程同时写临时文件
+        self._batch_depth = 0  # batch() 嵌套层数，大于 0 时 save() 只标记待保存
         self.load()
     
     def load(self):
@@ -121,105 +287,170 @@ class PortManager:
                         self.allocations[allocation.port] = allocation
             except Exception as e:
                 print(f"加载端口配置失败: {e}")
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """重建分配记录索引"""
+        by_project: Dict[str, Set[int]] = {}
+        by_tech: Dict[str, int] = {}
+        by_project_name: Dict[str, int] = {}
+        for alloc in self.allocations.values():
+            by_project.setdefault(alloc.project_id, set()).add(alloc.port)
+            by_tech[alloc.tech_stack] = by_tech.get(alloc.tech_stack, 0) + 1
+            by_project_name[alloc.project_name] = by_project_name.get(alloc.project_name, 0) + 1
+        self._by_project = by_project
+        self._by_tech = by_tech
+        self._by_project_name = by_project_name
+    
+    def _schedule_save(self, delay: float):
+        """延迟保存，窗口期内的多次修改只写一次盘"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """立即写入尚未保存的修改（程序退出时自动调用）"""
+        with self._save_lock:
+            if not self._dirty:
+                return
+        try:
+            self.save()
+        except Exception as e:
+            print(f"保存端口配置失败: {e}")
+    
+    @contextmanager
+    def batch(self):
+        """批量修改分配记录，退出时统一写一次盘"""
+        with self._save_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._save_lock:
+                self._batch_depth -= 1
+                done = self._batch_depth == 0
+            if done:
+                self.flush()
     
     def save(self):
         """保存端口分配记录"""
-        data = {
-            "allocations": [a.to_dict() for a in self.allocations.values()],
-            "updated_at": datetime.now().isoformat()
-        }
-        with open(PORT_CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 快照在写锁内获取，保证最后写盘的总是最新的分配记录
+        with self._write_lock:
+            with self._save_lock:
+                if self._batch_depth > 0:
+                    self._dirty = True
+                    return
+                if self._save_timer:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                self._dirty = False
+                allocations = list(self.allocations.values())
+            
+            try:
+                data = {
+                    "allocations": [a.to_dict() for a in allocations],
+                    "updated_at": datetime.now().isoformat()
+                }
+                # 先写临时文件再原子替换，避免写入中途崩溃损坏配置
+                tmp_file = PORT_CONFIG_FILE + ".tmp"
+                with open(tmp_file, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, PORT_CONFIG_FILE)
+            except Exception:
+                # 写盘失败时保留待保存标记，下次保存或退出时重试
+                with self._save_lock:
+                    self._dirty = True
+                raise
     
     def is_port_available(self, port: int) -> bool:
         """检查端口是否可用（未被占用）"""
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(0.5)
-                s.bind(("127.0.0.1", port))
-                return True
-        except (socket.error, OSError):
-            return False
+        return _probe_port(port)
+    
+    def _is_port_available_cached(self, port: int) -> bool:
+        """带短期缓存的可用性探测，一次界面操作内同一端口只绑定一次"""
+        cached = self._avail_cache.get(port)
+        if cached and time.monotonic() - cached[0] < self.AVAILABILITY_TTL:
+            return cached[1]
+        available = self.is_port_available(port)
+        self._avail_cache[port] = (time.monotonic(), available)
+        return available
+    
+    def build_listen_index(self) -> Optional[Dict[int, Dict]]:
+        """一次扫描构建 {端口: 占用进程信息} 索引，2秒内复用；无权限时返回None"""
+        now = time.monotonic()
+        ts, index = self._listen_index_cache
+        if index is not None and now - ts < self.LISTEN_INDEX_TTL:
+            return index
+        
+        snapshot = _listening_ports()
+        if snapshot is None:
+            return None
+        
+        pid_cache: Dict[int, Dict] = {}
+        index = {port: _occupant_from_pid(pid, pid_cache) for port, pid in snapshot.items()}
+        self._listen_index_cache = (now, index)
+        return index
     
     def get_port_occupant(self, port: int) -> Optional[Dict]:
         """获取占用端口的进程信息"""
-        try:
-            for conn in psutil.net_connections(kind='inet'):
-                if conn.laddr.port == port and conn.status == 'LISTEN':
-                    try:
-                        proc = psutil.Process(conn.pid)
-                        return {
-                            "pid": conn.pid,
-                            "name": proc.name(),
-                            "cmdline": " ".join(proc.cmdline()),
-                            "status": proc.status()
-                        }
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        return {"pid": conn.pid, "name": "Unknown", "cmdline": "", "status": ""}
-        except (psutil.AccessDenied, PermissionError):
-            pass
-        return None
+        # 优先使用仍在有效期内的占用索引
+        ts, index = self._listen_index_cache
+        if index is not None and time.monotonic() - ts < self.LISTEN_INDEX_TTL:
+            occupant = index.get(port)
+            return dict(occupant) if occupant else None
+        
+        snapshot = _listening_ports()
+        if snapshot is None or port not in snapshot:
+            return None
+        
+        return _occupant_from_pid(snapshot[port])
+    
+    def check_port(self, port: int) -> Tuple[bool, Optional[Dict]]:
+        """一次快照判断端口是否可用并返回占用进程（无权限读取连接表时退回绑定探测）"""
+        snapshot = _listening_ports()
+        if snapshot is None:
+            available = self.is_port_available(port)
+            return available, (None if available else self.get_port_occupant(port))
+        if port in snapshot:
+            return False, self.get_port_occupant(port)
+        return True, None
     
     def scan_occupied_ports(self, port_range: Optional[Tuple[int, int]] = None) -> Dict[int, Dict]:
         """扫描指定范围内被占用的端口"""
-        occupied = {}
         start, end = port_range or (1024, 65535)
         
-        try:
-            for conn in psutil.net_connections(kind='inet'):
-                if conn.laddr.port >= start and conn.laddr.port <= end and conn.status == 'LISTEN':
-                    port = conn.laddr.port
-                    if port not in occupied:
-                        occupant = self.get_port_occupant(port)
-                        if occupant:
-                            occupied[port] = occupant
-        except (psutil.AccessDenied, PermissionError):
-            pass
+        # 一次读取连接表，每个 PID 只查询一次进程信息
+        snapshot = _listening_ports()
+        if snapshot is None:
+            return {}
         
-        return occupied
+        pid_cache: Dict[int, Dict] = {}
+        return {
+            port: _occupant_from_pid(pid, pid_cache)
+            for port, pid in snapshot.items()
+            if start <= port <= end
+        }
     
     def detect_tech_stack(self, command: str, cwd: str) -> str:
         """根据命令和工作目录检测技术栈"""
         command_lower = command.lower()
         
-        # 前端技术栈检测
-        if "npm run dev" in command_lower or "vite" in command_lower:
-            return "vite"
-        if "npm start" in command_lower or "react-scripts" in command_lower:
-            return "create-react-app"
-        if "vue-cli-service" in command_lower:
-            return "vue"
-        if "webpack-dev-server" in command_lower:
-            return "webpack-dev-server"
-        
-        # Python后端检测
-        if "uvicorn" in command_lower or "fastapi" in command_lower:
-            return "fastapi"
-        if "flask run" in command_lower or "flask" in command_lower:
-            return "flask"
-        if "django" in command_lower or "manage.py runserver" in command_lower:
-            return "django"
-        if "python" in command_lower and any(x in command_lower for x in ["main.py", "app.py", "run.py"]):
+        # 前端 / Python 框架检测（单次正则扫描）
+        tech = _match_tech(_TECH_RE, command_lower)
+        if tech:
+            return tech
+        if "python" in command_lower and _PY_ENTRY_RE.search(command_lower):
             # 检查目录中是否有框架特征文件
-            if os.path.exists(os.path.join(cwd, "requirements.txt")):
-                try:
-                    with open(os.path.join(cwd, "requirements.txt"), "r") as f:
-                        content = f.read().lower()
-                        if "fastapi" in content:
-                            return "fastapi"
-                        if "flask" in content:
-                            return "flask"
-                except:
-                    pass
-            return "python"
+            return _requirements_tech(os.path.join(cwd, "requirements.txt")) or "python"
         
         # Node.js后端检测
-        if "express" in command_lower:
-            return "express"
-        if "nest" in command_lower:
-            return "nestjs"
-        
-        return "custom"
+        return _match_tech(_NODE_TECH_RE, command_lower) or "custom"
     
     def suggest_port(self, tech_stack: str, project_id: str, exclude_ports: Set[int] = None) -> int:
         """根据技术栈智能建议端口"""
@@ -228,7 +459,7 @@ class PortManager:
         # 1. 尝试使用默认端口
         default_port = self.DEFAULT_PORTS.get(tech_stack)
         if default_port and default_port not in exclude_ports:
-            if self.is_port_available(default_port):
+            if self._is_port_available_cached(default_port):
                 # 检查是否已分配给其他项目
                 if default_port not in self.allocations or self.allocations[default_port].project_id == project_id:
                     return default_port
@@ -236,31 +467,77 @@ class PortManager:
         # 2. 在对应技术栈范围内查找可用端口
         for range_key, port_range in self.PORT_RANGES.items():
             if tech_stack in port_range.tech_stacks:
-                for port in range(port_range.start, port_range.end + 1):
-                    if port in exclude_ports:
-                        continue
-                    if self.is_port_available(port):
-                        if port not in self.allocations or self.allocations[port].project_id == project_id:
-                            return port
+                port = self._first_available(
+                    range(port_range.start, port_range.end + 1), project_id, exclude_ports
+                )
+                if port:
+                    return port
         
         # 3. 在自定义范围查找
         custom_range = self.PORT_RANGES["custom"]
-        for port in range(custom_range.start, custom_range.end + 1):
-            if port in exclude_ports:
-                continue
-            if self.is_port_available(port):
-                if port not in self.allocations or self.allocations[port].project_id == project_id:
-                    return port
+        port = self._first_available(
+            range(custom_range.start, custom_range.end + 1), project_id, exclude_ports
+        )
+        if port:
+            return port
         
         # 4. 实在找不到，返回一个高位端口
-        for port in range(10000, 65535):
-            if port in exclude_ports:
-                continue
-            if self.is_port_available(port):
-                return port
+        port = self._first_available(range(10000, 65535), None, exclude_ports)
+        if port:
+            return port
         
         raise RuntimeError("无法找到可用端口")
     
+    def _first_available(self, ports: Iterable[int], project_id: Optional[str],
+                         exclude_ports: Set[int], batch_size: int = 32) -> Optional[int]:
+        """返回第一个可用且未分配给其他项目的端口
+        
+        优先用一次连接表快照排除正在监听的端口，只对选中的端口做绑定确认；
+        无权限读取连接表时按顺序分批并行探测
+        """
+        # 排除端口 + 已分配给其他项目的端口（project_id为None时不检查分配记录）
+        skip = set(exclude_ports)
+        if project_id is not None:
+            skip |= self.allocations.keys() - self._by_project.get(project_id, set())
+        
+        listening = _listening_ports()
+        batch = []
+        for port in ports:
+            if port in skip:
+                continue
+            if listening is not None:
+                if port not in listening and self._is_port_available_cached(port):
+                    return port
+                continue
+            batch.append(port)
+            if len(batch) >= batch_size:
+                found = self._first_in_batch(batch)
+                if found:
+                    return found
+                batch = []
+        return self._first_in_batch(batch) if batch else None
+
+    def _first_in_batch(self, batch: List[int]) -> Optional[int]:
+        """返回批次中第一个可用端口（缓存中已有的端口不再重复探测）"""
+        now = time.monotonic()
+        results = {}
+        unknown = []
+        for port in batch:
+            cached = self._avail_cache.get(port)
+            if cached and now - cached[0] < self.AVAILABILITY_TTL:
+                results[port] = cached[1]
+            else:
+                unknown.append(port)
+        
+        for port, available in scan_ports_parallel(unknown).items():
+            self._avail_cache[port] = (now, available)
+            results[port] = available
+        
+        for port in batch:
+            if results[port]:
+                return port
+        return None
+    
     def allocate_port(self, port: int, project_id: str, project_name: str, 
                      service_key: str, service_name: str, tech_stack: str) -> PortAllocation:
         """分配端口"""
@@ -276,6 +553,7 @@ class PortManager:
             last_used=now
         )
         self.allocations[port] = allocation
+        self._rebuild_indexes()
         self.save()
         return allocation
     
@@ -283,26 +561,29 @@ class PortManager:
         """释放端口"""
         if port in self.allocations:
             del self.allocations[port]
+            self._rebuild_indexes()
             self.save()
     
     def update_last_used(self, port: int):
         """更新端口最后使用时间"""
         if port in self.allocations:
             self.allocations[port].last_used = datetime.now().isoformat()
-            self.save()
+            self._schedule_save(self.LAST_USED_SAVE_DELAY)
     
     def check_conflicts(self, projects: List) -> List[Dict]:
         """检查所有项目的端口冲突（跳过已修改端口的服务）"""
         conflicts = []
-        port_usage = {}
+        counts = Counter()
+        entries = []
         
+        # 第一遍只统计端口使用次数，不构建用户信息
         for project in projects:
             for service_key, service in project.services.items():
                 if not service.enabled:
                     continue
                 
                 # 兼容新旧ServiceConfig
-                port = getattr(service, 'port', None) or (service.port_config.port if hasattr(service, 'port_config') and service.port_config else None)
+                port = get_service_port(service)
                 if not port:
                     continue
                 
@@ -315,48 +596,65 @@ class PortManager:
                 if original_port and original_port != port:
                     continue
                 
-                if port not in port_usage:
-                    port_usage[port] = []
-                
-                cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None)
-                port_usage[port].append({
-                    "project_id": project.id,
-                    "project_name": project.name,
-                    "service_key": service_key,
-                    "service_name": service.name,
-                    "command": service.command,
-                    "cwd": cwd
-                })
+                counts[port] += 1
+                entries.append((port, project, service_key, service))
+        
+        # 第二遍只为被多个服务使用的端口构建用户列表
+        port_usage = {}
+        for port, project, service_key, service in entries:
+            if counts[port] < 2:
+                continue
+            cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None)
+            port_usage.setdefault(port, []).append({
+                "project_id": project.id,
+                "project_name": project.name,
+                "service_key": service_key,
+                "service_name": service.name,
+                "command": service.command,
+                "cwd": cwd
+            })
         
         # 找出冲突的端口
         for port, users in port_usage.items():
-            if len(users) > 1:
-                conflicts.append({
-                    "port": port,
-                    "users": users,
-                    "severity": "high"
-                })
+            conflicts.append({
+                "port": port,
+                "users": users,
+                "severity": "high"
+            })
         
         return conflicts
     
     def get_port_recommendations(self, project, service_key: str, service) -> Dict:
         """为服务获取端口建议"""
+        # 每次界面操作重新探测，避免沿用上一次的结果
+        self._avail_cache.clear()
+        
         cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None)
         tech_stack = self.detect_tech_stack(service.command, cwd)
-        current_port = getattr(service, 'port', None) or (service.port_config.port if hasattr(service, 'port_config') and service.port_config else None)
+        current_port = get_service_port(service)
         
         # 获取项目中已使用的端口
-        used_ports = set()
-        for s in project.services.values():
-            port = getattr(s, 'port', None) or (s.port_config.port if hasattr(s, 'port_config') and s.port_config else None)
-            if port:
-                used_ports.add(port)
+        used_ports = {p for p in map(get_service_port, project.services.values()) if p}
+        
+        # 一次扫描得到所有监听端口，无权限读取时退回绑定探测
+        is_available = None
+        occupant = None
+        if current_port:
+            index = self.build_listen_index()
+            if index is None:
+                is_available = self._is_port_available_cached(current_port)
+                occupant = None if is_available else self.get_port_occupant(current_port)
+            elif current_port in index:
+                is_available = False
+                occupant = dict(index[current_port])
+            else:
+                is_available = True
         
         recommendations = {
             "current_port": current_port,
             "tech_stack": tech_stack,
-            "is_available": self.is_port_available(current_port) if current_port else None,
-            "occupant": self.get_port_occupant(current_port) if current_port else None,
+            "is_available": is_available,
+            "occupant": occupant,
             "suggested_ports": []
         }
         
@@ -381,24 +679,14 @@ class PortManager:
     
     def get_statistics(self) -> Dict:
         """获取端口使用统计"""
+        # 按技术栈/项目统计直接读取索引
         stats = {
             "total_allocated": len(self.allocations),
-            "by_tech_stack": {},
-            "by_project": {},
+            "by_tech_stack": dict(self._by_tech),
+            "by_project": dict(self._by_project_name),
             "port_ranges": {}
         }
         
-        for alloc in self.allocations.values():
-            # 按技术栈统计
-            if alloc.tech_stack not in stats["by_tech_stack"]:
-                stats["by_tech_stack"][alloc.tech_stack] = 0
-            stats["by_tech_stack"][alloc.tech_stack] += 1
-            
-            # 按项目统计
-            if alloc.project_name not in stats["by_project"]:
-                stats["by_project"][alloc.project_name] = 0
-            stats["by_project"][alloc.project_name] += 1
-        
         # 按范围统计
         for range_key, port_range in self.PORT_RANGES.items():
             count = sum(1 for alloc in self.allocations.values() 
@@ -413,5 +701,24 @@ class PortManager:
         return stats
 
 
-# 全局单例
-port_manager = PortManager()
+# 全局单例（首次访问 port_manager 时才创建并加载配置）
+_port_manager: Optional[PortManager] = None
+_port_manager_lock = threading.Lock()
+
+
+def get_port_manager() -> PortManager:
+    """获取全局端口管理器"""
+    global _port_manager
+    if _port_manager is None:
+        with _port_manager_lock:
+            if _port_manager is None:
+                _port_manager = PortManager()
+                atexit.register(_port_manager.flush)
+    return _port_manager
+
+
+def __getattr__(name: str):
+    """延迟创建 port_manager，仅导入本模块时不读取配置文件"""
+    if name == "port_manager":
+        return get_port_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
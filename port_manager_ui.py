@@ -1,17 +1,227 @@
 """端口管理器UI组件"""
 import customtkinter as ctk
 from tkinter import messagebox
-from typing import List
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import fnmatch
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+import psutil
 from models import Project
 from port_manager import port_manager
+from ui_fonts import F
+
+PY_ENVS_CACHE_FILE = os.path.join(os.path.dirname(__file__), "py_envs_cache.json")
+CONDA_REGISTRY_FILE = os.path.expanduser(os.path.join('~', '.conda', 'environments.txt'))
+
+
+def _python_envs_cache_key() -> str:
+    """Python 环境缓存键：PATH 与 conda 环境登记文件的修改时间，任一变化即失效"""
+    try:
+        registry_mtime = str(os.stat(CONDA_REGISTRY_FILE).st_mtime_ns)
+    except OSError:
+        registry_mtime = ""
+    raw = (os.environ.get('PATH', '') + '|' + registry_mtime).encode('utf-8', 'replace')
+    return hashlib.blake2b(raw).hexdigest()[:16]
+
+
+def _load_python_envs_cache(key: str) -> Optional[List[Dict]]:
+    """读取与缓存键匹配的上次检测结果"""
+    try:
+        with open(PY_ENVS_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("key") != key:
+        return None
+    return data.get("envs")
+
+
+def _save_python_envs_cache(key: str, env_items: List[Dict]):
+    """保存检测结果供下次打开对话框时直接显示"""
+    try:
+        with open(PY_ENVS_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "envs": env_items}, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"保存Python环境缓存失败: {e}")
+
+
+def _probe_python_version(python_path: str) -> str:
+    """运行解释器的 --version 获取版本号"""
+    try:
+        result = subprocess.run(
+            [python_path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=3
+        )
+        if result.returncode == 0:
+            return result.stdout.strip() or result.stderr.strip()
+    except Exception:
+        pass
+    return "未知版本"
+
+
+def _expand_path_pattern(pattern: str) -> Iterator[str]:
+    """逐级展开 Windows 路径模式，只对含 * 的那一级目录调用 scandir"""
+    parts = pattern.split("\\")
+    candidates = [parts[0] + os.sep]
+    for depth, part in enumerate(parts[1:], 2):
+        is_last = depth == len(parts)
+        expanded = []
+        for base in candidates:
+            if '*' not in part:
+                expanded.append(os.path.join(base, part))
+                continue
+            try:
+                with os.scandir(base) as it:
+                    for entry in it:
+                        if fnmatch.fnmatch(entry.name, part) and (is_last or entry.is_dir()):
+                            expanded.append(entry.path)
+            except OSError:
+                pass
+        candidates = expanded
+    for path in candidates:
+        if os.path.isfile(path):
+            yield path
+
+
+class VirtualCardList(ctk.CTkFrame):
+    """虚拟滚动卡片列表：只为可见区域创建固定高度的卡片，滚动时复用"""
+
+    # 每格滚轮滚动的距离（未缩放像素）
+    WHEEL_STEP = 40
+
+    def __init__(self, master, row_height: int, build_row: Callable, update_row: Callable,
+                 gap: int = 8, buffer: int = 2, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.row_height = row_height  # 行距（卡片高度 + 间隔）
+        self.card_height = row_height - gap
+        self._build_row = build_row  # build_row(parent, height) -> 卡片
+        self._update_row = update_row  # update_row(card, item, index)
+        self._buffer = buffer
+        self._items: list = []
+        self._rows: list = []  # 卡片池
+        self._row_index: Dict[int, int] = {}  # 池序号 -> 当前显示的数据下标
+        self._offset = 0.0
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.pack(side="left", fill="both", expand=True)
+        self._viewport.bind("<Configure>", lambda e: self._render())
+
+        self._message = ctk.CTkLabel(self._viewport, text="", text_color="#8E8E93", font=F(size=13))
+
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", self._on_wheel, add=True)
+            self.bind_all("<Button-5>", self._on_wheel, add=True)
+        else:
+            self.bind_all("<MouseWheel>", self._on_wheel, add=True)
+
+    def set_items(self, items: list):
+        """替换数据并回到顶部"""
+        self._items = list(items)
+        self._offset = 0.0
+        self._row_index.clear()
+        self._message.place_forget()
+        self._render()
+
+    def show_message(self, text: str, text_color: str = "#8E8E93", size: int = 13):
+        """清空列表并在中间显示提示文字"""
+        self._items = []
+        self._offset = 0.0
+        self._row_index.clear()
+        self._render()
+        self._message.configure(text=text, text_color=text_color, font=F(size=size))
+        self._message.place(relx=0.5, y=30, anchor="n")
+
+    def _view_height(self) -> float:
+        """可见区域高度（换算为未缩放像素）"""
+        return self._viewport.winfo_height() / self._get_widget_scaling()
+
+    def _render(self):
+        """只摆放可见区域内的卡片"""
+        view_h = self._view_height()
+        total = len(self._items) * self.row_height
+        self._offset = max(0.0, min(self._offset, total - view_h))
+
+        first = int(self._offset // self.row_height)
+        last = min(len(self._items), math.ceil((self._offset + view_h) / self.row_height) + self._buffer)
+        needed = max(0, last - first)
+
+        while len(self._rows) < needed:
+            self._rows.append(self._build_row(self._viewport, self.card_height))
+
+        for slot, row in enumerate(self._rows):
+            index = first + slot
+            if slot >= needed:
+                row.place_forget()
+                self._row_index.pop(slot, None)
+                continue
+            if self._row_index.get(slot) != index:
+                self._update_row(row, self._items[index], index)
+                self._row_index[slot] = index
+            row.place(x=0, y=index * self.row_height - self._offset, relwidth=1.0)
+
+        if total > view_h > 0:
+            self._scrollbar.set(self._offset / total, (self._offset + view_h) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, offset: float):
+        self._offset = offset
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        """滚动条拖动 / 点击"""
+        total = len(self._items) * self.row_height
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self._view_height() if args[2] == "pages" else self.WHEEL_STEP
+            self._scroll_to(self._offset + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        """鼠标位于列表内时响应滚轮"""
+        widget, me = str(event.widget), str(self)
+        if widget != me and not widget.startswith(me + "."):
+            return
+        if event.num == 4:
+            delta = -self.WHEEL_STEP
+        elif event.num == 5:
+            delta = self.WHEEL_STEP
+        elif sys.platform == "darwin":
+            delta = -event.delta * self.WHEEL_STEP / 4
+        else:
+            delta = -event.delta / 120 * self.WHEEL_STEP
+        self._scroll_to(self._offset + delta)
 
 
 class PortManagerDialog(ctk.CTkToplevel):
     """端口管理器对话框"""
 
+    # 冲突列表每页显示的数量，其余点击「显示剩余」后再分页追加
+    CONFLICT_PAGE_SIZE = 50
+    # 运行中端口快照的有效期（秒），期间重复点击刷新直接复用
+    RUNNING_PORTS_TTL = 5.0
+    # 监听端口快照 (时间戳, {端口: {'pid', 'process'}})，多个对话框实例共享
+    _running_cache: Tuple[float, Optional[Dict[int, Dict]]] = (0.0, None)
+
     def __init__(self, master, projects: List[Project]):
         super().__init__(master)
         self.projects = projects
+        self._pid_names: Dict[int, str] = {}  # PID -> 进程名（对话框生命周期内缓存）
+        self._conflict_cards: list = []  # 复用的冲突卡片
+        self._conflicts: List[Dict] = []  # 最近一次检测到的全部冲突
+        self._python_envs_cache: Optional[List[Dict]] = None  # 上次检测到的Python环境
 
         self.title("端口管理器")
         self.geometry("1000x700")
@@ -45,7 +255,7 @@ class PortManagerDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text="当前运行中的端口",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=F(size=16, weight="bold"),
             text_color="#000000"
         ).pack(anchor="w", padx=15, pady=(10, 5))
 
@@ -53,7 +263,7 @@ class PortManagerDialog(ctk.CTkToplevel):
             info_frame,
             text="显示系统中正在运行的开发服务端口 (3000-9999)",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
         # 刷新按钮
@@ -70,53 +280,30 @@ class PortManagerDialog(ctk.CTkToplevel):
             command=self._show_running_ports
         ).pack(side="left", padx=10)
 
-        # 端口列表
-        self.running_scroll = ctk.CTkScrollableFrame(tab, fg_color="transparent")
-        self.running_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        # 端口列表（虚拟滚动，只创建可见区域的卡片）
+        self.running_list = VirtualCardList(
+            tab,
+            row_height=120,
+            build_row=self._build_running_card,
+            update_row=self._update_running_card
+        )
+        self.running_list.pack(fill="both", expand=True, padx=10, pady=10)
 
         # 显示提示信息，不自动加载（性能优化）
-        hint_label = ctk.CTkLabel(
-            self.running_scroll,
-            text="点击上方「刷新」按钮查看运行中的端口",
-            text_color="#8E8E93",
-            font=ctk.CTkFont(size=13)
-        )
-        hint_label.pack(pady=50)
+        self.running_list.show_message("点击上方「刷新」按钮查看运行中的端口")
 
     def _show_running_ports(self):
-        """显示当前运行中的端口"""
-        import psutil
-        
-        # 清空
-        for widget in self.running_scroll.winfo_children():
-            widget.destroy()
-        
+        """显示当前运行中的端口（后台线程采集）"""
+        self.running_list.show_message("检测中...")
+        threading.Thread(target=self._gather_running_ports, daemon=True).start()
+
+    def _gather_running_ports(self):
+        """后台采集监听端口并匹配所属项目"""
         running_ports = []
         
-        # 获取所有TCP连接
+        # 获取所有TCP监听端口（有效期内复用上次结果）
         try:
-            connections = psutil.net_connections(kind='inet')
-            port_info = {}
-            
-            for conn in connections:
-                if conn.status == 'LISTEN' and conn.laddr:
-                    port = conn.laddr.port
-                    # 只显示常用开发端口范围
-                    if 3000 <= port <= 9999:
-                        # 获取进程信息
-                        process_name = "未知进程"
-                        pid = conn.pid
-                        try:
-                            if pid:
-                                proc = psutil.Process(pid)
-                                process_name = proc.name()
-                        except:
-                            pass
-                        
-                        port_info[port] = {
-                            'pid': pid,
-                            'process': process_name
-                        }
+            port_info = self._get_listening_ports()
             
             # 检查哪些是我们管理的项目的端口
             allocations = port_manager.get_all_allocations()
@@ -143,77 +330,142 @@ class PortManagerDialog(ctk.CTkToplevel):
                         'pid': info['pid'],
                         'process': info['process']
                     })
-            
-            if not running_ports:
-                ctk.CTkLabel(
-                    self.running_scroll,
-                    text="当前没有运行中的开发服务端口 (3000-9999)",
-                    text_color="#8E8E93",
-                    font=ctk.CTkFont(size=14)
-                ).pack(pady=30)
-                return
-            
-            # 显示运行中的端口
-            for item in running_ports:
-                card = ctk.CTkFrame(self.running_scroll, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
-                card.pack(fill="x", pady=(0, 8))
-                
-                header = ctk.CTkFrame(card, fg_color="transparent")
-                header.pack(fill="x", padx=12, pady=(10, 5))
-                
-                ctk.CTkLabel(
-                    header,
-                    text=f":{item['port']}",
-                    font=ctk.CTkFont(size=16, weight="bold"),
-                    text_color="#000000"
-                ).pack(side="left")
-                
-                status_label = ctk.CTkLabel(
-                    header,
-                    text="DevManager管理" if item['managed'] else "外部服务",
-                    font=ctk.CTkFont(size=10),
-                    text_color="#FFFFFF",
-                    fg_color="#000000" if item['managed'] else "#666666",
-                    corner_radius=4,
-                    padx=8,
-                    pady=2
-                )
-                status_label.pack(side="left", padx=10)
-                
-                # PID标签
-                if item.get('pid'):
-                    ctk.CTkLabel(
-                        header,
-                        text=f"PID: {item['pid']}",
-                        font=ctk.CTkFont(size=9),
-                        text_color="#8E8E93"
-                    ).pack(side="right")
-                
-                # 项目信息
-                project_text = f"{item['project']}" if not item['service'] else f"{item['project']} / {item['service']}"
-                ctk.CTkLabel(
-                    card,
-                    text=project_text,
-                    text_color="#000000",
-                    font=ctk.CTkFont(size=12)
-                ).pack(anchor="w", padx=12, pady=(0, 2))
-                
-                # 进程信息
-                if item.get('process'):
-                    ctk.CTkLabel(
-                        card,
-                        text=f"进程: {item['process']}",
-                        text_color="#8E8E93",
-                        font=ctk.CTkFont(size=10)
-                    ).pack(anchor="w", padx=12, pady=(0, 10))
-                
+            error = None
         except Exception as e:
-            ctk.CTkLabel(
-                self.running_scroll,
-                text=f"检测失败: {e}",
-                text_color="#000000",
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=30)
+            error = e
+        
+        try:
+            self.after(0, self._render_running_ports, running_ports, error)
+        except RuntimeError:
+            # 对话框已关闭
+            pass
+
+    def _render_running_ports(self, running_ports: List[Dict], error: Optional[Exception]):
+        """显示运行中端口采集结果（主线程）"""
+        if not self.winfo_exists():
+            return
+        if error is not None:
+            self.running_list.show_message(f"检测失败: {error}", text_color="#000000", size=14)
+            return
+        
+        if not running_ports:
+            self.running_list.show_message("当前没有运行中的开发服务端口 (3000-9999)", size=14)
+            return
+        
+        # 显示运行中的端口
+        self.running_list.set_items(running_ports)
+
+    def _build_running_card(self, parent, height: int):
+        """创建运行中端口卡片（内容由 _update_running_card 填充）"""
+        card = ctk.CTkFrame(parent, height=height, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
+        card.pack_propagate(False)
+        
+        header = ctk.CTkFrame(card, fg_color="transparent")
+        header.pack(fill="x", padx=12, pady=(10, 5))
+        
+        card.port_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=F(size=16, weight="bold"),
+            text_color="#000000"
+        )
+        card.port_label.pack(side="left")
+        
+        card.status_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=F(size=10),
+            text_color="#FFFFFF",
+            corner_radius=4,
+            padx=8,
+            pady=2
+        )
+        card.status_label.pack(side="left", padx=10)
+        
+        # PID标签
+        card.pid_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=F(size=9),
+            text_color="#8E8E93"
+        )
+        card.pid_label.pack(side="right")
+        
+        # 项目信息
+        card.project_label = ctk.CTkLabel(
+            card,
+            text="",
+            text_color="#000000",
+            font=F(size=12)
+        )
+        card.project_label.pack(anchor="w", padx=12, pady=(0, 2))
+        
+        # 进程信息
+        card.process_label = ctk.CTkLabel(
+            card,
+            text="",
+            text_color="#8E8E93",
+            font=F(size=10)
+        )
+        card.process_label.pack(anchor="w", padx=12, pady=(0, 10))
+        return card
+
+    def _update_running_card(self, card, item: Dict, index: int):
+        """用端口数据填充卡片"""
+        card.port_label.configure(text=f":{item['port']}")
+        card.status_label.configure(
+            text="DevManager管理" if item['managed'] else "外部服务",
+            fg_color="#000000" if item['managed'] else "#666666"
+        )
+        card.pid_label.configure(text=f"PID: {item['pid']}" if item.get('pid') else "")
+        project_text = f"{item['project']}" if not item['service'] else f"{item['project']} / {item['service']}"
+        card.project_label.configure(text=project_text)
+        card.process_label.configure(text=f"进程: {item['process']}" if item.get('process') else "")
+
+    def _get_listening_ports(self) -> Dict[int, Dict]:
+        """获取开发端口范围内的监听端口及其进程（带短期缓存）"""
+        ts, cached = PortManagerDialog._running_cache
+        if cached is not None and time.monotonic() - ts < self.RUNNING_PORTS_TTL:
+            return cached
+        
+        listeners = {}
+        listen = psutil.CONN_LISTEN
+        for conn in psutil.net_connections(kind='tcp'):
+            # 先判断状态，非监听连接不再读取其他字段
+            if conn.status != listen:
+                continue
+            laddr = conn.laddr
+            if not laddr:
+                continue
+            port = laddr.port
+            # 只显示常用开发端口范围
+            if 3000 <= port <= 9999:
+                listeners[port] = conn.pid
+        
+        self._resolve_process_names(listeners.values())
+        port_info = {
+            port: {
+                'pid': pid,
+                'process': self._pid_names.get(pid, "未知进程")
+            }
+            for port, pid in listeners.items()
+        }
+        
+        PortManagerDialog._running_cache = (time.monotonic(), port_info)
+        return port_info
+    
+    def _resolve_process_names(self, pids):
+        """一次遍历进程表补齐未知 PID 的进程名，已知 PID 不重复查询"""
+        missing = {pid for pid in pids if pid and pid not in self._pid_names}
+        if not missing:
+            return
+        for proc in psutil.process_iter(['pid', 'name']):
+            pid = proc.info['pid']
+            if pid in missing:
+                self._pid_names[pid] = proc.info['name'] or "未知进程"
+                missing.discard(pid)
+                if not missing:
+                    break
 
     def _init_conflict_tab(self):
         """初始化潜在冲突标签页"""
@@ -226,7 +478,7 @@ class PortManagerDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text="潜在端口冲突",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=F(size=16, weight="bold"),
             text_color="#000000"
         ).pack(anchor="w", padx=15, pady=(10, 5))
 
@@ -234,7 +486,7 @@ class PortManagerDialog(ctk.CTkToplevel):
             info_frame,
             text="检测多个项目配置了相同端口的情况（可能导致启动冲突）",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
         # 检测按钮
@@ -262,79 +514,139 @@ class PortManagerDialog(ctk.CTkToplevel):
         self.conflict_scroll = ctk.CTkScrollableFrame(tab, fg_color="transparent")
         self.conflict_scroll.pack(fill="both", expand=True, padx=10, pady=10)
 
+        # 冲突过多时分页显示
+        self.conflict_more_btn = ctk.CTkButton(
+            self.conflict_scroll,
+            text="",
+            fg_color="#6c757d",
+            hover_color="#5a6268",
+            text_color="#FFFFFF",
+            command=self._show_more_conflicts
+        )
+
         # 显示提示信息，不自动加载
-        hint_label = ctk.CTkLabel(
+        self.conflict_message = ctk.CTkLabel(
             self.conflict_scroll,
             text="点击上方「检测冲突」按钮开始检测",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=13)
+            font=F(size=13)
         )
-        hint_label.pack(pady=50)
+        self.conflict_message.pack(pady=50)
 
     def _check_conflicts(self):
-        """检查端口冲突"""
-        # 清空
-        for widget in self.conflict_scroll.winfo_children():
-            widget.destroy()
-
+        """检查端口冲突（复用已有卡片，只增删数量差异部分）"""
         conflicts = port_manager.check_conflicts(self.projects)
 
+        self._conflicts = conflicts
+        self.conflict_more_btn.pack_forget()
+
         if not conflicts:
             self.conflict_status.configure(text="✅ 未发现端口冲突", text_color="#000000")
-            ctk.CTkLabel(
-                self.conflict_scroll,
+            for card in self._conflict_cards:
+                card.pack_forget()
+            self.conflict_message.configure(
                 text="所有端口配置正常，未发现冲突",
                 text_color="#000000",
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=30)
+                font=F(size=14)
+            )
+            self.conflict_message.pack(pady=30)
             return
 
         self.conflict_status.configure(
             text=f"⚠️ 发现 {len(conflicts)} 个端口冲突",
             text_color="#000000"
         )
-
-        # 显示冲突
-        for conflict in conflicts:
-            card = ctk.CTkFrame(self.conflict_scroll, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
+        self.conflict_message.pack_forget()
+        self._render_conflicts(self.CONFLICT_PAGE_SIZE)
+
+    def _show_more_conflicts(self):
+        """追加显示下一页冲突"""
+        self._render_conflicts(len(self._conflict_cards) + self.CONFLICT_PAGE_SIZE)
+
+    def _render_conflicts(self, count: int):
+        """显示前 count 个冲突，剩余的通过按钮分页加载"""
+        visible = self._conflicts[:count]
+
+        # 显示冲突：已有卡片原地更新，不足时新建，多余的销毁
+        cards = []
+        for conflict, card in zip_longest(visible, self._conflict_cards):
+            if conflict is None:
+                card.destroy()
+                continue
+            if card is None:
+                card = self._build_conflict_card()
+            self._update_conflict_card(card, conflict)
             card.pack(fill="x", pady=(0, 10))
+            cards.append(card)
+        self._conflict_cards = cards
 
-            # 端口号
-            header = ctk.CTkFrame(card, fg_color="transparent")
-            header.pack(fill="x", padx=12, pady=(10, 5))
+        remaining = len(self._conflicts) - len(visible)
+        self.conflict_more_btn.pack_forget()
+        if remaining > 0:
+            self.conflict_more_btn.configure(text=f"显示剩余 {remaining} 个")
+            self.conflict_more_btn.pack(pady=(0, 10))
 
-            ctk.CTkLabel(
-                header,
-                text=f"端口 {conflict['port']} 冲突",
-                font=ctk.CTkFont(size=14, weight="bold"),
-                text_color="#000000"
-            ).pack(side="left")
+    def _build_conflict_card(self):
+        """创建冲突卡片（内容由 _update_conflict_card 填充）"""
+        card = ctk.CTkFrame(self.conflict_scroll, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
 
-            ctk.CTkLabel(
-                header,
-                text=f"{len(conflict['users'])} 个服务",
-                text_color="#000000",
-                font=ctk.CTkFont(size=11)
-            ).pack(side="right")
-
-            # 冲突的服务列表
-            for i, user in enumerate(conflict['users'], 1):
-                service_frame = ctk.CTkFrame(card, fg_color="#F5F5F5", corner_radius=4)
-                service_frame.pack(fill="x", padx=12, pady=(0, 8))
-
-                ctk.CTkLabel(
-                    service_frame,
-                    text=f"{i}. {user['project_name']} / {user['service_name']}",
-                    font=ctk.CTkFont(size=12),
+        # 端口号
+        header = ctk.CTkFrame(card, fg_color="transparent")
+        header.pack(fill="x", padx=12, pady=(10, 5))
+
+        card.port_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=F(size=14, weight="bold"),
+            text_color="#000000"
+        )
+        card.port_label.pack(side="left")
+
+        card.count_label = ctk.CTkLabel(
+            header,
+            text="",
+            text_color="#000000",
+            font=F(size=11)
+        )
+        card.count_label.pack(side="right")
+
+        card.user_rows = []
+        return card
+
+    def _update_conflict_card(self, card, conflict: Dict):
+        """用冲突数据更新卡片及其服务列表"""
+        card.port_label.configure(text=f"端口 {conflict['port']} 冲突")
+        card.count_label.configure(text=f"{len(conflict['users'])} 个服务")
+
+        # 冲突的服务列表
+        rows = []
+        for i, (user, row) in enumerate(zip_longest(conflict['users'], card.user_rows), 1):
+            if user is None:
+                row.destroy()
+                continue
+            if row is None:
+                row = ctk.CTkFrame(card, fg_color="#F5F5F5", corner_radius=4)
+                row.pack(fill="x", padx=12, pady=(0, 8))
+
+                row.name_label = ctk.CTkLabel(
+                    row,
+                    text="",
+                    font=F(size=12),
                     text_color="#000000"
-                ).pack(anchor="w", padx=10, pady=(8, 2))
+                )
+                row.name_label.pack(anchor="w", padx=10, pady=(8, 2))
 
-                ctk.CTkLabel(
-                    service_frame,
-                    text=f"命令: {user['command'][:60]}...",
+                row.command_label = ctk.CTkLabel(
+                    row,
+                    text="",
                     text_color="#8E8E93",
-                    font=ctk.CTkFont(size=10)
-                ).pack(anchor="w", padx=10, pady=(0, 8))
+                    font=F(size=10)
+                )
+                row.command_label.pack(anchor="w", padx=10, pady=(0, 8))
+            row.name_label.configure(text=f"{i}. {user['project_name']} / {user['service_name']}")
+            row.command_label.configure(text=f"命令: {user['command'][:60]}...")
+            rows.append(row)
+        card.user_rows = rows
 
     def _init_python_env_tab(self):
         """初始化Python环境标签页"""
@@ -347,7 +659,7 @@ class PortManagerDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             info_frame,
             text="Python环境检测",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=F(size=16, weight="bold"),
             text_color="#000000"
         ).pack(anchor="w", padx=15, pady=(10, 5))
 
@@ -355,7 +667,7 @@ class PortManagerDialog(ctk.CTkToplevel):
             info_frame,
             text="检测系统中所有可用的Python环境",
             text_color="#8E8E93",
-            font=ctk.CTkFont(size=12)
+            font=F(size=12)
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
         # 刷新按钮
@@ -372,29 +684,53 @@ class PortManagerDialog(ctk.CTkToplevel):
             command=self._detect_python_envs
         ).pack(side="left", padx=10)
 
-        # Python环境列表
-        self.python_scroll = ctk.CTkScrollableFrame(tab, fg_color="transparent")
-        self.python_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        ctk.CTkButton(
+            btn_frame,
+            text="重新扫描",
+            width=100,
+            fg_color="#6c757d",
+            hover_color="#5a6268",
+            text_color="#FFFFFF",
+            command=lambda: self._detect_python_envs(force=True)
+        ).pack(side="left")
 
-        # 显示提示信息，不自动加载（性能优化）
-        hint_label = ctk.CTkLabel(
-            self.python_scroll,
-            text="点击上方按钮开始检测Python环境",
-            text_color="#8E8E93",
-            font=ctk.CTkFont(size=13)
+        # Python环境列表（虚拟滚动）
+        self.python_list = VirtualCardList(
+            tab,
+            row_height=90,
+            build_row=self._build_python_card,
+            update_row=self._update_python_card
         )
-        hint_label.pack(pady=50)
+        self.python_list.pack(fill="both", expand=True, padx=10, pady=10)
 
-    def _detect_python_envs(self):
-        """检测Python环境"""
-        import subprocess
-        import os
+        # 显示提示信息，不自动加载（性能优化）
+        self.python_list.show_message("点击上方按钮开始检测Python环境")
+
+    def _detect_python_envs(self, force: bool = False):
+        """检测Python环境（后台线程执行外部命令，结果缓存到重新扫描为止）"""
+        if self._python_envs_cache is not None and not force:
+            self._render_python_envs(self._python_envs_cache)
+            return
         
-        # 清空
-        for widget in self.python_scroll.winfo_children():
-            widget.destroy()
+        # 磁盘缓存仍有效时先显示上次结果，同时在后台重新检测
+        cached = None if force else _load_python_envs_cache(_python_envs_cache_key())
+        if cached is not None:
+            self._render_python_envs(cached)
+        else:
+            self.python_list.show_message("检测中...")
+        threading.Thread(target=self._gather_python_envs, daemon=True).start()
+
+    def _gather_python_envs(self):
+        """后台查找Python解释器并获取版本"""
+        python_envs = []  # 按发现顺序显示
+        seen = set()  # 规范化路径，用于去重
         
-        python_envs = []
+        def add(path: str):
+            path = path.strip()
+            key = os.path.normcase(os.path.realpath(path))
+            if key not in seen and os.path.exists(path):
+                seen.add(key)
+                python_envs.append(path)
         
         # 检测常见的Python路径
         common_paths = [
@@ -416,97 +752,118 @@ class PortManagerDialog(ctk.CTkToplevel):
             )
             if result.returncode == 0:
                 for line in result.stdout.strip().split('\n'):
-                    if line and os.path.exists(line):
-                        python_envs.append(line.strip())
+                    if line.strip():
+                        add(line)
         except Exception:
             pass
         
         # 检查常见路径
-        import glob
         for pattern in common_paths:
-            try:
-                for path in glob.glob(pattern, recursive=True):
-                    if os.path.exists(path) and path not in python_envs:
-                        python_envs.append(path)
-            except Exception:
-                pass
+            for path in _expand_path_pattern(pattern):
+                add(path)
         
-        # 检查conda环境
+        # 检查conda环境：优先读取 conda 维护的环境登记文件，省去启动 conda 进程
         try:
-            result = subprocess.run(
-                ["conda", "env", "list"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if line and not line.startswith('#') and '*' not in line:
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            env_path = parts[-1]
-                            python_path = os.path.join(env_path, 'python.exe')
-                            if os.path.exists(python_path) and python_path not in python_envs:
-                                python_envs.append(python_path)
-        except Exception:
-            pass
-        
-        if not python_envs:
-            ctk.CTkLabel(
-                self.python_scroll,
-                text="未检测到Python环境",
-                text_color="#8E8E93",
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=30)
-            return
-        
-        # 显示Python环境
-        for i, python_path in enumerate(python_envs, 1):
-            card = ctk.CTkFrame(self.python_scroll, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
-            card.pack(fill="x", pady=(0, 8))
-            
-            header = ctk.CTkFrame(card, fg_color="transparent")
-            header.pack(fill="x", padx=12, pady=(10, 5))
-            
-            # 获取Python版本
-            version = "未知版本"
+            with open(CONDA_REGISTRY_FILE, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    env_path = line.strip()
+                    if env_path:
+                        add(os.path.join(env_path, 'python.exe'))
+        except OSError:
             try:
                 result = subprocess.run(
-                    [python_path, "--version"],
+                    ["conda", "env", "list"],
                     capture_output=True,
                     text=True,
-                    timeout=3
+                    timeout=10
                 )
                 if result.returncode == 0:
-                    version = result.stdout.strip() or result.stderr.strip()
+                    for line in result.stdout.split('\n'):
+                        if line and not line.startswith('#') and '*' not in line:
+                            parts = line.rsplit(maxsplit=1)
+                            if len(parts) == 2:
+                                add(os.path.join(parts[1], 'python.exe'))
             except Exception:
                 pass
-            
-            ctk.CTkLabel(
-                header,
-                text=f"#{i} {version}",
-                font=ctk.CTkFont(size=14, weight="bold"),
-                text_color="#000000"
-            ).pack(side="left")
-            
+        
+        # 并行获取Python版本（各解释器启动互不依赖）
+        versions = []
+        if python_envs:
+            with ThreadPoolExecutor(max_workers=min(8, len(python_envs))) as executor:
+                versions = list(executor.map(_probe_python_version, python_envs))
+        
+        env_items = []
+        for python_path, version in zip(python_envs, versions):
             # 检查是否是conda环境
             is_conda = "anaconda" in python_path.lower() or "miniconda" in python_path.lower()
-            if is_conda:
-                ctk.CTkLabel(
-                    header,
-                    text="Conda",
-                    font=ctk.CTkFont(size=10),
-                    text_color="#FFFFFF",
-                    fg_color="#000000",
-                    corner_radius=4,
-                    padx=8,
-                    pady=2
-                ).pack(side="left", padx=10)
-            
-            # 路径
-            ctk.CTkLabel(
-                card,
-                text=f"路径: {python_path}",
-                text_color="#8E8E93",
-                font=ctk.CTkFont(size=11)
-            ).pack(anchor="w", padx=12, pady=(0, 10))
+            env_items.append({
+                'path': python_path,
+                'version': version,
+                'conda': is_conda
+            })
+        
+        _save_python_envs_cache(_python_envs_cache_key(), env_items)
+        
+        try:
+            self.after(0, self._render_python_envs, env_items)
+        except RuntimeError:
+            # 对话框已关闭
+            pass
+
+    def _render_python_envs(self, env_items: List[Dict]):
+        """显示Python环境检测结果（主线程）"""
+        if not self.winfo_exists():
+            return
+        self._python_envs_cache = env_items
+        if not env_items:
+            self.python_list.show_message("未检测到Python环境", size=14)
+            return
+        
+        # 显示Python环境
+        self.python_list.set_items(env_items)
+
+    def _build_python_card(self, parent, height: int):
+        """创建Python环境卡片（内容由 _update_python_card 填充）"""
+        card = ctk.CTkFrame(parent, height=height, fg_color="#FFFFFF", corner_radius=8, border_width=1, border_color="#E5E5E5")
+        card.pack_propagate(False)
+        
+        header = ctk.CTkFrame(card, fg_color="transparent")
+        header.pack(fill="x", padx=12, pady=(10, 5))
+        
+        card.version_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=F(size=14, weight="bold"),
+            text_color="#000000"
+        )
+        card.version_label.pack(side="left")
+        
+        card.conda_label = ctk.CTkLabel(
+            header,
+            text="Conda",
+            font=F(size=10),
+            text_color="#FFFFFF",
+            fg_color="#000000",
+            corner_radius=4,
+            padx=8,
+            pady=2
+        )
+        
+        # 路径
+        card.path_label = ctk.CTkLabel(
+            card,
+            text="",
+            text_color="#8E8E93",
+            font=F(size=11)
+        )
+        card.path_label.pack(anchor="w", padx=12, pady=(0, 10))
+        return card
+
+    def _update_python_card(self, card, item: Dict, index: int):
+        """用Python环境数据填充卡片"""
+        card.version_label.configure(text=f"#{index + 1} {item['version']}")
+        if item['conda']:
+            card.conda_label.pack(side="left", padx=10)
+        else:
+            card.conda_label.pack_forget()
+        card.path_label.configure(text=f"路径: {item['path']}")
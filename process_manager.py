@@ -1,10 +1,16 @@
 """进程管理器 - 负责服务的启停和日志捕获"""
 import subprocess
 import threading
+import codecs
 import os
+import selectors
 import signal
-from typing import Dict, List, Callable, Optional
+import datetime
+import time
+import psutil
+from typing import Dict, List, Callable, Optional, Set, Tuple
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 
@@ -12,19 +18,198 @@ from dataclasses import dataclass
 class ProcessInfo:
     """进程信息"""
     process: subprocess.Popen
-    thread: threading.Thread
+    thread: Optional[threading.Thread]  # 读取输出的线程（POSIX 下为共享的多路复用线程）
     logs: deque  # 使用 deque 限制日志行数
 
 
+class _LogBatch:
+    """把读取线程的逐行日志攒成批次交给批量回调"""
+
+    MAX_LINES = 32  # 攒够该行数立即投递
+    MAX_DELAY = 0.016  # 首行入队后最多等待的秒数
+
+    def __init__(self, manager: "ProcessManager", key: str):
+        self._manager = manager
+        self._key = key
+        self._lines: List[str] = []
+        self._first_at = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, line: str):
+        """追加一行，满批或超时则投递"""
+        with self._lock:
+            if not self._lines:
+                self._first_at = time.monotonic()
+                # 输出停顿时由共享的投递线程投递剩余行
+                self._manager._log_flusher.schedule(self)
+            self._lines.append(line)
+            if len(self._lines) < self.MAX_LINES and time.monotonic() - self._first_at < self.MAX_DELAY:
+                return
+            lines = self._take()
+        self._manager._notify_log_batch(self._key, lines)
+
+    def flush(self, tail: Optional[List[str]] = None):
+        """投递尚未发送的行（tail 为紧随其后的系统消息，与剩余行一起投递以保持顺序）"""
+        with self._lock:
+            lines = self._take()
+            if tail:
+                lines.extend(tail)
+        if lines:
+            self._manager._notify_log_batch(self._key, lines)
+
+    def _take(self) -> List[str]:
+        lines, self._lines = self._lines, []
+        return lines
+
+
+class _LogFlusher:
+    """单个常驻线程定期投递各服务未攒满的日志批次"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: Set[_LogBatch] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, batch: _LogBatch):
+        """登记有待投递行的批次"""
+        with self._cond:
+            self._pending.add(batch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # 登记后最多等待一个批次窗口，期间登记的批次一并投递
+            time.sleep(_LogBatch.MAX_DELAY)
+            with self._cond:
+                batches, self._pending = self._pending, set()
+            for batch in batches:
+                batch.flush()
+
+
+class _OutputStream:
+    """多路复用模式下单个服务的输出解码状态"""
+
+    def __init__(self, key: str, process: subprocess.Popen, logs: deque, batch: _LogBatch):
+        self.key = key
+        self.process = process
+        self.logs = logs
+        self.batch = batch
+        encoding = getattr(process.stdout, 'encoding', None) or 'utf-8'
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._pending = ''
+
+    def feed(self, data: bytes, final: bool = False) -> List[str]:
+        """解码一段输出，返回其中的完整行（按通用换行符拆分）"""
+        text = self._pending + self._decoder.decode(data, final)
+        # 末尾的 \r 可能与下一段开头的 \n 组成一个换行，留到下一次处理
+        if text.endswith('\r') and not final:
+            self._pending = '\r'
+            text = text[:-1]
+        else:
+            self._pending = ''
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        rest = lines.pop()
+        if final:
+            if rest:
+                lines.append(rest)
+        else:
+            self._pending = rest + self._pending
+        return lines
+
+
+class _OutputMultiplexer:
+    """POSIX 下用单个线程和 selectors 读取所有服务的输出，没有服务时线程退出"""
+
+    READ_SIZE = 65536
+
+    def __init__(self, manager: "ProcessManager"):
+        self._manager = manager
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._streams = 0
+        # 注册新管道时唤醒正在 select 的线程
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def register(self, key: str, process: subprocess.Popen, logs: deque, batch: _LogBatch) -> threading.Thread:
+        """开始读取进程输出，返回负责读取的线程"""
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        stream = _OutputStream(key, process, logs, batch)
+        with self._lock:
+            self._selector.register(fd, selectors.EVENT_READ, stream)
+            self._streams += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            thread = self._thread
+        os.write(self._wake_w, b'\0')
+        return thread
+
+    def _run(self):
+        manager = self._manager
+        while True:
+            with self._lock:
+                if self._streams == 0:
+                    self._thread = None
+                    return
+            for selector_key, _ in self._selector.select():
+                fd = selector_key.fd
+                if fd == self._wake_r:
+                    try:
+                        os.read(fd, 4096)
+                    except OSError:
+                        pass
+                    continue
+                stream = selector_key.data
+                try:
+                    data = os.read(fd, self.READ_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b''
+                if data:
+                    manager._dispatch_output(stream.key, stream.feed(data), stream.logs, stream.batch)
+                else:
+                    manager._dispatch_output(stream.key, stream.feed(b'', final=True), stream.logs, stream.batch)
+                    with self._lock:
+                        self._selector.unregister(fd)
+                        self._streams -= 1
+                    # 等待退出码可能阻塞，交给临时线程，不耽误其他服务的输出
+                    threading.Thread(
+                        target=manager._finish_output,
+                        args=(stream.key, stream.process, stream.batch),
+                        daemon=True
+                    ).start()
+
+
 class ProcessManager:
     """进程管理器"""
 
     MAX_LOG_LINES = 500  # 最大日志行数
+    STOP_GRACE_PERIOD = 2  # 停止服务时等待进程自行退出的秒数，超时再强制结束
 
     def __init__(self):
         self.processes: Dict[str, ProcessInfo] = {}
-        self.log_callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        # 日志回调用不可变元组保存，修改时整体替换，读取方无需加锁
+        self.log_callbacks: Dict[str, Tuple[Callable[[str], None], ...]] = {}
+        # 批量日志回调（参数为多行日志列表），同样以元组保存
+        self.log_batch_callbacks: Dict[str, Tuple[Callable[[List[str]], None], ...]] = {}
+        self.status_callbacks: Dict[str, List[Callable[[bool], None]]] = {}
+        # 各服务当前的日志批次，系统消息投递前先清空其中的输出
+        self._log_batches: Dict[str, _LogBatch] = {}
+        self._log_flusher = _LogFlusher()
         self._lock = threading.Lock()
+        # Windows 的管道不支持 select，仍为每个服务使用独立读取线程
+        self._multiplexer = _OutputMultiplexer(self) if os.name != 'nt' else None
 
     def _get_key(self, project_id: str, service: str) -> str:
         """生成进程唯一标识"""
@@ -54,12 +239,12 @@ class ProcessManager:
             logs = deque(maxlen=self.MAX_LOG_LINES)
             
             # 记录启动信息
-            import datetime
-            startup_log = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 启动命令: {command}"
+            timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+            startup_log = f"[{timestamp}] 启动命令: {command}"
             logs.append(startup_log)
             self._notify_log(key, startup_log)
             
-            cwd_log = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 工作目录: {cwd}"
+            cwd_log = f"[{timestamp}] 工作目录: {cwd}"
             logs.append(cwd_log)
             self._notify_log(key, cwd_log)
             
@@ -69,7 +254,7 @@ class ProcessManager:
                 if stripped.startswith('&'):
                     popen_command = stripped[1:].lstrip()
 
-            # 启动进程 - 使用无缓冲模式
+            # 启动进程 - 行缓冲文本模式（与 readline 逐行读取匹配）
             process = subprocess.Popen(
                 popen_command,
                 shell=True,
@@ -78,21 +263,30 @@ class ProcessManager:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
-                bufsize=0,  # 无缓冲，立即捕获输出
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
+                errors='replace',  # 无法解码的字节不中断日志读取
+                bufsize=1,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+                start_new_session=os.name != 'nt'  # 独立进程组，停止时 killpg 不会波及 DevManager
             )
 
-            # 创建日志读取线程
-            thread = threading.Thread(
-                target=self._read_output,
-                args=(key, process, logs),
-                daemon=True
-            )
-            thread.start()
+            batch = _LogBatch(self, key)
+            self._log_batches[key] = batch
+
+            # 读取输出：POSIX 交给共享的多路复用线程，Windows 创建独立读取线程
+            if self._multiplexer is not None:
+                thread = self._multiplexer.register(key, process, logs, batch)
+            else:
+                thread = threading.Thread(
+                    target=self._read_output,
+                    args=(key, process, logs, batch),
+                    daemon=True
+                )
+                thread.start()
 
             with self._lock:
                 self.processes[key] = ProcessInfo(process, thread, logs)
 
+            self._notify_status(key, True)
             return True
 
         except Exception as e:
@@ -111,104 +305,246 @@ class ProcessManager:
             process = info.process
 
         try:
-            if os.name == 'nt':
-                # Windows: 使用 taskkill 终止进程树
-                subprocess.run(
-                    f'taskkill /F /T /PID {process.pid}',
-                    shell=True,
-                    capture_output=True
-                )
-            else:
-                # Unix: 发送 SIGTERM
-                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            # 先记下进程树，父进程退出后仍能清理残留的子进程
+            try:
+                children = psutil.Process(process.pid).children(recursive=True)
+            except psutil.Error:
+                children = []
 
-            # 等待进程结束
+            # 第一阶段：请求进程组正常退出，给子进程刷新输出的机会
+            exited = False
             try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
+                if os.name == 'nt':
+                    # Windows: 进程以 CREATE_NEW_PROCESS_GROUP 启动，可发送 CTRL_BREAK
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+                else:
+                    # Unix: 向进程组发送 SIGTERM
+                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            except OSError:
+                # 没有共享控制台或找不到进程组时无法正常通知，直接强制结束
+                pass
+            else:
+                try:
+                    process.wait(timeout=self.STOP_GRACE_PERIOD)
+                    exited = True
+                except subprocess.TimeoutExpired:
+                    pass
+
+            # 第二阶段：未能正常退出则强制结束
+            if not exited:
+                if os.name == 'nt':
+                    # Windows: 使用 taskkill 终止进程树
+                    subprocess.run(
+                        f'taskkill /F /T /PID {process.pid}',
+                        shell=True,
+                        capture_output=True
+                    )
+                else:
+                    try:
+                        os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+                    except OSError:
+                        process.kill()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+            # 外壳进程已退出但子进程仍存活（例如仍占用端口）时强制结束
+            _, alive = psutil.wait_procs(children, timeout=1)
+            for child in alive:
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
 
         except Exception as e:
             self._notify_log(key, f"[警告] 停止时出错: {e}")
 
+        # 进程仍在运行时保留记录，避免界面显示已停止而端口仍被占用
+        if process.poll() is None:
+            self._notify_log(key, "[警告] 服务未能停止")
+            return False
+
         with self._lock:
             if key in self.processes:
                 del self.processes[key]
 
         self._notify_log(key, "[系统] 服务已停止")
+        self._notify_status(key, False)
         return True
 
     def is_running(self, project_id: str, service: str) -> bool:
         """检查服务是否运行中"""
         key = self._get_key(project_id, service)
 
-        with self._lock:
-            if key not in self.processes:
-                return False
-            return self.processes[key].process.poll() is None
+        # dict.get 在 GIL 下是原子操作，界面频繁轮询时无需加锁
+        info = self.processes.get(key)
+        return info is not None and info.process.poll() is None
 
     def get_logs(self, project_id: str, service: str) -> List[str]:
         """获取服务日志"""
         key = self._get_key(project_id, service)
 
+        # 锁内只查找字典，复制日志放到锁外，避免阻塞启停操作
         with self._lock:
-            if key in self.processes:
-                return list(self.processes[key].logs)
-        return []
+            info = self.processes.get(key)
+        if info is None:
+            return []
+        return list(info.logs)
 
     def add_log_callback(self, project_id: str, service: str, callback: Callable[[str], None]):
         """添加日志回调"""
         key = self._get_key(project_id, service)
 
         with self._lock:
-            if key not in self.log_callbacks:
-                self.log_callbacks[key] = []
-            self.log_callbacks[key].append(callback)
+            self.log_callbacks[key] = self.log_callbacks.get(key, ()) + (callback,)
 
     def remove_log_callback(self, project_id: str, service: str, callback: Callable[[str], None]):
         """移除日志回调"""
         key = self._get_key(project_id, service)
 
         with self._lock:
-            if key in self.log_callbacks:
+            callbacks = list(self.log_callbacks.get(key, ()))
+            try:
+                callbacks.remove(callback)
+            except ValueError:
+                return
+            self.log_callbacks[key] = tuple(callbacks)
+
+    def add_log_batch_callback(self, project_id: str, service: str, callback: Callable[[List[str]], None]):
+        """添加批量日志回调（每批最多32行或16ms，适合界面一次性插入）"""
+        key = self._get_key(project_id, service)
+
+        with self._lock:
+            self.log_batch_callbacks[key] = self.log_batch_callbacks.get(key, ()) + (callback,)
+
+    def remove_log_batch_callback(self, project_id: str, service: str, callback: Callable[[List[str]], None]):
+        """移除批量日志回调"""
+        key = self._get_key(project_id, service)
+
+        with self._lock:
+            callbacks = list(self.log_batch_callbacks.get(key, ()))
+            try:
+                callbacks.remove(callback)
+            except ValueError:
+                return
+            self.log_batch_callbacks[key] = tuple(callbacks)
+
+    def add_status_callback(self, project_id: str, service: str, callback: Callable[[bool], None]):
+        """添加状态回调（服务启动/退出时调用，参数为是否运行中）"""
+        key = self._get_key(project_id, service)
+
+        with self._lock:
+            if key not in self.status_callbacks:
+                self.status_callbacks[key] = []
+            self.status_callbacks[key].append(callback)
+
+    def remove_status_callback(self, project_id: str, service: str, callback: Callable[[bool], None]):
+        """移除状态回调"""
+        key = self._get_key(project_id, service)
+
+        with self._lock:
+            if key in self.status_callbacks:
                 try:
-                    self.log_callbacks[key].remove(callback)
+                    self.status_callbacks[key].remove(callback)
                 except ValueError:
                     pass
 
-    def _read_output(self, key: str, process: subprocess.Popen, logs: deque):
-        """读取进程输出"""
+    def _read_output(self, key: str, process: subprocess.Popen, logs: deque, batch: _LogBatch):
+        """读取进程输出（逐行热路径只做纯Python操作，无C扩展调用）"""
+        append = logs.append
+        notify = self._notify_log_lines
+        batch_callbacks = self.log_batch_callbacks
         try:
             for line in iter(process.stdout.readline, ''):
                 if not line:
                     break
                 line = line.rstrip('\n\r')
-                logs.append(line)
-                self._notify_log(key, line)
+                append(line)
+                notify(key, line)
+                if batch_callbacks.get(key):
+                    batch.add(line)
         except Exception:
             pass
         finally:
-            if process.stdout:
+            self._finish_output(key, process, batch)
+
+    def _dispatch_output(self, key: str, lines: List[str], logs: deque, batch: _LogBatch):
+        """分发多路复用线程读到的一组完整行"""
+        append = logs.append
+        notify = self._notify_log_lines
+        has_batch = bool(self.log_batch_callbacks.get(key))
+        for line in lines:
+            append(line)
+            notify(key, line)
+            if has_batch:
+                batch.add(line)
+
+    def _finish_output(self, key: str, process: subprocess.Popen, batch: _LogBatch):
+        """输出结束：投递剩余日志、关闭管道并通知服务已退出"""
+        batch.flush()
+        if process.stdout:
+            try:
                 process.stdout.close()
+            except Exception:
+                pass
+        # 输出结束即进程退出，通知状态变化
+        try:
+            process.wait()
+        except Exception:
+            pass
+        self._notify_status(key, False)
 
     def _notify_log(self, key: str, line: str):
-        """通知日志回调"""
+        """通知日志回调（系统消息接在该服务已缓冲的输出之后投递给批量回调）"""
+        self._notify_log_lines(key, line)
+        if self.log_batch_callbacks.get(key):
+            batch = self._log_batches.get(key)
+            if batch is not None:
+                batch.flush([line])
+            else:
+                self._notify_log_batch(key, [line])
+
+    def _notify_log_lines(self, key: str, line: str):
+        """通知逐行日志回调"""
+        # 元组只会被整体替换，直接读取即可，无需加锁复制
+        for callback in self.log_callbacks.get(key, ()):
+            try:
+                callback(line)
+            except Exception:
+                pass
+
+    def _notify_log_batch(self, key: str, lines: List[str]):
+        """通知批量日志回调"""
+        for callback in self.log_batch_callbacks.get(key, ()):
+            try:
+                callback(lines)
+            except Exception:
+                pass
+
+    def _notify_status(self, key: str, running: bool):
+        """通知状态回调"""
         with self._lock:
-            callbacks = self.log_callbacks.get(key, []).copy()
+            callbacks = self.status_callbacks.get(key, []).copy()
 
         for callback in callbacks:
             try:
-                callback(line)
+                callback(running)
             except Exception:
                 pass
 
     def stop_all(self):
-        """停止所有服务"""
-        keys = list(self.processes.keys())
-        for key in keys:
-            parts = key.split(":", 1)
-            if len(parts) == 2:
-                self.stop_service(parts[0], parts[1])
+        """停止所有服务（并发终止，避免逐个等待）"""
+        with self._lock:
+            keys = list(self.processes.keys())
+        targets = [key.split(":", 1) for key in keys]
+        targets = [parts for parts in targets if len(parts) == 2]
+        if not targets:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(8, len(targets))) as executor:
+            for parts in targets:
+                executor.submit(self.stop_service, parts[0], parts[1])
 
 
 # 全局单例
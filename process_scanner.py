@@ -1,8 +1,14 @@
 """进程扫描器 - 检测系统中运行的开发相关进程"""
 import subprocess
 import os
+import json
+import re
+import shutil
+import threading
+import time
 from typing import List, Dict, Optional
 from dataclasses import dataclass
+from functools import cached_property
 
 try:
     import psutil
@@ -11,6 +17,31 @@ except ImportError:
     HAS_PSUTIL = False
 
 
+def _iter_json_items(stream, chunk_size: int = 8192):
+    """边读边解析 JSON 数组（或单个对象）中的各个元素"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    eof = False
+    while True:
+        buf = buf.lstrip(' \t\r\n[,')
+        if buf.startswith(']'):
+            return
+        if buf:
+            try:
+                item, end = decoder.raw_decode(buf)
+            except ValueError:
+                pass  # 元素尚未读完整
+            else:
+                buf = buf[end:]
+                yield item
+                continue
+        if eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+
+
 @dataclass
 class ExternalProcess:
     """外部进程信息"""
@@ -21,6 +52,12 @@ class ExternalProcess:
     matched_project_id: Optional[str] = None  # 匹配到的项目ID
     matched_service: Optional[str] = None  # 匹配到的服务类型
 
+    @cached_property
+    def cmd_display(self) -> str:
+        """截断后的命令行（用于界面显示）"""
+        cl = self.command_line
+        return cl if len(cl) <= 100 else cl[:100] + "…"
+
 
 class ProcessScanner:
     """进程扫描器"""
@@ -42,22 +79,84 @@ class ProcessScanner:
         "django",
     ]
 
+    # 小写化的目标进程名（类加载时计算一次）
+    _TARGETS_LC = frozenset(t.lower() for t in TARGET_PROCESSES)
+    # 所有目标名合并成一个忽略大小写的正则，一次 search 代替逐个子串查找
+    _TARGET_RE = re.compile('|'.join(re.escape(t) for t in TARGET_PROCESSES), re.IGNORECASE)
+
+    # 后台扫描间隔（秒）：结果不变时逐步放宽，有变化时恢复
+    MIN_SCAN_INTERVAL = 1.0
+    MAX_SCAN_INTERVAL = 15.0
+    # PowerShell 备用扫描的结果条数与耗时上限
+    PS_MAX_PROCESSES = 500
+    PS_TIMEOUT = 10
+    # 进程句柄缓存有效期（秒）
+    PROC_CACHE_TTL = 5.0
+
     def __init__(self):
-        pass
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._latest: Optional[List[ExternalProcess]] = None
+        self._latest_sig: Optional[int] = None
+        self._interval = self.MIN_SCAN_INTERVAL
+        # pid -> (psutil.Process, 缓存时间)
+        self._proc_cache: Dict[int, tuple] = {}
 
     def scan_processes(self) -> List[ExternalProcess]:
-        """扫描系统中运行的开发相关进程"""
-        if HAS_PSUTIL:
-            return self._scan_with_psutil()
-        return self._scan_with_powershell()
+        """获取开发相关进程的最新快照（由后台线程定期刷新）"""
+        with self._lock:
+            if self._thread is None:
+                # 每个后台线程使用独立的停止事件，stop() 之后可以重新启动
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._scan_loop, args=(self._stop,), daemon=True)
+                self._thread.start()
+            latest = self._latest
+        if latest is None:
+            # 首次调用时还没有快照，同步扫描一次
+            latest = self._refresh()
+        return list(latest)
+
+    def stop(self):
+        """停止后台扫描线程（下次 scan_processes 会重新启动）"""
+        with self._lock:
+            self._stop.set()
+            self._thread = None
+            self._latest = None
+            self._latest_sig = None
+            self._interval = self.MIN_SCAN_INTERVAL
+
+    def _scan_loop(self, stop: threading.Event):
+        """后台扫描循环"""
+        while not stop.wait(self._interval):
+            self._refresh()
+
+    def _refresh(self) -> List[ExternalProcess]:
+        """执行一次扫描并更新快照"""
+        processes = self._scan_with_psutil() if HAS_PSUTIL else None
+        if processes is None:
+            # psutil 不可用或扫描出错时才使用 PowerShell（扫描为空是正常结果）
+            processes = self._scan_with_powershell()
+
+        # 进程集合未变化则放宽扫描间隔，否则重置
+        sig = hash(frozenset((p.pid, p.name) for p in processes))
+        with self._lock:
+            if sig == self._latest_sig:
+                self._interval = min(self._interval * 1.5, self.MAX_SCAN_INTERVAL)
+            else:
+                self._interval = self.MIN_SCAN_INTERVAL
+            self._latest_sig = sig
+            self._latest = processes
+        return processes
 
-    def _scan_with_psutil(self) -> List[ExternalProcess]:
-        """使用 psutil 扫描进程（更准确地获取工作目录）"""
+    def _scan_with_psutil(self) -> Optional[List[ExternalProcess]]:
+        """使用 psutil 扫描进程（更准确地获取工作目录），扫描出错时返回 None"""
         processes = []
         current_pid = os.getpid()
 
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cwd', 'exe']):
+            # 只批量读取过滤所需字段，cwd/exe 需要打开进程句柄，留给命中的目标进程
+            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
                 try:
                     info = proc.info
                     pid = info['pid']
@@ -70,25 +169,34 @@ class ProcessScanner:
                     # 检查是否是目标进程
                     name_lower = name.lower()
                     cmdline = info.get('cmdline') or []
-                    cmdline_str = ' '.join(cmdline) if cmdline else ''
-                    cmdline_lower = cmdline_str.lower()
 
-                    is_target = any(
-                        target.lower() in name_lower or target.lower() in cmdline_lower
-                        for target in self.TARGET_PROCESSES
+                    # 进程名与目标完全一致时直接命中，否则再用正则做子串匹配；
+                    # 目标名不含空格，逐个参数匹配即可，不必为被淘汰的进程拼接命令行
+                    target_re = self._TARGET_RE
+                    is_target = (
+                        name_lower in self._TARGETS_LC
+                        or target_re.search(name) is not None
+                        or any(target_re.search(arg) for arg in cmdline)
                     )
 
                     if not is_target:
                         continue
 
-                    # 获取工作目录
+                    cmdline_str = ' '.join(cmdline)
+
+                    # 获取工作目录（oneshot 合并同一进程的多次查询）
                     cwd = ''
-                    try:
-                        cwd = info.get('cwd') or proc.cwd() or ''
-                    except (psutil.AccessDenied, psutil.NoSuchProcess):
-                        # 无权限时尝试从命令行推断
-                        if info.get('exe'):
-                            cwd = os.path.dirname(info['exe'])
+                    with proc.oneshot():
+                        try:
+                            cwd = proc.cwd() or ''
+                        except (psutil.AccessDenied, psutil.NoSuchProcess):
+                            # 无权限时退回可执行文件所在目录
+                            try:
+                                exe = proc.exe()
+                            except psutil.Error:
+                                exe = ''
+                            if exe:
+                                cwd = os.path.dirname(exe)
 
                     ext_proc = ExternalProcess(
                         pid=pid,
@@ -103,6 +211,7 @@ class ProcessScanner:
 
         except Exception as e:
             print(f"psutil 扫描失败: {e}")
+            return None
 
         return processes
 
@@ -111,55 +220,50 @@ class ProcessScanner:
         processes = []
 
         try:
+            # 只向 CIM 请求需要的四个属性，整体输出为一个 JSON 数组
             ps_script = '''
-            Get-CimInstance Win32_Process | Where-Object {
+            @(Get-CimInstance Win32_Process -Property ProcessId,Name,CommandLine,ExecutablePath | Where-Object {
                 $_.Name -match 'cmd|powershell|pwsh|python|node|npm|java|go'
-            } | ForEach-Object {
-                $proc = $_
-                try {
-                    $cwd = ""
-                    if ($proc.ExecutablePath) {
-                        $cwd = Split-Path $proc.ExecutablePath -Parent
-                    }
-                } catch { $cwd = "" }
-                
-                [PSCustomObject]@{
-                    PID = $proc.ProcessId
-                    Name = $proc.Name
-                    CommandLine = $proc.CommandLine
-                    ExecutablePath = $proc.ExecutablePath
-                    CWD = $cwd
-                } | ConvertTo-Json -Compress
-            }
+            } | Select-Object ProcessId,Name,CommandLine,ExecutablePath) | ConvertTo-Json -Compress
             '''
 
-            result = subprocess.run(
-                ["powershell", "-Command", ps_script],
-                capture_output=True,
-                text=True,
-                timeout=10
+            # 优先使用启动更快的 PowerShell Core，并跳过用户配置文件加载
+            shell = shutil.which("pwsh") or "powershell"
+            ps_proc = subprocess.Popen(
+                [shell, "-NoProfile", "-NonInteractive", "-Command", ps_script],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
             )
-
-            if result.returncode == 0 and result.stdout.strip():
-                import json
-                for line in result.stdout.strip().split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
+            # 超时后结束 PowerShell，已解析的结果照常返回
+            timer = threading.Timer(self.PS_TIMEOUT, ps_proc.kill)
+            timer.start()
+            try:
+                # 边读边解析，不在内存中保留完整输出
+                current_pid = os.getpid()
+                for data in _iter_json_items(ps_proc.stdout):
                     try:
-                        data = json.loads(line)
-                        if data['PID'] == os.getpid():
+                        if data['ProcessId'] == current_pid:
                             continue
-                        
+
+                        exe_path = data.get('ExecutablePath')
                         proc = ExternalProcess(
-                            pid=data['PID'],
+                            pid=data['ProcessId'],
                             name=data['Name'] or '',
-                            cwd=self._extract_cwd(data),
+                            cwd=os.path.dirname(exe_path) if exe_path else self._extract_cwd(data),
                             command_line=data['CommandLine'] or ''
                         )
                         processes.append(proc)
-                    except (json.JSONDecodeError, KeyError):
+                    except (KeyError, TypeError):
                         continue
+                    if len(processes) >= self.PS_MAX_PROCESSES:
+                        break
+            finally:
+                timer.cancel()
+                if ps_proc.poll() is None:
+                    ps_proc.kill()
+                ps_proc.stdout.close()
+                ps_proc.wait()
 
         except Exception as e:
             print(f"PowerShell 扫描失败: {e}")
@@ -187,85 +291,88 @@ class ProcessScanner:
         
         return ''
 
-    def scan_with_wmic(self) -> List[ExternalProcess]:
-        """使用 WMIC 扫描（备用方案，更可靠获取命令行）"""
-        processes = []
-
-        try:
-            result = subprocess.run(
-                ['wmic', 'process', 'get', 'ProcessId,Name,CommandLine,ExecutablePath', '/format:csv'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for line in lines[1:]:  # 跳过标题行
-                    parts = line.strip().split(',')
-                    if len(parts) >= 4:
-                        try:
-                            name = parts[2] if len(parts) > 2 else ''
-                            # 检查是否是目标进程
-                            if not any(target.lower() in name.lower() for target in self.TARGET_PROCESSES):
-                                continue
-                            
-                            pid = int(parts[3]) if parts[3].isdigit() else 0
-                            if pid == os.getpid():
-                                continue
-                                
-                            cmd_line = parts[1] if len(parts) > 1 else ''
-                            exe_path = parts[4] if len(parts) > 4 else ''
-                            
-                            proc = ExternalProcess(
-                                pid=pid,
-                                name=name,
-                                cwd=os.path.dirname(exe_path) if exe_path else '',
-                                command_line=cmd_line
-                            )
-                            processes.append(proc)
-                        except (ValueError, IndexError):
-                            continue
-
-        except Exception as e:
-            print(f"WMIC 扫描失败: {e}")
-
-        return processes
-
     def match_to_projects(self, processes: List[ExternalProcess], projects: list) -> List[ExternalProcess]:
         """将进程匹配到项目"""
+        def normalize(path: str) -> str:
+            return path.lower().replace('/', '\\')
+
+        # 预先规范化项目路径，并按 服务工作目录 -> (项目ID, 服务key) 建立索引
+        project_paths = [(normalize(project.path), project.id) for project in projects if project.path]
+        # 项目路径 -> 项目ID，用于沿工作目录逐级向上查找所属项目
+        path_index: Dict[str, str] = {}
+        for project_path, project_id in project_paths:
+            path_index.setdefault(project_path.rstrip('\\'), project_id)
+        service_index: Dict[str, tuple] = {}
+        for project in projects:
+            for service_key, service in project.services.items():
+                cwd = getattr(service, 'cwd', None) or getattr(service, 'working_dir', None)
+                if cwd:
+                    service_index.setdefault(normalize(cwd).rstrip('\\'), (project.id, service_key))
+
         for proc in processes:
+            # 进程对象可能来自缓存，先清掉上一次的匹配结果
+            proc.matched_project_id = None
+            proc.matched_service = None
             if not proc.cwd and not proc.command_line:
                 continue
 
-            for project in projects:
-                project_path = project.path.lower().replace('/', '\\')
-                
-                # 检查工作目录是否在项目路径下
-                proc_cwd = proc.cwd.lower().replace('/', '\\')
-                proc_cmd = proc.command_line.lower().replace('/', '\\')
-
-                if project_path in proc_cwd or project_path in proc_cmd:
-                    proc.matched_project_id = project.id
-                    
-                    # 尝试判断是前端还是后端
-                    if 'node' in proc.name.lower() or 'npm' in proc.command_line.lower():
-                        proc.matched_service = 'frontend'
-                    elif 'python' in proc.name.lower():
-                        proc.matched_service = 'backend'
-                    else:
-                        proc.matched_service = 'unknown'
+            # 检查工作目录是否在项目路径下
+            proc_cwd = normalize(proc.cwd)
+            proc_cmd = normalize(proc.command_line)
+
+            # 工作目录与某个服务完全一致时直接确定服务
+            hit = service_index.get(proc_cwd.rstrip('\\'))
+            if hit:
+                proc.matched_project_id, proc.matched_service = hit
+                continue
+
+            # 先按工作目录的各级父目录查找（最深的项目优先）
+            matched_id = None
+            prefix = proc_cwd.rstrip('\\')
+            while prefix:
+                matched_id = path_index.get(prefix)
+                if matched_id:
                     break
+                cut = prefix.rfind('\\')
+                if cut <= 0:
+                    break
+                prefix = prefix[:cut]
+
+            # 找不到时退回对工作目录和命令行的子串匹配
+            if not matched_id:
+                for project_path, project_id in project_paths:
+                    if project_path in proc_cwd or project_path in proc_cmd:
+                        matched_id = project_id
+                        break
+
+            if matched_id:
+                proc.matched_project_id = matched_id
+
+                # 尝试判断是前端还是后端
+                if 'node' in proc.name.lower() or 'npm' in proc_cmd:
+                    proc.matched_service = 'frontend'
+                elif 'python' in proc.name.lower():
+                    proc.matched_service = 'backend'
+                else:
+                    proc.matched_service = 'unknown'
 
         return processes
 
     def get_process_cwd_via_handle(self, pid: int) -> Optional[str]:
         """通过进程句柄获取工作目录（需要 psutil）"""
+        if not HAS_PSUTIL:
+            return None
         try:
-            import psutil
-            proc = psutil.Process(pid)
+            now = time.monotonic()
+            cached = self._proc_cache.get(pid)
+            if cached and now - cached[1] < self.PROC_CACHE_TTL and cached[0].is_running():
+                proc = cached[0]
+            else:
+                proc = psutil.Process(pid)
+                self._proc_cache[pid] = (proc, now)
             return proc.cwd()
         except:
+            self._proc_cache.pop(pid, None)
             return None
 
 
@@ -276,7 +383,4 @@ process_scanner = ProcessScanner()
 def scan_and_match(projects: list) -> List[ExternalProcess]:
     """扫描并匹配进程到项目"""
     processes = process_scanner.scan_processes()
-    if not processes:
-        # 备用方案
-        processes = process_scanner.scan_with_wmic()
     return process_scanner.match_to_projects(processes, projects)
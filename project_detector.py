@@ -1,13 +1,41 @@
 """项目检测器 - 智能识别项目结构和启动命令"""
 import os
+import re
 import json
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, Set, Tuple
 from port_manager import port_manager
 from port_detector import port_detector, PortDetectionResult
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-@dataclass
+# 文件识别结果缓存 {文件路径: ((mtime_ns, 大小), 结果)}，文件未修改时跨多次检测复用
+_PY_FRAMEWORK_CACHE: Dict[str, Tuple[tuple, tuple]] = {}
+_PKG_CACHE: Dict[str, Tuple[tuple, Optional[dict]]] = {}
+
+
+def _loads(raw: bytes):
+    """解析 JSON 字节串（优先使用 orjson）"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _file_key(path: str) -> Optional[tuple]:
+    """文件的 (修改时间, 大小)，读取失败返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass(slots=True)
 class DetectedService:
     """检测到的服务"""
     name: str
@@ -21,7 +49,7 @@ class DetectedService:
     env_var: Optional[str] = None  # 环境变量名
 
 
-@dataclass
+@dataclass(slots=True)
 class DetectedProject:
     """检测到的项目信息"""
     name: str
@@ -31,6 +59,15 @@ class DetectedProject:
     frontend: Optional[DetectedService] = None
 
 
+@dataclass(slots=True)
+class _DetectContext:
+    """单次检测的状态（每次 detect 调用各自一份，互不干扰）"""
+    # 遍历过的目录和读取过的文件
+    read_paths: list = field(default_factory=list)
+    # 端口检测结果（(目录, 是否前端) -> 结果）
+    port_cache: Dict[Tuple[str, bool], PortDetectionResult] = field(default_factory=dict)
+
+
 class ProjectDetector:
     """项目检测器"""
 
@@ -107,9 +144,43 @@ class ProjectDetector:
         },
     }
 
+    # 优先检查的常见子目录（目录名 -> 顺序）及跳过的目录
+    _PRIORITY_DIRS = {name: i for i, name in enumerate(
+        ["backend", "server", "api", "frontend", "client", "web", "web_app", "src"])}
+    _SKIP_DIRS = frozenset(['node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build'])
+    # 已高置信度识别出对应服务后不再进入的常见目录
+    _BACKEND_DIRS = frozenset(["backend", "server", "api"])
+    _FRONTEND_DIRS = frozenset(["frontend", "client", "web", "web_app"])
+
+    # Python 框架特征（一次扫描找出文件中出现的所有框架名）
+    _PY_FRAMEWORK_RE = re.compile(rb'fastapi|flask|django|uvicorn|gunicorn', re.IGNORECASE)
+
+    # 依赖名 -> (优先级, 前端框架)，优先级沿用 FRONTEND_PATTERNS 的顺序
+    _FRONTEND_MARKER_MAP = {
+        marker: (rank, framework)
+        for rank, (framework, pattern) in enumerate(FRONTEND_PATTERNS.items())
+        for marker in pattern['markers']
+    }
+    # Node.js 后端 / 前端特征依赖
+    _BACKEND_NODE_MARKERS = frozenset(['express', 'koa', 'fastify', 'hapi', 'nest'])
+    _FRONTEND_NODE_MARKERS = frozenset(['react', 'vue', 'angular', '@angular', 'svelte', 'vite'])
+
+    def __init__(self):
+        # 项目路径 -> (依赖的路径, 这些路径的签名, 检测结果)
+        self._detect_cache: Dict[str, Tuple[tuple, tuple, DetectedProject]] = {}
+        self._detect_cache_lock = threading.Lock()
+
     def detect(self, project_path: str) -> DetectedProject:
-        """检测项目结构"""
+        """检测项目结构（目录结构和相关文件未变化时复用上次结果）"""
         project_path = os.path.abspath(project_path)
+        python_exe = os.environ.get("DEV_MANAGER_PYTHON_EXE", self.DEFAULT_PYTHON_EXE)
+        ctx = _DetectContext()
+
+        with self._detect_cache_lock:
+            cached = self._detect_cache.get(project_path)
+        if cached and cached[1] == self._signature(cached[0], python_exe):
+            return self._refresh_ports(cached[2], ctx)
+
         project_name = os.path.basename(project_path)
 
         result = DetectedProject(
@@ -118,45 +189,84 @@ class ProjectDetector:
         )
 
         # 扫描目录结构
-        self._scan_directory(project_path, result)
+        self._scan_directory(project_path, result, ctx)
 
+        paths = tuple(dict.fromkeys(ctx.read_paths))
+        entry = (paths, self._signature(paths, python_exe), result)
+        with self._detect_cache_lock:
+            self._detect_cache[project_path] = entry
         return result
 
-    def _scan_directory(self, path: str, result: DetectedProject, depth: int = 0):
-        """递归扫描目录"""
-        if depth > 3:  # 最多扫描3层
-            return
-
-        try:
-            items = os.listdir(path)
-        except PermissionError:
-            return
+    @staticmethod
+    def _signature(paths: tuple, python_exe: str) -> tuple:
+        """检测结果依赖的目录和文件的 (修改时间, 大小) 签名"""
+        return (python_exe,) + tuple(_file_key(path) for path in paths)
+
+    def _refresh_ports(self, cached: DetectedProject, ctx: _DetectContext) -> DetectedProject:
+        """复制缓存的检测结果，并重新确定端口（端口配置和已分配端口可能已变化）"""
+        result = replace(cached)
+        backend = cached.backend
+        if backend:
+            if backend.port_source:
+                port, source, conf, env_var = self._resolve_port(
+                    backend.command, backend.cwd, False, backend.tech_stack, set(), ctx
+                )
+                backend = replace(backend, port=port, port_source=source,
+                                  port_confidence=conf, env_var=env_var)
+            elif backend.tech_stack != "go":
+                backend = replace(backend, port=port_manager.suggest_port(backend.tech_stack, "", set()))
+            result.backend = backend
+        if cached.frontend:
+            frontend = cached.frontend
+            used_ports = {backend.port} if backend and backend.port else set()
+            port, source, conf, env_var = self._resolve_port(
+                frontend.command, frontend.cwd, True, frontend.tech_stack, used_ports, ctx
+            )
+            result.frontend = replace(frontend, port=port, port_source=source,
+                                      port_confidence=conf, env_var=env_var)
+        return result
 
-        # 检查当前目录
-        self._check_backend(path, items, result)
-        self._check_frontend(path, items, result)
-
-        # 递归检查子目录（优先检查常见目录名）
-        priority_dirs = ["backend", "server", "api", "frontend", "client", "web", "web_app", "src"]
-        
-        for dir_name in priority_dirs:
-            if dir_name in items:
-                sub_path = os.path.join(path, dir_name)
-                if os.path.isdir(sub_path):
-                    self._scan_directory(sub_path, result, depth + 1)
-
-        # 检查其他目录
-        for item in items:
-            if item.startswith('.') or item in priority_dirs:
-                continue
-            if item in ['node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build']:
+    def _scan_directory(self, root: str, result: DetectedProject, ctx: _DetectContext):
+        """自顶向下遍历目录（最多向下3层）"""
+        depths = {root: 0}
+        for path, dirnames, filenames in os.walk(root):
+            depth = depths.pop(path)
+            ctx.read_paths.append(path)
+            # 目录项名称集合，供后续多次 O(1) 成员判断
+            items = set(filenames)
+            items.update(dirnames)
+
+            # 检查当前目录
+            self._check_backend(path, items, result, ctx)
+            self._check_frontend(path, items, result, ctx)
+
+            # 前后端都已高置信度识别，后续检查不会再改变结果
+            backend_done = result.backend is not None and result.backend.confidence > 0.8
+            frontend_done = result.frontend is not None and result.frontend.confidence > 0.8
+            if backend_done and frontend_done:
+                break
+
+            if depth >= 3:
+                dirnames.clear()
                 continue
-            
-            sub_path = os.path.join(path, item)
-            if os.path.isdir(sub_path):
-                self._scan_directory(sub_path, result, depth + 1)
 
-    def _check_backend(self, path: str, items: List[str], result: DetectedProject):
+            # 原地裁剪子目录，常见目录名排在前面优先检查；
+            # 已识别出的一侧不再进入其对应的常见目录
+            skip = self._SKIP_DIRS
+            if backend_done:
+                skip = skip | self._BACKEND_DIRS
+            elif frontend_done:
+                skip = skip | self._FRONTEND_DIRS
+            dirnames[:] = sorted(
+                (d for d in dirnames
+                 if d not in skip and (d[:1] != '.' or d in self._PRIORITY_DIRS)),
+                key=lambda d: self._PRIORITY_DIRS.get(d, len(self._PRIORITY_DIRS))
+            )
+            for d in dirnames:
+                depths[os.path.join(path, d)] = depth + 1
+
+    def _check_backend(self, path: str, items: Set[str], result: DetectedProject,
+                       ctx: _DetectContext):
         """检查后端项目"""
         if result.backend and result.backend.confidence > 0.8:
             return  # 已经找到高置信度的后端
@@ -167,38 +277,17 @@ class ProjectDetector:
         for py_file in ["main.py", "app.py", "server.py", "run.py"]:
             if py_file in items:
                 file_path = os.path.join(path, py_file)
-                framework, confidence = self._detect_python_framework(file_path)
+                framework, confidence = self._detect_python_framework(file_path, ctx)
                 
                 if confidence > (result.backend.confidence if result.backend else 0):
                     pattern = self.BACKEND_PATTERNS.get(framework, {})
                     command_template = pattern.get("command", "{python} {file}")
                     command = command_template.format(python=python_exe, file=py_file)
-                    
-                    # 使用深度端口检测器
-                    port_result = port_detector.detect_backend_port(path)
-                    
-                    # 检查命令中的端口覆盖
-                    env_override = port_detector.detect_env_port_override(command)
-                    
-                    final_port = None
-                    port_source = "默认"
-                    port_conf = 0.0
-                    env_var = None
-                    
-                    if env_override:
-                        env_var, final_port = env_override
-                        port_source = f"命令行 ({env_var}={final_port})"
-                        port_conf = 1.0
-                    elif port_result.port:
-                        final_port = port_result.port
-                        port_source = port_result.source
-                        port_conf = port_result.confidence
-                        env_var = port_result.env_var
-                    else:
-                        final_port = port_manager.suggest_port(framework, "", set())
-                        port_source = "智能建议"
-                        port_conf = 0.5
-                    
+
+                    final_port, port_source, port_conf, env_var = self._resolve_port(
+                        command, path, False, framework, set(), ctx
+                    )
+
                     result.backend = DetectedService(
                         name="后端服务",
                         command=command,
@@ -226,7 +315,7 @@ class ProjectDetector:
         # 检查 Node.js 后端
         if "package.json" in items and not result.backend:
             pkg_path = os.path.join(path, "package.json")
-            if self._is_node_backend(pkg_path):
+            if self._is_node_backend(self._load_pkg(pkg_path, ctx)):
                 for js_file in ["server.js", "app.js", "index.js"]:
                     if js_file in items:
                         suggested_port = port_manager.suggest_port("express", "", set())
@@ -251,7 +340,8 @@ class ProjectDetector:
                 tech_stack="go"
             )
 
-    def _check_frontend(self, path: str, items: List[str], result: DetectedProject):
+    def _check_frontend(self, path: str, items: Set[str], result: DetectedProject,
+                        ctx: _DetectContext):
         """检查前端项目"""
         if result.frontend and result.frontend.confidence > 0.8:
             return
@@ -260,40 +350,16 @@ class ProjectDetector:
             return
 
         pkg_path = os.path.join(path, "package.json")
-        framework, command, port, confidence = self._detect_frontend_framework(pkg_path)
+        framework, command, port, confidence = self._detect_frontend_framework(self._load_pkg(pkg_path, ctx))
 
         if confidence > (result.frontend.confidence if result.frontend else 0):
             tech_stack = framework or "react"
-            
-            # 使用深度端口检测器
-            port_result = port_detector.detect_frontend_port(path)
-            
-            # 检查命令中的端口覆盖
-            env_override = port_detector.detect_env_port_override(command)
-            
-            final_port = None
-            port_source = "默认"
-            port_conf = 0.0
-            env_var = None
-            
-            if env_override:
-                # 命令中有明确的端口覆盖
-                env_var, final_port = env_override
-                port_source = f"命令行 ({env_var}={final_port})"
-                port_conf = 1.0
-            elif port_result.port:
-                # 从配置文件读取到端口
-                final_port = port_result.port
-                port_source = port_result.source
-                port_conf = port_result.confidence
-                env_var = port_result.env_var
-            else:
-                # 使用智能建议
-                used_ports = {result.backend.port} if result.backend and result.backend.port else set()
-                final_port = port_manager.suggest_port(tech_stack, "", used_ports)
-                port_source = "智能建议"
-                port_conf = 0.5
-            
+
+            used_ports = {result.backend.port} if result.backend and result.backend.port else set()
+            final_port, port_source, port_conf, env_var = self._resolve_port(
+                command, path, True, tech_stack, used_ports, ctx
+            )
+
             result.frontend = DetectedService(
                 name=f"前端服务 ({framework})" if framework else "前端服务",
                 command=command,
@@ -306,33 +372,84 @@ class ProjectDetector:
                 env_var=env_var
             )
 
-    def _detect_python_framework(self, file_path: str) -> tuple:
-        """检测 Python 框架"""
+    def _resolve_port(self, command: str, path: str, frontend: bool,
+                      tech_stack: str, used_ports: set, ctx: _DetectContext) -> tuple:
+        """确定服务端口，返回 (port, source, confidence, env_var)"""
+        # 命令中有明确的端口覆盖
+        env_override = port_detector.detect_env_port_override(command)
+        if env_override:
+            env_var, port = env_override
+            return port, f"命令行 ({env_var}={port})", 1.0, env_var
+
+        # 使用深度端口检测器（同一次检测内每个目录只检测一次）
+        key = (path, frontend)
+        port_result = ctx.port_cache.get(key)
+        if port_result is None:
+            if frontend:
+                port_result = port_detector.detect_frontend_port(path)
+            else:
+                port_result = port_detector.detect_backend_port(path)
+            ctx.port_cache[key] = port_result
+        if port_result.port:
+            # 从配置文件读取到端口
+            return port_result.port, port_result.source, port_result.confidence, port_result.env_var
+
+        # 使用智能建议
+        return port_manager.suggest_port(tech_stack, "", used_ports), "智能建议", 0.5, None
+
+    def _detect_python_framework(self, file_path: str, ctx: _DetectContext) -> tuple:
+        """检测 Python 框架（按修改时间和大小缓存）"""
+        ctx.read_paths.append(file_path)
+        key = _file_key(file_path)
+        if key is None:
+            return 'python', 0.3
+        cached = _PY_FRAMEWORK_CACHE.get(file_path)
+        if cached and cached[0] == key:
+            return cached[1]
+
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(5000)  # 只读前5000字符
-                
-            if 'fastapi' in content.lower() or 'FastAPI' in content:
-                return 'fastapi', 0.9
-            if 'flask' in content.lower() or 'Flask' in content:
-                return 'flask', 0.9
-            if 'django' in content.lower():
-                return 'django', 0.8
-            
-            # 通用 Python 服务
-            if 'uvicorn' in content or 'gunicorn' in content:
-                return 'fastapi', 0.7
-            
-            return 'python', 0.5
+            with open(file_path, 'rb') as f:
+                content = f.read(5000)  # 只读前5000字节
         except:
             return 'python', 0.3
 
-    def _detect_frontend_framework(self, pkg_path: str) -> tuple:
-        """检测前端框架，返回 (framework, command, port, confidence)"""
+        found = {m.lower() for m in self._PY_FRAMEWORK_RE.findall(content)}
+        if b'fastapi' in found:
+            result = 'fastapi', 0.9
+        elif b'flask' in found:
+            result = 'flask', 0.9
+        elif b'django' in found:
+            result = 'django', 0.8
+        elif b'uvicorn' in found or b'gunicorn' in found:
+            # 通用 Python 服务
+            result = 'fastapi', 0.7
+        else:
+            result = 'python', 0.5
+        _PY_FRAMEWORK_CACHE[file_path] = (key, result)
+        return result
+
+    def _load_pkg(self, pkg_path: str, ctx: _DetectContext) -> Optional[dict]:
+        """读取并解析 package.json（按修改时间和大小缓存）"""
+        ctx.read_paths.append(pkg_path)
+        key = _file_key(pkg_path)
+        if key is None:
+            return None
+        cached = _PKG_CACHE.get(pkg_path)
+        if cached and cached[0] == key:
+            return cached[1]
         try:
-            with open(pkg_path, 'r', encoding='utf-8') as f:
-                pkg = json.load(f)
+            with open(pkg_path, 'rb') as f:
+                pkg = _loads(f.read())
         except:
+            pkg = None
+        if not isinstance(pkg, dict):
+            pkg = None
+        _PKG_CACHE[pkg_path] = (key, pkg)
+        return pkg
+
+    def _detect_frontend_framework(self, pkg: Optional[dict]) -> tuple:
+        """检测前端框架，返回 (framework, command, port, confidence)"""
+        if pkg is None:
             return None, "npm run dev", 3000, 0.3
 
         deps = {}
@@ -341,20 +458,21 @@ class ProjectDetector:
 
         scripts = pkg.get('scripts', {})
 
-        # 检测框架
-        for framework, pattern in self.FRONTEND_PATTERNS.items():
-            for marker in pattern['markers']:
-                if marker in deps:
-                    command = pattern['command']
-                    # 检查 scripts 中是否有对应命令
-                    if 'dev' in scripts:
-                        command = 'npm run dev'
-                    elif 'start' in scripts:
-                        command = 'npm start'
-                    elif 'serve' in scripts:
-                        command = 'npm run serve'
-                    
-                    return framework, command, pattern['default_port'], 0.9
+        # 检测框架（依赖与特征集合求交集，取优先级最高的框架）
+        hits = deps.keys() & self._FRONTEND_MARKER_MAP.keys()
+        if hits:
+            _, framework = min(self._FRONTEND_MARKER_MAP[m] for m in hits)
+            pattern = self.FRONTEND_PATTERNS[framework]
+            command = pattern['command']
+            # 检查 scripts 中是否有对应命令
+            if 'dev' in scripts:
+                command = 'npm run dev'
+            elif 'start' in scripts:
+                command = 'npm start'
+            elif 'serve' in scripts:
+                command = 'npm run serve'
+
+            return framework, command, pattern['default_port'], 0.9
 
         # 通用前端项目
         if 'dev' in scripts:
@@ -364,22 +482,16 @@ class ProjectDetector:
 
         return None, 'npm run dev', 3000, 0.3
 
-    def _is_node_backend(self, pkg_path: str) -> bool:
+    def _is_node_backend(self, pkg: Optional[dict]) -> bool:
         """判断是否是 Node.js 后端项目"""
+        if pkg is None:
+            return False
         try:
-            with open(pkg_path, 'r', encoding='utf-8') as f:
-                pkg = json.load(f)
-            
             deps = {}
             deps.update(pkg.get('dependencies', {}))
-            
-            # 后端特征
-            backend_markers = ['express', 'koa', 'fastify', 'hapi', 'nest']
-            # 前端特征
-            frontend_markers = ['react', 'vue', 'angular', '@angular', 'svelte', 'vite']
-            
-            has_backend = any(m in deps for m in backend_markers)
-            has_frontend = any(m in deps for m in frontend_markers)
+
+            has_backend = not deps.keys().isdisjoint(self._BACKEND_NODE_MARKERS)
+            has_frontend = not deps.keys().isdisjoint(self._FRONTEND_NODE_MARKERS)
             
             return has_backend and not has_frontend
         except:
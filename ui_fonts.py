@@ -0,0 +1,17 @@
+"""字体缓存 - 相同参数的 CTkFont 全局共享，避免每个控件重复创建字体"""
+import customtkinter as ctk
+from typing import Dict, Optional
+
+FONTS: Dict[tuple, ctk.CTkFont] = {}
+
+
+def F(size: int, weight: str = "normal", family: Optional[str] = None, underline: bool = False) -> ctk.CTkFont:
+    """获取共享字体（首次使用时创建，需在根窗口创建之后调用）"""
+    key = (size, weight, family, underline)
+    font = FONTS.get(key)
+    if font is None:
+        kwargs = {"size": size, "weight": weight, "underline": underline}
+        if family:
+            kwargs["family"] = family
+        font = FONTS[key] = ctk.CTkFont(**kwargs)
+    return font
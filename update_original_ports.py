@@ -11,9 +11,23 @@ def update_all_original_ports():
     projects = enhanced_project_manager.get_all()
     updated_count = 0
     
+    # 先并行检测所有需要补充原始端口的项目
+    pending = [
+        project for project in projects
+        if any(s.enabled and s.port_config and s.port_config.original_port is None
+               for s in project.services.values())
+    ]
+    pending_ids = {project.id for project in pending}
+    detected = port_detector.detect_batch([project.path for project in pending])
+    
     for project in projects:
         print(f"\n处理项目: {project.name}")
         
+        # 所有服务都已有原始端口，无需检测也无需保存
+        if project.id not in pending_ids:
+            print("  所有服务已有原始端口")
+            continue
+        
         for service_key, service in project.services.items():
             if not service.enabled:
                 continue
@@ -24,10 +38,11 @@ def update_all_original_ports():
                     print(f"  检测 {service_key} 服务端口...")
                     
                     # 检测端口
+                    frontend_result, backend_result = detected[project.path]
                     if service_key == "frontend" or "frontend" in service.name.lower():
-                        result = port_detector.detect_frontend_port(project.path)
+                        result = frontend_result
                     else:
-                        result = port_detector.detect_backend_port(project.path)
+                        result = backend_result
                     
                     if result and result.port:
                         service.port_config.original_port = result.port
@@ -41,9 +56,10 @@ def update_all_original_ports():
                 else:
                     print(f"  {service_key} 服务已有原始端口: {service.port_config.original_port}")
         
-        # 保存项目
+        # 保存项目（只标记修改，最后统一写盘一次）
         enhanced_project_manager.update(project)
     
+    enhanced_project_manager.flush()
     print(f"\n完成！共更新 {updated_count} 个服务的原始端口")
 
 if __name__ == "__main__":